@@ -1,27 +1,23 @@
 # app.py
-import os, socket, threading, sys
+import os, sys
 from collections import deque
 
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 
 from config import (
-    APP_TITLE, DEFAULT_MIN_RAM, DEFAULT_MAX_RAM, WINDOW_GEOMETRY, WINDOW_ALPHA,
-    PLAYER_LIST_POLL_SECS, TIMEOUT_MINUTES,
+    APP_TITLE, WINDOW_GEOMETRY, WINDOW_ALPHA, TIMEOUT_MINUTES, TICK_POLL_SECS, UI_FRAME_MS, MINIMIZED_PUMP_MS, DAEMON_FILE,
 )
 from theme import apply_theme, COLORS
 from utils.hover import add_hover_effect
-from utils.parsers import maybe_parse_players, parse_online_counts
-from server_controller import ServerController
+from utils.rcon import enable_rcon
+from server_controller import ServerController, java_version
+from server_manager import ServerManager, ServerProfile
 
 from tabs.console_tab import ConsoleTab
-from tabs.stats_tab import StatsTab
-from tabs.players_tab import PlayersTab
 from widgets.folder_tabs import FolderTabs 
 from tkinter import PhotoImage  
 
-SERVER_PROPERTIES = "server.properties"
-
 
 # ---------- resource helper ----------
 def _resource_path(relative: str) -> str:
@@ -58,29 +54,37 @@ class ServerApp(ctk.CTk):
             print("iconphoto failed:", e)
 
         # state
-        self.players = set()
         self.players_version = 0
         self._last_lines = deque(maxlen=200)
         self._running_state = None
-        self._port_probe_skip = 0
-        self._running_false_streak = 0   # need 2 consecutive "not running" before flipping
+        self._showing_profile = False     # header vars are being filled from a profile
+        self._menu_names = []
 
         # window-move debounce
         self._move_job = None
         self._move_active = False
         self._prev_geo = None
 
-        # controller + initial paths
-        self.controller = ServerController(on_output=self._on_output, on_exit=self._on_exit)
-        self.jar_path = self.controller.find_jar()
-        self._server_root = self._derive_server_root(self.jar_path)
-        self._max_players = self._read_max_players()
+        # minimized: tabs stop drawing, the bus is drained less often, servers are still supervised
+        self._window_visible = True
+
+        # every server (controller, monitors, console store, metrics) lives in the manager;
+        # the header and tabs show whichever one is selected. If a daemon is running
+        # (python daemon.py) it owns the servers and the manager is its client.
+        self.manager = self._daemon_manager() or self._local_manager()
+        self.server = self.manager.get(self.manager.selected_name) or self.manager.servers[0]
+        self._max_players = self.server.max_players
 
         self._build_ui()
+        self._update_title()
+        self.manager.start()
         self.after(500, self._check_eula_state)
-        self.after(1000 * PLAYER_LIST_POLL_SECS, self._tick_player_poll)
-        self.after(2000, self._tick_proc_state)
+        self.after(1000 * TICK_POLL_SECS, self._tick_tps_poll)
+        self.after(1000, self._tick_proc_state)
+        self.after(UI_FRAME_MS, self._drain_bus)
         self.bind("<Configure>", self._on_configure_window)
+        self.bind("<Unmap>", lambda e: e.widget is self and self._set_window_visible(False))
+        self.bind("<Map>", lambda e: e.widget is self and self._set_window_visible(True))
 
     # ---------------- UI ----------------
     def _build_ui(self):
@@ -106,7 +110,7 @@ class ServerApp(ctk.CTk):
         # Row 0 — Server jar  (logo removed; shift back left)
         ctk.CTkLabel(top, text="Server jar:").grid(row=0, column=C(0), padx=5, pady=6, sticky="e")
 
-        self.jar_var = ctk.StringVar(value=self.jar_path)
+        self.jar_var = ctk.StringVar(value=self.server.profile.jar_path)
         self.jar_var.trace_add("write", self._on_jar_change)
 
         jar_frame = ctk.CTkFrame(
@@ -135,18 +139,18 @@ class ServerApp(ctk.CTk):
 
         # Row 1 — RAM, nogui, max players, verify
         ctk.CTkLabel(top, text="Min RAM:").grid(row=1, column=C(0), pady=5, sticky="e")
-        self.min_ram = ctk.StringVar(value=DEFAULT_MIN_RAM)
+        self.min_ram = ctk.StringVar(value=self.server.profile.min_ram)
         ctk.CTkComboBox(top, variable=self.min_ram,
                         values=[f"{g}G" for g in (1, 2, 3, 4, 6, 8, 10, 12)],
                         width=80).grid(row=1, column=C(1), pady=5, padx=8)
 
         ctk.CTkLabel(top, text="Max RAM:").grid(row=1, column=C(2), pady=5, sticky="e")
-        self.max_ram = ctk.StringVar(value=DEFAULT_MAX_RAM)
+        self.max_ram = ctk.StringVar(value=self.server.profile.max_ram)
         ctk.CTkComboBox(top, variable=self.max_ram,
                         values=[f"{g}G" for g in (1, 2, 3, 4, 6, 8, 10, 12)],
                         width=80).grid(row=1, column=C(3), pady=5, padx=8)
 
-        self.nogui_var = ctk.BooleanVar(value=True)
+        self.nogui_var = ctk.BooleanVar(value=self.server.profile.nogui)
         ctk.CTkCheckBox(top, text="nogui", variable=self.nogui_var)\
             .grid(row=1, column=C(4), pady=5, padx=5, sticky="w")
 
@@ -167,6 +171,14 @@ class ServerApp(ctk.CTk):
         )
         self.verify_btn.grid(row=1, column=C(7), pady=5, padx=6, sticky="w")
 
+        self.rcon_btn = ctk.CTkButton(
+            top, text="Enable RCON", width=100,
+            fg_color=COLORS.get("btn_alt", "#4a4a4a"),
+            hover_color=COLORS.get("btn_hover", "#5a5a5a"),
+            command=self._enable_rcon,
+        )
+        self.rcon_btn.grid(row=1, column=C(8), pady=5, padx=6, sticky="w")
+
         # === Start/Stop/EULA buttons ===
         btns = ctk.CTkFrame(self, fg_color=COLORS["window_bg"])
         btns.pack(pady=8)
@@ -177,38 +189,64 @@ class ServerApp(ctk.CTk):
                                       fg_color=COLORS["red"], width=120, height=32, corner_radius=8, font=("Segoe UI", 10, "bold"), state="disabled")
         self.eula_btn = ctk.CTkButton(btns, text="Accept EULA", command=self._accept_eula,
                                       fg_color=COLORS["button_default"], width=150, height=32, corner_radius=8, font=("Segoe UI", 10, "bold"))
+        self.health_lbl = ctk.CTkLabel(btns, text="● Stopped", text_color=COLORS["muted_text"], font=("Segoe UI", 12))
         self.start_btn.grid(row=0, column=0, padx=10)
         self.stop_btn.grid(row=0, column=1, padx=10)
         self.eula_btn.grid(row=0, column=2, padx=10)
+        self.health_lbl.grid(row=0, column=3, padx=10)
+        self.server_menu = ctk.CTkOptionMenu(btns, values=[], width=160,
+                                             fg_color=COLORS["btn_alt"], button_color=COLORS["btn_alt"],
+                                             command=lambda name: self._select_server(self.manager.get(name)))
+        self._refresh_server_menu()
+        self.server_menu.set(self.server.name)
+        self.server_menu.grid(row=0, column=4, padx=10)
 
         add_hover_effect(self.start_btn, COLORS["green"], COLORS["green_hover"])
         add_hover_effect(self.stop_btn, COLORS["red"], COLORS["red_hover"])
         add_hover_effect(self.eula_btn, COLORS["button_default"], COLORS["btn_hover"])
 
         # --- Folder-style tabs ---
-        tabs = FolderTabs(self, tab_width=110)
+        # only the console is built up front; the others (and their modules) on first select
+        self.tabs = tabs = FolderTabs(self, tab_width=110)
         tabs.pack(fill="both", expand=True, padx=10, pady=(8, 10))
 
         self.console_tab = ConsoleTab(tabs.content, send_callback=self._send_command)
-        self.console_tab.set_max_lines(1200)
-
-        self.stats_tab = StatsTab(tabs.content)
-        self.stats_tab.set_controller(self.controller)
-        self.stats_tab.set_server_root(self._server_root)
-        self.stats_tab.start_loop()
-
-        self.players_tab = PlayersTab(tabs.content, initial_max_players=self._max_players)
+        self.stats_tab = None
+        self.players_tab = None
+        self.servers_tab = None
 
         tabs.add_tab("Console", self.console_tab)
-        tabs.add_tab("Stats", self.stats_tab)
-        tabs.add_tab("Players", self.players_tab)
+        tabs.add_lazy_tab("Stats", self._build_stats_tab)
+        tabs.add_lazy_tab("Players", self._build_players_tab)
+        tabs.add_lazy_tab("Servers", self._build_servers_tab)
         tabs.select("Console")
 
+        self._attach(self.server)
         self._print_line(f"Working dir: {os.getcwd()}")
-        if self._server_root and self._server_root != os.getcwd():
-            self._print_line(f"Server root: {self._server_root}")
+        if self.server.root != os.getcwd():
+            self._print_line(f"Server root: {self.server.root}")
         self._on_jar_change()
 
+    def _build_stats_tab(self):
+        from tabs.stats_tab import StatsTab
+        self.stats_tab = StatsTab(self.tabs.content, metrics=self.server.metrics)
+        return self.stats_tab
+
+    def _build_players_tab(self):
+        from tabs.players_tab import PlayersTab
+        self.players_tab = PlayersTab(self.tabs.content, initial_max_players=self._max_players)
+        self.players_tab.set_sessions(self.server.sessions)
+        self.players_tab.set_players(sorted(self.server.players, key=str.lower))
+        return self.players_tab
+
+    def _build_servers_tab(self):
+        from tabs.servers_tab import ServersTab
+        self.servers_tab = ServersTab(self.tabs.content, self.manager, on_select=self._select_server,
+                                      on_add=self._add_server, on_remove=self._remove_server,
+                                      on_daemon=self._toggle_daemon)
+        self.servers_tab.set_selected(self.server)
+        return self.servers_tab
+
     # ------------- window move debounce -------------
     def _on_configure_window(self, _evt=None):
         try:
@@ -229,18 +267,30 @@ class ServerApp(ctk.CTk):
         self._move_active = True
         try: self.console_tab.set_suspended(True)
         except Exception: pass
-        try: self.stats_tab.pause(True)
-        except Exception: pass
+        if self.stats_tab is not None:
+            self.stats_tab.pause(True)
 
     def _end_window_move(self):
         self._move_active = False
         try: self.console_tab.set_suspended(False)
         except Exception: pass
-        try:
-            self.stats_tab.pause(False)
-            self.stats_tab.force_redraw()
-        except Exception:
-            pass
+        if self.stats_tab is not None:
+            try:
+                self.stats_tab.pause(False)
+                self.stats_tab.force_redraw()
+            except Exception:
+                pass
+
+    # ------------- minimize -------------
+    def _set_window_visible(self, visible: bool):
+        """Iconify/deiconify: the selected tab stops (or resumes) drawing; supervision carries on."""
+        if visible == self._window_visible:
+            return
+        self._window_visible = visible
+        if visible:
+            self.manager.pump()           # so the catch-up below includes everything up to now
+            self._show_health()
+        self.tabs.set_window_visible(visible)
 
     # ------------- running state -------------
     def _set_running(self, running: bool):
@@ -261,60 +311,196 @@ class ServerApp(ctk.CTk):
             return f"{mb/1024:.1f} GiB"
         return f"{mb:.0f} MiB"
 
-    def _derive_server_root(self, jar_path: str) -> str:
-        if jar_path and os.path.isfile(jar_path):
-            return os.path.dirname(os.path.abspath(jar_path))
-        return os.path.abspath(getattr(self, "_server_root", os.getcwd()))
-
-    def _props_path(self):
-        root = self._server_root or os.getcwd()
-        return os.path.join(root, SERVER_PROPERTIES)
+    def _props(self):
+        """Cached server.properties of the selected server (re-read only when it changes)."""
+        return self.server.props()
+
+    # ------------- servers -------------
+    def _attach(self, server):
+        """Put a server on screen; the others keep recording into their own stores."""
+        self.server = server
+        server.attach(self.console_tab, self._on_server_change)
+        self.console_tab.set_server_root(server.root)
+        if self.stats_tab is not None:
+            self.stats_tab.set_metrics(server.metrics)
+        if self.players_tab is not None:
+            self.players_tab.set_sessions(server.sessions)
+        if self.servers_tab is not None:
+            self.servers_tab.set_selected(server)
+        self._max_players = server.max_players
+        self._on_server_change(server, "players")
+        self._running_state = None
 
-    def _get_server_port(self) -> int:
-        path = self._props_path()
+    def _select_server(self, server):
+        if server is None or server is self.server:
+            return
+        self._save_profile()
+        self.server.detach()
+        self._attach(server)
+        self.manager.selected_name = server.name
+        self.manager.save()
+        self._show_profile(server)
+
+    def _show_profile(self, server):
+        """Header fields <- a server's profile."""
+        self.server_menu.set(server.name)
+        p = server.profile
+        self._showing_profile = True
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip().startswith("server-port="):
-                        return int(line.split("=", 1)[1].strip())
-        except Exception:
-            pass
-        return 25565
+            self.jar_var.set(p.jar_path)
+            self.min_ram.set(p.min_ram)
+            self.max_ram.set(p.max_ram)
+            self.nogui_var.set(p.nogui)
+            self.max_players_var.set(str(self._max_players))
+        finally:
+            self._showing_profile = False
+        self.jar_status_lbl.configure(text="🟢" if os.path.isfile(p.jar_path) else "🔴",
+                                      text_color="green" if os.path.isfile(p.jar_path) else "red")
+        self._check_eula_state()
 
-    def _is_port_open(self, host="127.0.0.1") -> bool:
-        port = self._get_server_port()
+    def _add_server(self):
+        file_path = filedialog.askopenfilename(
+            title="Select Server Jar for the new server",
+            filetypes=[("Java JAR files", "*.jar"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        root = os.path.dirname(os.path.abspath(file_path))
+        if any(s.root == root for s in self.manager.servers):
+            messagebox.showinfo("Add server", "That server folder is already managed.")
+            return
+        try:
+            server = self.manager.add(ServerProfile(self.manager.unique_name(root), file_path,
+                                                    self.min_ram.get(), self.max_ram.get(), self.nogui_var.get()))
+        except Exception as e:
+            messagebox.showerror("Add server", str(e))
+            return
+        self._refresh_server_menu()
+        self._select_server(server)
+        self._print_line(f"Added server {server.name} ({root})")
+
+    def _remove_server(self, server):
+        others = [s for s in self.manager.servers if s is not server]
+        if server.controller.is_running() or not others:
+            messagebox.showinfo("Remove server", "Stop the server first (and keep at least one).")
+            return
+        if server is self.server:
+            self._select_server(others[0])
+        self.manager.remove(server)
+        self._refresh_server_menu()
+        if self.servers_tab is not None:
+            self.servers_tab.refresh()
+
+    def _refresh_server_menu(self):
+        self._menu_names = [s.name for s in self.manager.servers]
+        self.server_menu.configure(values=self._menu_names)
+
+    # ------------- daemon -------------
+    def _local_manager(self, read_only_roots=()) -> ServerManager:
+        manager = ServerManager(read_only_roots=read_only_roots)
+        manager.load(default_jar=ServerController().find_jar())
+        return manager
+
+    def _daemon_manager(self):
+        """A client of the running daemon (a RemoteManager), or None if there is none."""
+        if not os.path.isfile(DAEMON_FILE):
+            return None
+        from remote_manager import RemoteManager       # client code only loads when a daemon exists
+        from utils.localhttp import load_endpoint
+        endpoint = load_endpoint(DAEMON_FILE)
+        if endpoint is None:
+            return None
+        manager = RemoteManager(endpoint)
         try:
-            with socket.create_connection((host, port), timeout=0.25):
-                return True
+            manager.load()
         except Exception:
-            return False
-
-    # ------------- controller callbacks -------------
-    def _on_output(self, line: str):
-        """Called from ServerController thread."""
-        self._print_line(line)
-
-        updated = maybe_parse_players(line, self.players)
-        if updated is not None:
-            self.players = updated
-            self.players_tab.set_players(sorted(self.players, key=str.lower))
+            return None
+        return manager
+
+    def _toggle_daemon(self):
+        """Attach to a running daemon, or detach from it (its servers keep running)."""
+        if self.manager.remote:
+            self._save_profile()
+            # the daemon still runs these roots and writes their metrics/session logs: watch only
+            roots = {s.root for s in self.manager.servers}
+            self._use_manager(self._local_manager(read_only_roots=roots))
+            self._print_line("Detached from the daemon; its servers keep running and are read-only here "
+                             "(attach again to control them).")
+            return
+        if any(s.controller.has_stdin for s in self.manager.servers):
+            messagebox.showinfo("Attach to daemon", "Stop the servers this window started first; "
+                                                    "the daemon can only show servers it started.")
+            return
+        remote = self._daemon_manager()
+        if remote is None:
+            messagebox.showinfo("Attach to daemon", "No Tempo daemon is running.\n"
+                                                    "Start one with:  python daemon.py")
+            return
+        self._save_profile()
+        self._use_manager(remote)
+        self._print_line("Attached to the daemon; closing this window leaves its servers running.")
+
+    def _use_manager(self, manager):
+        """Swap the local manager for a daemon client or back; the tabs follow."""
+        self.server.detach()
+        self.manager.stop()
+        self.manager = manager
+        manager.start()
+        if self.servers_tab is not None:
+            self.servers_tab.set_manager(manager)
+        self._refresh_server_menu()
+        server = manager.get(manager.selected_name) or manager.servers[0]
+        self._attach(server)
+        self._show_profile(server)
+        self._update_title()
+
+    def _update_title(self):
+        self.title(f"{APP_TITLE} (daemon)" if self.manager.remote else APP_TITLE)
+
+    def _save_profile(self):
+        """Header fields -> the selected server's profile."""
+        p = self.server.profile._replace(min_ram=self.min_ram.get(), max_ram=self.max_ram.get(),
+                                         nogui=bool(self.nogui_var.get()))
+        if p != self.server.profile:
+            self.server.set_profile(p)
+            self.manager.save()
+
+    def _on_server_change(self, server, what):
+        """ManagedServer callback (Tk thread) for the server on screen."""
+        if what == "players":
+            if self.players_tab is not None:
+                self.players_tab.set_players(sorted(server.players, key=str.lower))
+                self.players_tab.set_max_players(server.max_players)
             self.players_version += 1
-
-        counts = parse_online_counts(line)
-        if counts:
-            _, running_max = counts
-            self.players_tab.set_max_players(running_max)
-
-    def _on_exit(self, _rc):
-        def apply():
+        elif what == "exit":
             self._set_running(False)
-            self.players.clear()
-            self.players_tab.set_players([])
-        self.after(0, apply)
+        elif what == "root":
+            self._on_root_change()           # a daemon's server: its reply to set_profile came in
+
+    def _on_root_change(self):
+        """The server on screen now lives in another folder: point the tabs at its files."""
+        if self.stats_tab is not None:
+            self.stats_tab.set_metrics(self.server.metrics)
+        if self.players_tab is not None:
+            self.players_tab.set_sessions(self.server.sessions)
+        self.console_tab.set_server_root(self.server.root)
+
+    def _drain_bus(self):
+        """Tk thread: apply everything the worker threads published since the last frame."""
+        self.manager.pump()
+        self.after(UI_FRAME_MS if self._window_visible else MINIMIZED_PUMP_MS, self._drain_bus)
+
+    def destroy(self):
+        try:
+            self._save_profile()
+            self.manager.stop()
+        except Exception:
+            pass
+        super().destroy()
 
     # ------------- UI helpers -------------
     def _print_line(self, text: str):
-        self.console_tab.print_line(text)
+        self.server.print_line(text)
         self._last_lines.append(text)
 
     def _browse_jar(self):
@@ -327,15 +513,20 @@ class ServerApp(ctk.CTk):
             self._print_line(f"Selected server jar: {os.path.basename(file_path)}")
 
     def _on_jar_change(self, *_):
+        if self._showing_profile:
+            return
         path = (self.jar_var.get() or "").strip()
         if path and os.path.isfile(path):
-            self._server_root = self._derive_server_root(path)
-            self.stats_tab.set_server_root(self._server_root)
+            if self.server.set_profile(self.server.profile._replace(jar_path=path)):
+                self._on_root_change()
+            self.manager.save()
+            self.console_tab.set_server_root(self.server.root)
             self._print_line(f"Server jar set to: {os.path.basename(path)}")
-            self._print_line(f"Server root: {self._server_root}")
+            self._print_line(f"Server root: {self.server.root}")
             self.jar_status_lbl.configure(text="🟢", text_color="green")
             self._max_players = self._read_max_players()
-            self.players_tab.set_max_players(self._max_players)
+            if self.players_tab is not None:
+                self.players_tab.set_max_players(self._max_players)
             self._check_eula_state()  # ensure EULA reflects this folder
         else:
             self.jar_status_lbl.configure(text="🔴", text_color="red")
@@ -344,39 +535,12 @@ class ServerApp(ctk.CTk):
 
     # ------------- max players -------------
     def _read_max_players(self) -> int:
-        path = self._props_path()
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    if line.strip().startswith("max-players="):
-                        return int(line.split("=", 1)[1].strip())
-        except Exception:
-            pass
-        return 20
+        return self._props().max_players
 
     def _write_max_players(self, n: int):
-        path = self._props_path()
-        lines, found = [], False
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    lines = f.readlines()
-            except Exception:
-                lines = []
-
-        new_lines = []
-        for ln in lines:
-            if ln.strip().startswith("max-players=") and not found:
-                new_lines.append(f"max-players={n}\n")
-                found = True
-            else:
-                new_lines.append(ln)
-        if not found:
-            new_lines.append(f"max-players={n}\n")
-
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.writelines(new_lines)
+            self._props().set("max-players", n)
+            self.server.max_players = n
             self._print_line(f"Max players set to {n} (applies on next server start).")
         except Exception as e:
             messagebox.showerror("Error", f"Couldn't write server.properties:\n{e}")
@@ -390,7 +554,8 @@ class ServerApp(ctk.CTk):
             return
         self._max_players = val
         self.max_players_var.set(str(val))
-        self.players_tab.set_max_players(val)
+        if self.players_tab is not None:
+            self.players_tab.set_max_players(val)
         self._write_max_players(val)
 
     def _select_all_max_entry(self, _evt=None):
@@ -402,7 +567,7 @@ class ServerApp(ctk.CTk):
 
     def _apply_max_players_event(self, _evt=None):
         self._apply_max_players()
-        running = self.controller.is_running()
+        running = self.server.controller.is_running()
         target = self.stop_btn if running else self.start_btn
         try:
             target.focus_set()
@@ -412,7 +577,7 @@ class ServerApp(ctk.CTk):
 
     # ------------- EULA -------------
     def _check_eula_state(self):
-        exists, accepted = self.controller.check_eula_state(self._server_root)
+        exists, accepted = self.server.controller.check_eula_state(self.server.root)
         if exists and accepted:
             self.eula_btn.configure(text="EULA accepted ✓", state="disabled")
         else:
@@ -420,58 +585,88 @@ class ServerApp(ctk.CTk):
 
     def _accept_eula(self):
         try:
-            self.controller.accept_eula(self._server_root)
+            self.server.controller.accept_eula(self.server.root)
             self._check_eula_state()
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
     # ------------- server control -------------
     def _start_server(self):
-        if self.controller.is_running() or self._is_port_open():
+        server = self.server
+        if server.read_only:
+            messagebox.showinfo("Run by the daemon", "The Tempo daemon runs this server.\n"
+                                                      "Attach to it (Servers → Attach to daemon) to start it.")
+            return
+        if server.controller.is_running() or server.health.state.port_open:
             messagebox.showinfo("Server is running", "A server is already running (port is in use).")
             return
         try:
-            self.controller.start(
-                jar_path=self.jar_var.get().strip(),
-                min_ram=self.min_ram.get(),
-                max_ram=self.max_ram.get(),
-                use_nogui=self.nogui_var.get(),
-                server_root=self._server_root,
-            )
+            self._save_profile()
+            server.start()
+            self.console_tab.reset_counters()
             self._set_running(True)
         except Exception as e:
             messagebox.showerror("Missing jar", str(e))
 
     def _stop_server(self):
-        self.controller.stop()
+        self.server.stop()
+
+    def _send_command(self, raw: str, *, echo: bool = True):
+        return self.server.send_command(raw, echo=echo)
 
-    def _send_command(self, raw: str, *, echo: bool = True) -> bool:
-        return self.controller.send_command(raw, echo=echo)
+    # ------------- RCON -------------
+    def _enable_rcon(self):
+        props = self._props()
+        if props.get("enable-rcon") and props.get("rcon.password"):
+            self._print_line(f"RCON is already enabled on port {props.get('rcon.port')}.")
+            return
+        if not messagebox.askyesno("Enable RCON",
+                                   "Turn on RCON in server.properties with a generated password?\n"
+                                   "It takes effect the next time the server starts."):
+            return
+        try:
+            enable_rcon(props)
+        except Exception as e:
+            messagebox.showerror("Error", f"Couldn't write server.properties:\n{e}")
+            return
+        self._print_line(f"RCON enabled on port {props.get('rcon.port')} (applies on next server start).")
 
     # ------------- Verify RAM (async) -------------
     def _verify_ram(self):
-        if not self.controller.is_running():
+        server = self.server
+        controller = server.controller
+        if not controller.is_running():
             messagebox.showinfo("Verify RAM", "Start the server first, then try again.")
             return
 
-        def worker():
-            info = self.controller.get_heap_limits()
+        # Tk variables are read here, on the Tk thread
+        ui_min, ui_max = self.min_ram.get(), self.max_ram.get()
+
+        def post(text):
+            server.bus.publish("print", text)
+
+        async def check():
+            # runs on the I/O loop: jcmd and `java -version` are awaited, no thread per click
+            info = await controller.heap_limits()
+            java = await java_version()
+            if java:
+                post(f"[verify] Java on PATH: {java}")
             if not info:
-                self._print_line("[verify] Could not read heap limits (server not running?).")
+                post("[verify] Could not read heap limits (server not running?).")
                 return
 
             src = info.get("source", "?")
             init_b = info.get("initial")
             max_b = info.get("max")
-            self._print_line(f"[verify] Heap limits via {src}: Xms={self._fmt_bytes(init_b)}, Xmx={self._fmt_bytes(max_b)}")
+            post(f"[verify] Heap limits via {src}: Xms={self._fmt_bytes(init_b)}, Xmx={self._fmt_bytes(max_b)}")
 
             try:
                 from server_controller import _parse_mem_string_to_bytes as _p
             except Exception:
                 _p = lambda _: None
 
-            ui_xms = _p(self.min_ram.get())
-            ui_xmx = _p(self.max_ram.get())
+            ui_xms = _p(ui_min)
+            ui_xmx = _p(ui_max)
 
             tol = 8 * 1024 * 1024
             warn = []
@@ -482,41 +677,43 @@ class ServerApp(ctk.CTk):
 
             if warn:
                 for w in warn:
-                    self._print_line(f"[verify] ⚠ {w}")
+                    post(f"[verify] ⚠ {w}")
             else:
-                self._print_line("[verify] ✓ JVM heap matches your UI settings (within tolerance).")
+                post("[verify] ✓ JVM heap matches your UI settings (within tolerance).")
 
-        threading.Thread(target=worker, daemon=True).start()
+        controller.io.submit(check())
 
     # ------------- pollers -------------
     def _tick_proc_state(self):
-        try:
-            proc_running = self.controller.is_running()
-        except Exception:
-            proc_running = False
-
-        port_running = False
-        if not proc_running:
-            if self._port_probe_skip <= 0:
-                self._port_probe_skip = 5  # ~10s
-                port_running = self._is_port_open()
-            else:
-                self._port_probe_skip -= 1
-
-        if proc_running or port_running:
-            self._running_false_streak = 0
-            running = True
+        """Record every server's latest sample; reflect the selected one's health in the header."""
+        self.manager.tick()
+        if [s.name for s in self.manager.servers] != self._menu_names:
+            self._refresh_server_menu()       # added/removed by another daemon client
+        if self._window_visible:
+            self._show_health()
+        self.after(1000, self._tick_proc_state)
+
+    def _show_health(self):
+        """Header: the selected server's health."""
+        st = self.server.health.state
+        self._set_running(st.running)
+        if st.proc_alive and not st.port_open:
+            text, color = "● Starting…", "#d6a21e"
+        elif st.running and st.port_open:
+            text = f"● Running · port {st.port}" + (f" · {st.latency_ms:.0f} ms" if st.latency_ms is not None else "")
+            if not st.proc_alive:
+                text += " (external)"
+            color = COLORS["green_hover"]
+        elif st.running:
+            text, color = "● Running", COLORS["green_hover"]
         else:
-            self._running_false_streak += 1
-            running = False if self._running_false_streak >= 2 else (self._running_state if self._running_state is not None else False)
-
-        self._set_running(running)
-        self.after(2000, self._tick_proc_state)
+            text, color = "● Stopped", COLORS["muted_text"]
+        if self.health_lbl.cget("text") != text:
+            self.health_lbl.configure(text=text, text_color=color)
 
-    def _tick_player_poll(self):
-        if self.controller.is_running():
-            self._send_command("list", echo=False)
-        self.after(1000 * PLAYER_LIST_POLL_SECS, self._tick_player_poll)
+    def _tick_tps_poll(self):
+        self.manager.poll_ticks()
+        self.after(1000 * TICK_POLL_SECS, self._tick_tps_poll)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,112 @@
+# bench/bench_parsers.py
+"""
+Micro-benchmark: legacy per-line scans vs the single-pass classifier.
+
+    python bench/bench_parsers.py                 # synthetic Fabric log (200k lines)
+    python bench/bench_parsers.py logs/latest.log # your own captured log
+"""
+import os, re, sys, random, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.parsers import classify_line  # noqa: E402
+
+
+# ---- the three scans every line used to go through ----
+_ansi = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+_re_error = re.compile(r"\b(error|fatal|severe)\b", re.IGNORECASE)
+_re_warn = re.compile(r"\b(warn|warning)\b", re.IGNORECASE)
+_re_done = re.compile(r"\b(done|started|eula accepted)\b", re.IGNORECASE)
+_re_mc_l = re.compile(r"\[.+?/(INFO|WARN|ERROR|DEBUG|TRACE)\]")
+
+
+def _legacy_players(line, current):
+    players = set(current)
+    low = line.lower()
+    if "players online" in low:
+        marker = low.rfind("players online:")
+        seg = line[marker + len("players online:"):].strip() if marker != -1 else ""
+        players = {n.strip() for n in seg.split(",") if n.strip()}
+    m = re.search(r"]:\s*([A-Za-z0-9_]{1,16})\s+(joined|left) the game", line)
+    if m:
+        (players.add if m.group(2) == "joined" else players.discard)(m.group(1))
+    return players
+
+
+def _legacy_counts(line):
+    return re.search(r"There are\s+(\d+)\s+of a max of\s+(\d+)\s+players online", line, flags=re.IGNORECASE)
+
+
+def _legacy_tag(line):
+    s = _ansi.sub("", line)
+    if s.lower().startswith("[verify]"):
+        return "LOG_SUCCESS"
+    if s.startswith("> "):
+        return "LOG_CMD"
+    m = _re_mc_l.search(s)
+    if m and m.group(1).upper() in ("ERROR", "WARN"):
+        return "LOG_" + m.group(1).upper()
+    if _re_error.search(s):
+        return "LOG_ERROR"
+    if "unknown or incomplete command" in s.lower():
+        return "LOG_WARN"
+    if _re_warn.search(s):
+        return "LOG_WARN"
+    if _re_done.search(s):
+        return "LOG_SUCCESS"
+    return None
+
+
+def synthetic_log(n=200_000, seed=7):
+    """A chunk-generation-heavy Fabric session with joins, lists and lag warnings."""
+    rnd = random.Random(seed)
+    names = [f"Player{i}" for i in range(40)]
+    templates = [
+        (60, "[{t}] [Worker-Main-{w}/INFO]: Preparing spawn area: {p}%"),
+        (15, "[{t}] [Server thread/INFO]: <{n}> anyone got iron?"),
+        (6, "[{t}] [Server thread/WARN]: {n} moved too quickly! -3.1,0.0,2.4"),
+        (5, "[{t}] [Server thread/INFO]: {n} joined the game"),
+        (5, "[{t}] [Server thread/INFO]: {n} left the game"),
+        (4, "[{t}] [Server thread/INFO]: There are 3 of a max of 20 players online: {n}, Alex, Steve"),
+        (3, "[{t}] [Server thread/WARN]: Can't keep up! Is the server overloaded? Running 2034ms or 40 ticks behind"),
+        (1, "[{t}] [Server thread/ERROR]: Encountered an unexpected exception"),
+        (1, "\x1b[32m[{t}] [Server thread/INFO]: Done (12.345s)! For help, type \"help\"\x1b[0m"),
+    ]
+    weights = [w for w, _ in templates]
+    out = []
+    for i in range(n):
+        _, tpl = rnd.choices(templates, weights)[0]
+        out.append(tpl.format(t=f"12:{(i // 60) % 60:02d}:{i % 60:02d}", w=i % 8, p=i % 100, n=rnd.choice(names)))
+    return out
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8", errors="replace") as f:
+            lines = [ln.rstrip("\n") for ln in f]
+        label = os.path.basename(sys.argv[1])
+    else:
+        lines = synthetic_log()
+        label = "synthetic"
+
+    players = set()
+    t0 = time.perf_counter()
+    for ln in lines:
+        players = _legacy_players(ln, players)
+        _legacy_counts(ln)
+        _legacy_tag(ln)
+    legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for ln in lines:
+        classify_line(ln)
+    single = time.perf_counter() - t0
+
+    n = len(lines)
+    print(f"{label}: {n} lines")
+    print(f"  legacy 3-scan : {legacy * 1e3:8.1f} ms  ({n / legacy:,.0f} lines/s)")
+    print(f"  classify_line : {single * 1e3:8.1f} ms  ({n / single:,.0f} lines/s)")
+    print(f"  speedup       : {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
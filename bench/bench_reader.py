@@ -0,0 +1,76 @@
+# bench/bench_reader.py
+"""
+Reader throughput: a fake "java" process floods stdout with N log lines and we
+time how long ServerController takes to hand all of them to the app.
+
+    python bench/bench_reader.py [lines]      # default 100000
+"""
+import os, subprocess, sys, tempfile, threading, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server_controller import ServerController  # noqa: E402
+
+FAKE_JAVA = r'''
+import sys
+n = int(sys.argv[1])
+# pre-render so the writer is never the bottleneck, then flood in 16 KiB writes
+data = "".join(f"[12:00:00] [Worker-Main-{i % 8}/INFO]: Preparing spawn area: {i % 100}% éè {i}\n"
+               for i in range(n)).encode("utf-8")
+out = sys.stdout.buffer
+for i in range(0, len(data), 16384):
+    out.write(data[i:i + 16384])
+out.flush()
+'''
+
+
+def run_legacy(script, n):
+    """The old path: text=True, bufsize=1, one callback + rstrip per line."""
+    count = 0
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, script, str(n)], stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, bufsize=1, encoding="utf-8")
+    for line in proc.stdout:
+        line.rstrip("\n")
+        count += 1
+    proc.wait()
+    return time.perf_counter() - t0, count, count
+
+
+def run_controller(script, n, batched):
+    done = threading.Event()
+    stats = {"lines": 0, "calls": 0}
+
+    def on_line(_line):
+        stats["lines"] += 1
+        stats["calls"] += 1
+
+    def on_batch(lines):
+        stats["lines"] += len(lines)
+        stats["calls"] += 1
+
+    ctl = ServerController(on_output=on_line, on_exit=lambda rc: done.set(),
+                           on_output_batch=on_batch if batched else None)
+    ctl.server_root = os.path.dirname(script)
+    t0 = time.perf_counter()
+    ctl._launch([sys.executable, script, str(n)])
+    done.wait()
+    return time.perf_counter() - t0, stats["lines"] - 1, stats["calls"]  # minus our exit line
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "fake_java.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(FAKE_JAVA)
+
+        print(f"fake java writing {n} lines")
+        for label, fn in (("text/per-line (old)", lambda: run_legacy(script, n)),
+                          ("bytes/per-line", lambda: run_controller(script, n, False)),
+                          ("bytes/batched", lambda: run_controller(script, n, True))):
+            secs, lines, calls = fn()
+            print(f"  {label:20s}: {secs * 1e3:7.1f} ms  {lines / secs:>12,.0f} lines/s  {calls:>7} callbacks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# bench/bench_startup.py
+"""
+Cold start: import time per module (python -X importtime) and time to the
+first frame of the window, each in a fresh interpreter, best of N runs.
+
+    python bench/bench_startup.py [--runs 5] [--top 15]
+                                  [--budget-ms 1500] [--import-budget-ms 400]
+
+With a budget the script exits 1 when the measurement goes over it, so it
+can guard against regressions. Time to first frame needs a display; without
+one only the import times are reported.
+"""
+import argparse, json, os, subprocess, sys, tempfile, time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OWN = ("app", "config", "theme", "server_controller", "server_manager", "remote_manager",
+       "daemon", "tabs", "utils", "widgets")
+
+# runs in a scratch working dir so the app's profile/metrics files land there
+FIRST_FRAME = r'''
+import json, sys, time
+t_start = time.time()
+sys.path.insert(0, sys.argv[1])
+try:
+    import app
+    t_import = time.time()
+    ui = app.ServerApp()
+    t_init = time.time()
+except Exception as e:
+    print(json.dumps({"error": f"{type(e).__name__}: {e}"}))
+    sys.exit(0)
+stamps = {}
+
+def drawn():
+    stamps["frame"] = time.time()
+    ui.after(0, ui.destroy)
+
+def mapped(e):
+    # the window is mapped; its first paint is done once idle work queued before now has run
+    if e.widget is ui and "map" not in stamps:
+        stamps["map"] = time.time()
+        ui.after_idle(drawn)
+
+ui.bind("<Map>", mapped, add="+")
+ui.mainloop()
+print(json.dumps({"start": t_start, "import": t_import, "init": t_init, **stamps}))
+'''
+
+
+def import_times(runs: int, cwd: str) -> dict:
+    """module -> (self us, cumulative us), best of `runs` fresh interpreters."""
+    best = {}
+    for _ in range(runs):
+        res = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {ROOT!r}); import app"],
+                             cwd=cwd, capture_output=True, text=True)
+        for line in res.stderr.splitlines():
+            if not line.startswith("import time:") or "|" not in line:
+                continue
+            try:
+                self_us, cum_us, name = (p.strip() for p in line[len("import time:"):].split("|"))
+                self_us, cum_us = int(self_us), int(cum_us)
+            except ValueError:
+                continue                            # the header line
+            old = best.get(name)
+            if old is None or cum_us < old[1]:
+                best[name] = (self_us, cum_us)
+    return best
+
+
+def first_frame(runs: int, cwd: str):
+    """Best-of-runs phases in ms (process start -> imports -> ServerApp() -> first frame), or an error string."""
+    best = None
+    for _ in range(runs):
+        t0 = time.time()
+        res = subprocess.run([sys.executable, "-c", FIRST_FRAME, ROOT], cwd=cwd, capture_output=True,
+                             text=True, timeout=60)
+        try:
+            out = json.loads(res.stdout.strip().splitlines()[-1])
+        except Exception:
+            return (res.stderr.strip().splitlines() or ["no output"])[-1]
+        if "error" in out:
+            return out["error"]
+        if "frame" not in out:
+            return "the window never mapped"
+        phases = {
+            "interpreter": (out["start"] - t0) * 1e3,
+            "imports": (out["import"] - out["start"]) * 1e3,
+            "ServerApp()": (out["init"] - out["import"]) * 1e3,
+            "first frame": (out["frame"] - out["init"]) * 1e3,
+            "total": (out["frame"] - t0) * 1e3,
+        }
+        if best is None or phases["total"] < best["total"]:
+            best = phases
+    return best
+
+
+def _is_own(name: str) -> bool:
+    return name.split(".")[0] in OWN
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    ap.add_argument("--budget-ms", type=float, default=None, help="fail if time to first frame exceeds this")
+    ap.add_argument("--import-budget-ms", type=float, default=None, help="fail if `import app` exceeds this")
+    args = ap.parse_args()
+    over = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        times = import_times(args.runs, tmp)
+        total = times.get("app", (0, 0))[1] / 1e3
+        print(f"import app: {total:7.1f} ms  (best of {args.runs})")
+        top_level = {}
+        for name, (self_us, _cum) in times.items():
+            key = name.split(".")[0]
+            top_level[key] = top_level.get(key, 0) + self_us
+        print("  by package (self time):")
+        for key, us in sorted(top_level.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {key:28s} {us / 1e3:7.1f} ms" + ("  *" if _is_own(key) else ""))
+        print("  slowest modules (self time):")
+        for name, (self_us, cum_us) in sorted(times.items(), key=lambda kv: -kv[1][0])[:args.top]:
+            print(f"    {name:44s} {self_us / 1e3:6.1f} ms self {cum_us / 1e3:7.1f} ms total"
+                  + ("  *" if _is_own(name) else ""))
+        print("  (* = Tempo's own modules)")
+        if args.import_budget_ms is not None and total > args.import_budget_ms:
+            over.append(f"import app {total:.0f} ms > {args.import_budget_ms:.0f} ms")
+
+        frame = first_frame(args.runs, tmp)
+        if isinstance(frame, str):
+            print(f"time to first frame: skipped ({frame})")
+        else:
+            print(f"time to first frame: {frame['total']:7.1f} ms  (best of {args.runs})")
+            for phase in ("interpreter", "imports", "ServerApp()", "first frame"):
+                print(f"    {phase:14s} {frame[phase]:7.1f} ms")
+            if args.budget_ms is not None and frame["total"] > args.budget_ms:
+                over.append(f"first frame {frame['total']:.0f} ms > {args.budget_ms:.0f} ms")
+
+    if over:
+        print("OVER BUDGET: " + "; ".join(over))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,4 +17,33 @@ WORKDIR = os.path.abspath(os.getcwd())
 
 # Players tab behavior
 TIMEOUT_MINUTES = 10          # if you re-enable timeout later
-PLAYER_LIST_POLL_SECS = 15    # run "list" every N seconds
+PLAYER_LIST_POLL_SECS = 15    # Server List Ping (counts + player sample) every N seconds
+
+# Health monitor: process + port checks on the shared I/O loop
+HEALTH_CHECK_SECS = 2         # the header flips to stopped after 2 consecutive misses
+
+# Stats tab: tick monitor (mspt / tick query / spark tps, depending on the server)
+TICK_POLL_SECS = 5            # ask the server for its tick times every N seconds
+
+# Multi-server: profiles (name, jar, JVM settings) of every managed server
+SERVERS_FILE = os.path.join(WORKDIR, "tempo-servers.json")
+HOST_SAMPLE_SECS = 1          # one thread samples every server's process tree + the host
+DISCOVER_RETRY_SECS = 30      # look for a server we didn't start (port open, no process of ours) this often
+
+# Headless daemon (python daemon.py): local API + event streams the GUI attaches to
+DAEMON_HOST = "127.0.0.1"     # loopback only
+DAEMON_PORT = 25590
+DAEMON_FILE = os.path.join(WORKDIR, "tempo-daemon.json")   # where it listens + its access token
+DAEMON_PUMP_MS = 50           # how often the daemon applies worker events (it has no frames to draw)
+DAEMON_RING_FRAMES = 1024     # encoded console/state batches kept for slow stream clients
+DAEMON_BACKLOG_LINES = 5000   # console lines a client gets when it attaches
+
+# Console scrollback (lines kept in the compact in-memory store)
+CONSOLE_SCROLLBACK_LINES = 500_000
+
+# Reader thread -> Tk thread event bus
+EVENT_BUS_CAPACITY = 1024     # pending events (each stdout read is one event)
+EVENT_BUS_POLICY = "coalesce" # "block", "drop_oldest" or "coalesce"
+EVENT_BUS_BLOCK_TIMEOUT = 0.5 # "block": longest a worker thread waits for room (never the I/O loop)
+UI_FRAME_MS = 16              # Tk drains the bus once per frame
+MINIMIZED_PUMP_MS = 250       # ...and only this often while the window is minimized (nothing is drawn)
@@ -0,0 +1,456 @@
+# daemon.py
+import argparse, asyncio, json, os, secrets, signal, threading, time
+
+from config import (
+    DAEMON_HOST, DAEMON_PORT, DAEMON_FILE, DAEMON_PUMP_MS, DAEMON_RING_FRAMES, DAEMON_BACKLOG_LINES,
+    TICK_POLL_SECS,
+)
+from server_controller import ServerController, STOP_GRACE_SEC, KILL_GRACE_SEC
+from server_manager import ServerManager, ServerProfile, status_of
+from utils.aioloop import shared_loop
+from utils.commands import CommandError, UnknownCommandError
+from utils.fanout import FanoutRing
+from utils.localhttp import (
+    Endpoint, HttpError, MAX_HEAD_BYTES, SSE_HEAD, SSE_KEEPALIVE, authorized, json_response, read_request,
+    remove_endpoint, save_endpoint, sse_event, unix_sockets_supported,
+)
+from utils.parsers import classify_line, line_class
+
+KEEPALIVE_SEC = 15.0          # comment line on idle streams, so dead clients are noticed
+COMMAND_TIMEOUT_SEC = 10.0
+BACKLOG_CHUNK = 512           # scrollback lines per write when a client attaches
+
+
+def _log(text: str):
+    print(time.strftime("[%H:%M:%S] ") + text, flush=True)
+
+
+def _one_line(text: str) -> str:
+    return text.replace("\r", "").replace("\n", " ")
+
+
+def server_state(server) -> dict:
+    """Everything a client shows about one server, as JSON."""
+    st, snap, m = server.health.state, server.sampler.latest, server.metrics
+    return {
+        "name": server.name,
+        "profile": server.profile._asdict(),
+        "root": server.root,
+        "status": status_of(st),
+        "running": server.controller.is_running(),
+        "health": st._asdict(),
+        "sample": snap._asdict(),
+        "mspt": m.last_mspt,
+        "tps": m.last_tps,
+        "tick_ts": m.last_tick_ts,
+        "lag_warnings": m.lag_warnings,
+        "players": sorted(server.players, key=str.lower),
+        "online_since": {name: rec.online_since for name, rec in server.sessions.online.items()},
+        "max_players": server.max_players,
+    }
+
+
+def _profile_fields(body: dict) -> dict:
+    """Validated ServerProfile fields from a request body (only the ones present)."""
+    out = {}
+    if "jar_path" in body:
+        jar = str(body["jar_path"] or "")
+        if not os.path.isfile(jar):
+            raise HttpError(400, "server jar not found")
+        out["jar_path"] = os.path.abspath(jar)
+    for key in ("min_ram", "max_ram"):
+        if key in body:
+            out[key] = str(body[key]).strip().upper()
+    if "nogui" in body:
+        out["nogui"] = bool(body["nogui"])
+    return out
+
+
+class _StreamConsole:
+    """
+    Stands in for the ConsoleTab a ManagedServer is attached to: lines still
+    go into the server's LineStore, and every pump's worth of them becomes
+    one encoded SSE frame in the server's FanoutRing.
+    """
+    def __init__(self, store):
+        self.store = store
+        self.ring = FanoutRing(DAEMON_RING_FRAMES)
+        self.published = store.end        # line id one past the last line handed to the ring
+        self._parts = []
+
+    def set_store(self, store):
+        self.store = store
+
+    def add_parsed(self, parsed):
+        self._add(parsed.text, line_class(parsed))
+
+    def print_line(self, text: str, level: int | None = None):
+        self._add(text, line_class(classify_line(text)) if level is None else level)
+
+    def _add(self, text: str, cls: int):
+        gid = self.store.end
+        self.store.append(text, cls)
+        self._parts.append(sse_event("line", f"{cls}\t{_one_line(text)}", gid))
+
+    def flush(self):
+        if self._parts:
+            self.ring.publish("".join(self._parts).encode("utf-8"))
+            self._parts.clear()
+        self.published = self.store.end
+
+
+class TempoDaemon:
+    """
+    Tempo without a window. Owns a ServerManager (controllers, monitors,
+    console stores, metrics) and serves it over a small local HTTP API on
+    loopback and/or a Unix socket; every request needs the token written to
+    DAEMON_FILE. Requests, streams and the pump/tick work the Tk thread does
+    in the app all run on the shared I/O loop.
+
+    GET    /api/state                    host + every server
+    GET    /api/events                   SSE 'state' (same JSON) each second and on changes
+    POST   /api/servers                  add {jar_path, name?, min_ram?, max_ram?, nogui?}
+    GET    /api/servers/<name>           one server
+    PUT    /api/servers/<name>           change its profile
+    DELETE /api/servers/<name>           forget a stopped server
+    POST   /api/servers/<name>/start     (and /stop)
+    POST   /api/servers/<name>/command   {command, echo?} -> {lines: reply}
+    GET    /api/servers/<name>/console   SSE 'line' events "<class>\\t<text>", id = line id;
+                                         backlog from ?since=, Last-Event-ID or ?tail=
+    GET    /api/servers/<name>/heap      Xms/Xmx of the running JVM
+
+    Stream frames are encoded once and shared by every client (FanoutRing).
+    """
+    def __init__(self, manager: ServerManager | None = None, host: str = DAEMON_HOST,
+                 port: int | None = DAEMON_PORT, unix_path: str | None = None, endpoint_file: str = DAEMON_FILE):
+        self.manager = manager or ServerManager()
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.endpoint_file = endpoint_file
+        self.token = secrets.token_urlsafe(24)
+        self.io = shared_loop()
+        self.state_ring = FanoutRing(DAEMON_RING_FRAMES)
+        self.consoles = {}             # ManagedServer -> _StreamConsole
+        self._listeners = []
+        self._pump_task = None
+        self._dirty = True             # publish a state frame on the next pump
+        self._routes = {
+            ("GET", None): self._api_server,
+            ("PUT", None): self._api_profile,
+            ("DELETE", None): self._api_remove,
+            ("POST", "start"): self._api_start,
+            ("POST", "stop"): self._api_stop,
+            ("POST", "command"): self._api_command,
+            ("GET", "console"): self._api_console,
+            ("GET", "heap"): self._api_heap,
+        }
+
+    # ----- lifecycle (main thread) -----
+    def start(self, default_jar: str = ""):
+        self.manager.load(default_jar=default_jar)
+        self.io.submit(self._open()).result()
+        self.manager.start()
+        save_endpoint(self.endpoint_file, Endpoint(self.host if self.port is not None else None,
+                                                   self.port, self.unix_path, self.token))
+
+    def close(self, timeout: float = STOP_GRACE_SEC + KILL_GRACE_SEC + 2.0):
+        """Stop every server it started (escalating like the Stop button), then the API.
+        Servers it only follows (found already running) keep running."""
+        for s in self.manager.servers:
+            if s.controller.has_stdin:
+                s.stop()
+        deadline = time.monotonic() + timeout
+        while any(s.controller.has_stdin for s in self.manager.servers) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        try:
+            self.io.submit(self._close()).result(5.0)
+        except Exception:
+            pass
+        self.manager.stop()
+        remove_endpoint(self.endpoint_file)
+
+    def where(self) -> str:
+        parts = []
+        if self.port is not None:
+            parts.append(f"http://{self.host}:{self.port}")
+        if self.unix_path:
+            parts.append(f"unix:{self.unix_path}")
+        return " and ".join(parts)
+
+    # ----- loop thread -----
+    async def _open(self):
+        for s in self.manager.servers:
+            self._watch(s)
+        if self.port is not None:
+            srv = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEAD_BYTES)
+            self.port = srv.sockets[0].getsockname()[1]       # the real one if 0 was asked for
+            self._listeners.append(srv)
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)                        # stale socket from a crashed daemon
+            srv = await asyncio.start_unix_server(self._handle, self.unix_path, limit=MAX_HEAD_BYTES)
+            os.chmod(self.unix_path, 0o600)
+            self._listeners.append(srv)
+        self._pump_task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _close(self):
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+        self._pump()                     # last lines (exit messages) still reach the stores
+        for console in self.consoles.values():
+            console.ring.close()
+        self.state_ring.close()
+        for srv in self._listeners:
+            srv.close()
+        if self.unix_path:
+            try:
+                os.remove(self.unix_path)
+            except Exception:
+                pass
+
+    def _watch(self, server):
+        console = _StreamConsole(server.store)
+        self.consoles[server] = console
+        server.attach(console, self._on_change)
+
+    def _on_change(self, server, what):
+        self._dirty = True
+
+    def _pump(self):
+        self.manager.pump()
+        for console in self.consoles.values():
+            console.flush()
+
+    async def _run(self):
+        """Does what the app's Tk timers do: pump worker events, tick once a second, poll ticks."""
+        loop = asyncio.get_running_loop()
+        next_tick = next_poll = loop.time()
+        while True:
+            try:
+                self._pump()
+                now = loop.time()
+                if now >= next_tick:
+                    next_tick = now + 1.0
+                    self.manager.tick()
+                    self._dirty = True
+                if now >= next_poll:
+                    next_poll = now + TICK_POLL_SECS
+                    self.manager.poll_ticks()
+                if self._dirty:
+                    self._dirty = False
+                    self.state_ring.publish(sse_event("state", json.dumps(self.state())).encode("utf-8"))
+            except Exception as e:
+                _log(f"pump error: {e}")
+            await asyncio.sleep(DAEMON_PUMP_MS / 1000)
+
+    def state(self) -> dict:
+        return {"host": self.manager.host._asdict(), "servers": [server_state(s) for s in self.manager.servers]}
+
+    # ----- HTTP -----
+    async def _handle(self, reader, writer):
+        try:
+            req = await read_request(reader)
+            if req is None:
+                return
+            if not authorized(req, self.token):
+                raise HttpError(401)
+            await self._route(req, writer)
+        except HttpError as e:
+            writer.write(json_response(e.status, {"error": str(e)}))
+        except ConnectionError:
+            pass
+        except Exception as e:
+            _log(f"request failed: {e}")
+            writer.write(json_response(500, {"error": str(e)}))
+        finally:
+            try:
+                await writer.drain()
+            except Exception:
+                pass
+            writer.close()
+
+    async def _route(self, req, writer):
+        parts, method = req.parts, req.method
+        if parts[:1] != ("api",):
+            raise HttpError(404)
+        parts = parts[1:]
+        if parts == ("state",) and method == "GET":
+            writer.write(json_response(200, self.state()))
+        elif parts == ("events",) and method == "GET":
+            writer.write(SSE_HEAD)
+            await self._follow(writer, self.state_ring, max(self.state_ring.head, self.state_ring.tail - 1))
+        elif parts == ("servers",) and method == "POST":
+            writer.write(json_response(201, self._add(req.json())))
+        elif len(parts) in (2, 3) and parts[0] == "servers":
+            server = self.manager.get(parts[1])
+            if server is None:
+                raise HttpError(404, f"no server named {parts[1]!r}")
+            action = parts[2] if len(parts) == 3 else None
+            handler = self._routes.get((method, action))
+            if handler is None:
+                raise HttpError(405 if any(a == action for _m, a in self._routes) else 404)
+            await handler(server, req, writer)
+        else:
+            raise HttpError(404)
+
+    async def _follow(self, writer, ring: FanoutRing, cursor: int):
+        """Stream ring frames from cursor until the ring closes or the client goes away."""
+        while True:
+            frames, cursor, skipped = ring.read(cursor)
+            if skipped:
+                writer.write(sse_event("gap", str(skipped)).encode("utf-8"))    # client was too slow
+            if frames:
+                writer.writelines(frames)
+                await writer.drain()
+                continue
+            if ring.closed:
+                return
+            try:
+                await asyncio.wait_for(ring.wait(cursor), KEEPALIVE_SEC)
+            except asyncio.TimeoutError:
+                writer.write(SSE_KEEPALIVE)
+                await writer.drain()
+
+    # ----- endpoints -----
+    def _add(self, body: dict) -> dict:
+        fields = _profile_fields(body)
+        if "jar_path" not in fields:
+            raise HttpError(400, "jar_path is required")
+        root = os.path.dirname(fields["jar_path"])
+        if any(s.root == root for s in self.manager.servers):
+            raise HttpError(409, "that server folder is already managed")
+        name = str(body.get("name") or "").strip() or self.manager.unique_name(root)
+        if self.manager.get(name) is not None:
+            raise HttpError(409, f"there is already a server named {name!r}")
+        server = self.manager.add(ServerProfile(name, **fields))
+        self._watch(server)
+        self._dirty = True
+        _log(f"{name}: added ({root})")
+        return server_state(server)
+
+    async def _api_server(self, server, req, writer):
+        writer.write(json_response(200, server_state(server)))
+
+    async def _api_profile(self, server, req, writer):
+        fields = _profile_fields(req.json())
+        if fields:
+            server.set_profile(server.profile._replace(**fields))
+            self.manager.save()
+            self._dirty = True
+        writer.write(json_response(200, server_state(server)))
+
+    async def _api_remove(self, server, req, writer):
+        if server.controller.is_running():
+            raise HttpError(409, "stop the server first")
+        if not self.manager.remove(server):
+            raise HttpError(409, "keep at least one server")
+        server.detach()
+        self.consoles.pop(server).ring.close()
+        self._dirty = True
+        _log(f"{server.name}: removed")
+        writer.write(json_response(200, {"removed": server.name}))
+
+    async def _api_start(self, server, req, writer):
+        if server.controller.is_running() or server.health.state.port_open:
+            raise HttpError(409, "a server is already running (port is in use)")
+        try:
+            # start() waits for the spawn on this very loop, so it can't be called from here
+            await asyncio.get_running_loop().run_in_executor(None, server.start)
+        except FileNotFoundError as e:
+            raise HttpError(400, str(e))
+        self._dirty = True
+        _log(f"{server.name}: started")
+        writer.write(json_response(200, server_state(server)))
+
+    async def _api_stop(self, server, req, writer):
+        server.stop()
+        self._dirty = True
+        _log(f"{server.name}: stopping")
+        writer.write(json_response(200, server_state(server)))
+
+    async def _api_command(self, server, req, writer):
+        body = req.json()
+        raw = str(body.get("command") or "").strip()
+        if not raw:
+            raise HttpError(400, "no command")
+        handle = server.send_command(raw, echo=bool(body.get("echo", True)))
+        if not handle:
+            raise HttpError(409, "server is not running")
+        lines = []
+        if handle is not True:            # True: sent over RCON, the reply shows up on the console stream
+            try:
+                lines = await asyncio.wait_for(asyncio.wrap_future(handle), COMMAND_TIMEOUT_SEC)
+            except UnknownCommandError:
+                raise HttpError(422, f"unknown command: {raw}")
+            except (TimeoutError, asyncio.TimeoutError):
+                raise HttpError(504, f"no reply to {raw!r}")
+            except CommandError as e:
+                raise HttpError(409, str(e))
+        writer.write(json_response(200, {"command": raw, "lines": lines}))
+
+    async def _api_console(self, server, req, writer):
+        console, store = self.consoles[server], server.store
+        try:
+            last = req.headers.get("last-event-id")
+            if last is not None:
+                since = int(last) + 1
+            elif "since" in req.query:
+                since = int(req.query["since"])
+            else:
+                since = console.published - int(req.query.get("tail", DAEMON_BACKLOG_LINES))
+        except ValueError:
+            raise HttpError(400, "since/tail must be integers")
+        # no await between these two: the backlog ends exactly where the ring picks up
+        cursor, until = console.ring.tail, console.published
+        writer.write(SSE_HEAD)
+        start = max(since, store.first)
+        while start < until:
+            start = max(start, store.first)               # trimmed while we waited on drain()
+            stop = min(start + BACKLOG_CHUNK, until)
+            writer.write("".join(sse_event("line", f"{cls}\t{_one_line(text)}", gid)
+                                 for gid, (text, cls) in enumerate(store.rows(start, stop), start))
+                         .encode("utf-8"))
+            await writer.drain()
+            start = stop
+        await self._follow(writer, console.ring, cursor)
+
+    async def _api_heap(self, server, req, writer):
+        info = await server.controller.heap_limits()
+        if info is None:
+            raise HttpError(409, "server is not running")
+        writer.write(json_response(200, info))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run Tempo without a window; the app attaches to it.")
+    ap.add_argument("--host", default=DAEMON_HOST, help=f"address to listen on (default {DAEMON_HOST})")
+    ap.add_argument("--port", type=int, default=None,
+                    help=f"TCP port (default {DAEMON_PORT}, or none when --unix is given; 0 = any free port)")
+    ap.add_argument("--unix", metavar="PATH", default=None, help="listen on a Unix socket at PATH")
+    args = ap.parse_args(argv)
+    if args.unix and not unix_sockets_supported():
+        ap.error("Unix sockets are not available on this platform")
+    port = args.port if args.port is not None else (None if args.unix else DAEMON_PORT)
+
+    daemon = TempoDaemon(host=args.host, port=port, unix_path=args.unix)
+    try:
+        daemon.start(default_jar=ServerController().find_jar())
+    except OSError as e:
+        ap.exit(1, f"Couldn't listen on {daemon.where()}: {e}\n")
+    _log(f"Tempo daemon on {daemon.where()} with {len(daemon.manager.servers)} server(s); "
+         f"Ctrl+C stops it and its servers.")
+
+    done = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: done.set())
+    try:
+        while not done.wait(0.5):        # short waits so Ctrl+C is seen on Windows too
+            pass
+    finally:
+        _log("Shutting down")
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
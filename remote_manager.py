@@ -0,0 +1,412 @@
+# remote_manager.py
+import asyncio, json, os, time
+
+from config import (
+    EVENT_BUS_CAPACITY, EVENT_BUS_POLICY, EVENT_BUS_BLOCK_TIMEOUT, CONSOLE_SCROLLBACK_LINES, DAEMON_BACKLOG_LINES,
+)
+from server_controller import ServerController
+from server_manager import ServerProfile, ServerSummary, HostUsage, STATUS_STOPPED, unique_name
+from utils.aioloop import shared_loop
+from utils.eventbus import EventBus
+from utils.health import HealthState
+from utils.linestore import LineStore
+from utils.localhttp import HttpError, api_path, event_batches, request
+from utils.parsers import classify_line, line_class
+from utils.properties import properties_for
+from utils.sampler import MetricsSnapshot
+from utils.servermetrics import ServerMetrics
+from utils.sessions import SessionTracker
+
+RETRY_SEC = 2.0               # reconnect delay after a stream drops
+REQUEST_TIMEOUT_SEC = 15.0    # the daemon itself waits up to 10 s for a command's reply
+
+
+class _RemoteHealth:
+    """HealthMonitor stand-in: `state` is whatever the daemon reported last."""
+    def __init__(self):
+        self.state = HealthState(time.time(), False, False, False, None, 25565)
+
+    def check_now(self):
+        pass
+
+
+class _RemoteController:
+    """The parts of ServerController the app calls, answered by the daemon."""
+    pid = None
+
+    def __init__(self, server):
+        self.server = server
+        self.io = server.manager.io
+        self._files = ServerController(archive=False)   # eula.txt lives in the same folder either way
+
+    def is_running(self) -> bool:
+        return self.server.running
+
+    def check_eula_state(self, root=None):
+        return self._files.check_eula_state(root or self.server.root)
+
+    def accept_eula(self, root=None):
+        self._files.accept_eula(root or self.server.root)
+        self.server.print_line("EULA accepted.")
+
+    async def heap_limits(self):
+        try:
+            return await request(self.server.manager.endpoint, "GET",
+                                 api_path("api", "servers", self.server.name, "heap"))
+        except Exception:
+            return None
+
+
+class RemoteServer:
+    """
+    A server the daemon runs, shaped like ManagedServer so the app and tabs
+    show it unchanged. Its state arrives with the manager's event stream,
+    its console lines on a stream of their own into a local LineStore; both
+    go through this server's EventBus and are applied by pump() on the Tk
+    thread. Start/stop/commands are requests on the I/O loop whose errors
+    are printed to the console.
+    """
+    read_only = False       # the daemon controls it; this is how the window does too
+
+    def __init__(self, manager, state: dict):
+        self.manager = manager
+        self.profile = ServerProfile(**state["profile"])
+        self.root = state["root"]
+        self.bus = EventBus(EVENT_BUS_CAPACITY, EVENT_BUS_POLICY, EVENT_BUS_BLOCK_TIMEOUT)
+        self.store = LineStore(CONSOLE_SCROLLBACK_LINES)
+        self.console = None
+        self.on_change = None
+        self.controller = _RemoteController(self)
+        self.health = _RemoteHealth()
+        self.metrics = ServerMetrics(self.root, persist=False)    # the daemon writes the log
+        self.sessions = SessionTracker(self.root, persist=False)  # ...and the session log
+        self.snapshot = None
+        self.running = False
+        self.status = STATUS_STOPPED
+        self.players = set()
+        self.max_players = state["max_players"]
+        self._tick_ts = None
+        self._last_id = None          # id of the last console line received, to resume from
+        self._stream = None
+        self.apply(state)
+
+    @property
+    def name(self) -> str:
+        return self.profile.name
+
+    # ----- lifecycle -----
+    def open(self):
+        if self._stream is None:
+            self._stream = self.manager.io.submit(self._follow_console())
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.cancel()
+            self._stream = None
+
+    def attach(self, console, on_change):
+        console.set_store(self.store)
+        self.console = console
+        self.on_change = on_change
+
+    def detach(self):
+        self.console = None
+        self.on_change = None
+
+    # ----- settings -----
+    def props(self):
+        return properties_for(self.root)
+
+    def port(self) -> int:
+        return self.props().port
+
+    def set_profile(self, profile: ServerProfile) -> bool:
+        """
+        Save settings in the daemon, without waiting for it: the reply is
+        applied by pump(), and a new server root is announced there with
+        on_change(server, "root"). Always returns False.
+        """
+        fields = {k: v for k, v in profile._asdict().items() if k != "name" and getattr(self.profile, k) != v}
+        if not fields:
+            return False
+        self.profile = profile                      # shown right away; the daemon's reply confirms it
+        fut = self.manager.io.submit(request(self.manager.endpoint, "PUT", api_path("api", "servers", self.name),
+                                             fields, timeout=REQUEST_TIMEOUT_SEC))
+
+        def done(f):
+            try:
+                self.bus.publish("state", f.result(), key="state")
+            except Exception as e:
+                self.bus.publish("print", f"[daemon] couldn't save settings: {e or type(e).__name__}")
+
+        fut.add_done_callback(done)
+        return False
+
+    # ----- control -----
+    def start(self):
+        if not os.path.isfile(self.profile.jar_path):
+            raise FileNotFoundError("Server jar not found.")
+        self._post("start")
+
+    def stop(self):
+        self._post("stop")
+
+    def send_command(self, raw: str, *, echo: bool = True):
+        if not raw or self.status == STATUS_STOPPED:
+            return False
+        return self._post("command", {"command": raw, "echo": echo})
+
+    def _post(self, action: str, body=None):
+        fut = self.manager.io.submit(request(self.manager.endpoint, "POST",
+                                             api_path("api", "servers", self.name, action), body,
+                                             timeout=REQUEST_TIMEOUT_SEC))
+
+        def done(f):
+            try:
+                f.result()
+            except HttpError as e:
+                if e.status != 422:                 # unknown commands already show in the console
+                    self.bus.publish("print", f"[daemon] {action}: {e}")
+            except Exception as e:
+                self.bus.publish("print", f"[daemon] {action} failed: {e or type(e).__name__}")
+
+        fut.add_done_callback(done)
+        return fut
+
+    # ----- Tk thread -----
+    def print_line(self, text: str):
+        if self.console is not None:
+            self.console.print_line(text)
+        else:
+            self.store.append(text, line_class(classify_line(text)))
+
+    def pump(self):
+        for kind, payload in self.bus.drain():
+            if kind == "lines":
+                if self.console is not None:
+                    for text, cls in payload:
+                        self.console.print_line(text, cls)
+                else:
+                    self.store.extend(payload)
+            elif kind == "print":
+                self.print_line(payload)
+            elif kind == "state":
+                self.apply(payload)
+
+    def apply(self, state: dict):
+        """One server entry of a daemon state frame."""
+        self.profile = ServerProfile(**state["profile"])
+        if state["root"] != self.root:
+            self.root = state["root"]
+            self.metrics = ServerMetrics(self.root, persist=False)
+            self.sessions = SessionTracker(self.root, persist=False)
+            self._changed("root")
+        self.health.state = HealthState(**state["health"])
+        self.snapshot = MetricsSnapshot(**state["sample"])
+        self.status = state["status"]
+        self.max_players = state["max_players"]
+        tick_ts = state["tick_ts"]
+        if tick_ts is not None and tick_ts != self._tick_ts and state["mspt"] is not None:
+            self._tick_ts = tick_ts
+            self.metrics.on_tick_sample(state["mspt"], state["tps"])
+        self.metrics.lag_warnings = state["lag_warnings"]
+        players = set(state["players"])
+        if players != self.players:
+            self.players = players
+            self.sessions.sync(players)
+            for name, since in state.get("online_since", {}).items():
+                rec = self.sessions.online.get(name)
+                if rec is not None and since is not None:
+                    rec.online_since = since       # the daemon saw them join; this client may have come later
+            self.metrics.set_player_count(len(players))
+            self._changed("players")
+        was_running, self.running = self.running, state["running"]
+        if was_running and not self.running:
+            self._changed("exit")
+
+    def tick(self):
+        if self.snapshot is not None:
+            self.metrics.record(self.snapshot)
+        self.metrics.poll_load()
+
+    def poll_ticks(self):
+        pass                          # the daemon polls
+
+    def summary(self) -> ServerSummary:
+        snap, m = self.snapshot, self.metrics
+        up = self.status != STATUS_STOPPED and snap is not None
+        return ServerSummary(self.name, self.status, m.last_mspt if up else None, m.last_tps if up else None,
+                             snap.rss_mb if up else None, snap.cpu_pct if up else None,
+                             len(self.players), self.max_players)
+
+    def _changed(self, what: str):
+        if self.on_change is not None:
+            self.on_change(self, what)
+
+    # ----- I/O loop -----
+    async def _follow_console(self):
+        """Console stream -> "lines" on the bus, one event per socket read; resumes after drops."""
+        while True:
+            tail = DAEMON_BACKLOG_LINES if self._last_id is None else None
+            try:
+                async for batch in event_batches(self.manager.endpoint,
+                                                 api_path("api", "servers", self.name, "console", tail=tail),
+                                                 last_id=self._last_id):
+                    rows = []
+                    for ev in batch:
+                        if ev.event == "line":
+                            cls, _, text = ev.data.partition("\t")
+                            rows.append((text, int(cls) if cls.isdigit() else 0))
+                            self._last_id = ev.id
+                        elif ev.event == "gap":
+                            if rows:
+                                self.bus.publish("lines", rows)
+                                rows = []
+                            self.bus.publish("print", f"[daemon] {ev.data} console updates skipped (this window fell behind)")
+                    if rows:
+                        self.bus.publish("lines", rows)
+            except asyncio.CancelledError:
+                raise
+            except HttpError as e:
+                if e.status == 404:
+                    return                # removed from the daemon
+            except Exception:
+                pass
+            await asyncio.sleep(RETRY_SEC)
+
+
+class RemoteManager:
+    """
+    ServerManager look-alike for a running daemon (python daemon.py). The
+    daemon owns the servers, their scrollback and metrics; this mirrors
+    them for the app, so stop() only detaches and the servers keep running.
+    The daemon also keeps the profiles file, so save() does nothing.
+    """
+    remote = True
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.io = shared_loop()
+        self.servers = []
+        self.selected_name = None
+        self.host = HostUsage(time.time(), None, None, None, 0.0, 0.0, 0)
+        self.bus = EventBus(EVENT_BUS_CAPACITY, EVENT_BUS_POLICY, EVENT_BUS_BLOCK_TIMEOUT)
+        self.connected = False
+        self._events = None
+
+    def call(self, method: str, path: str, obj=None):
+        """Blocking request (the daemon is local, so this is quick); raises HttpError/OSError."""
+        return self.io.submit(request(self.endpoint, method, path, obj, timeout=REQUEST_TIMEOUT_SEC)) \
+            .result(REQUEST_TIMEOUT_SEC + 1.0)
+
+    # ----- profiles -----
+    def load(self, default_jar: str = ""):
+        """First snapshot of the daemon's servers; raises if the daemon can't be reached."""
+        self._apply(self.call("GET", "/api/state"))
+        self.connected = True
+
+    def save(self):
+        pass
+
+    def unique_name(self, root_or_name: str) -> str:
+        return unique_name(root_or_name, {s.name for s in self.servers})
+
+    # ----- servers -----
+    def add(self, profile: ServerProfile, save: bool = True) -> RemoteServer:
+        state = self.call("POST", "/api/servers", profile._asdict())
+        return self.get(state["name"]) or self._add_server(state)
+
+    def remove(self, server: RemoteServer) -> bool:
+        if server.running or len(self.servers) <= 1:
+            return False
+        try:
+            self.call("DELETE", api_path("api", "servers", server.name))
+        except Exception:
+            return False
+        self.servers.remove(server)
+        server.close()
+        return True
+
+    def get(self, name: str | None) -> RemoteServer | None:
+        for s in self.servers:
+            if s.name == name:
+                return s
+        return None
+
+    # ----- Tk thread -----
+    def pump(self):
+        for kind, payload in self.bus.drain():
+            if kind == "state":
+                self._apply(payload)
+            elif kind == "link":
+                text = "[daemon] reconnected." if payload else "[daemon] connection lost; retrying…"
+                for s in self.servers:
+                    s.print_line(text)
+        for s in self.servers:
+            s.pump()
+
+    def tick(self):
+        for s in self.servers:
+            s.tick()
+
+    def poll_ticks(self):
+        pass
+
+    def start(self):
+        if self._events is None:
+            self._events = self.io.submit(self._follow_events())
+        for s in self.servers:
+            s.open()
+
+    def stop(self):
+        """Detach: close the streams; the daemon's servers keep running."""
+        if self._events is not None:
+            self._events.cancel()
+            self._events = None
+        for s in self.servers:
+            s.close()
+
+    def _apply(self, state: dict):
+        self.host = HostUsage(**state["host"])
+        names = set()
+        for st in state["servers"]:
+            names.add(st["name"])
+            server = self.get(st["name"])
+            if server is None:
+                self._add_server(st)
+            else:
+                server.apply(st)
+        for s in [s for s in self.servers if s.name not in names and s.console is None]:
+            self.servers.remove(s)          # another client removed it
+            s.close()
+
+    def _add_server(self, state: dict) -> RemoteServer:
+        server = RemoteServer(self, state)
+        self.servers.append(server)
+        if self._events is not None:
+            server.open()
+        return server
+
+    # ----- I/O loop -----
+    async def _follow_events(self):
+        lost = False
+        while True:
+            try:
+                async for batch in event_batches(self.endpoint, "/api/events"):
+                    states = [ev for ev in batch if ev.event == "state"]
+                    if not states:
+                        continue
+                    if lost:
+                        lost = False
+                        self.bus.publish("link", True)
+                    self.connected = True
+                    self.bus.publish("state", json.loads(states[-1].data), key="state")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            self.connected = False
+            if not lost:
+                lost = True
+                self.bus.publish("link", False)
+            await asyncio.sleep(RETRY_SEC)
@@ -1,10 +1,12 @@
 # server_controller.py
-import os, subprocess, threading, time
+import asyncio, os, locale, subprocess
 
-try:
-    import psutil
-except Exception:
-    psutil = None
+from utils.aioloop import shared_loop
+from utils.linereader import LineDecoder
+from utils.archive import ConsoleArchive
+from utils.commands import CommandHandle, CommandQueue
+from utils.logtail import LogTailer
+from utils.optional import psutil as _psutil
 
 
 # ---- helpers: parse sizes like "2G", "1024M" into bytes ----
@@ -28,13 +30,77 @@ def _parse_mem_string_to_bytes(s: str | None) -> int | None:
         return None
 
 
+READ_CHUNK = 64 * 1024   # bytes per stdout read; a burst arrives as one batch
+STDIO_ENCODING = locale.getpreferredencoding(False) or "utf-8"
+STOP_GRACE_SEC = 5.0     # after `stop`, terminate the JVM if it is still running
+KILL_GRACE_SEC = 10.0    # after terminate, kill it
+HELPER_TIMEOUT_SEC = 2.0 # jcmd / java -version
+TAIL_POLL_SEC = 0.25     # attached server: check its log this often while it is writing...
+TAIL_IDLE_SEC = 1.0      # ...backing off to this while it is quiet
+ATTACH_CHECK_SEC = 1.0   # attached server: is the process still there?
+
+
+async def run_helper(args, timeout: float = HELPER_TIMEOUT_SEC):
+    """Run a short helper process on the I/O loop -> (returncode, stdout, stderr) as text, or None."""
+    try:
+        p = await asyncio.create_subprocess_exec(*args, stdin=subprocess.DEVNULL,
+                                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception:
+        return None
+    try:
+        out, err = await asyncio.wait_for(p.communicate(), timeout)
+    except asyncio.TimeoutError:
+        try:
+            p.kill()
+        except Exception:
+            pass
+        await p.wait()
+        return None
+    return p.returncode, out.decode(STDIO_ENCODING, "replace"), err.decode(STDIO_ENCODING, "replace")
+
+
+async def java_version(java: str = "java") -> str | None:
+    """First line of `java -version` (printed on stderr), e.g. 'openjdk version "21.0.2" 2024-01-16'."""
+    res = await run_helper([java, "-version"])
+    if res is None:
+        return None
+    text = (res[2] or res[1]).strip()
+    return text.splitlines()[0] if text else None
+
+
+def _alive(ps) -> bool:
+    try:
+        return ps.is_running() and ps.status() != "zombie"
+    except Exception:
+        return False
+
+
 class ServerController:
-    def __init__(self, on_output=None, on_exit=None):
+    def __init__(self, on_output=None, on_exit=None, on_output_batch=None, classify=None, archive=True, io=None):
+        """
+        on_output(line)         -- per-line callback (kept for compatibility)
+        on_output_batch(lines)  -- if given, receives lists of lines instead; one call per stdout read
+        classify(line)          -- optional parsers.classify_line; when set, on_output_batch gets
+                                   ParsedLine objects and the archive records their levels
+        archive                 -- append everything read to a per-session ConsoleArchive
+        io                      -- LoopThread for process I/O (default: the shared one)
+        The process is spawned, read, written and shut down by coroutines on the I/O loop;
+        callbacks run on that loop's thread. With classify set, send_command() returns a
+        CommandHandle that resolves with the server's reply (see utils.commands).
+        """
         self.on_output = on_output or (lambda s: None)
+        self.on_output_batch = on_output_batch
+        self.classify = classify
+        self.archive_enabled = archive
+        self.archive = None
         self.on_exit = on_exit or (lambda rc: None)
-        self.proc = None
+        self.io = io or shared_loop()
+        self.proc = None         # asyncio.subprocess.Process
         self.proc_ps = None
+        self._attached = None    # psutil.Process of a server we follow but didn't launch
+        self._cmd = None
         self.server_root = None  # directory where the server files live
+        self.commands = None     # CommandQueue for the running process
 
     def find_jar(self, pattern="*.jar", search_dirs=None):
         import glob
@@ -55,87 +121,263 @@ class ServerController:
         cmd = ["java", f"-Xms{min_ram}", f"-Xmx{max_ram}", "-jar", jar_path]
         if use_nogui:
             cmd.append("nogui")
+        self._launch(cmd)
+
+    def _launch(self, cmd):
+        """Spawn cmd on the I/O loop and start streaming its output; raises what the spawn raised."""
+        self._open_archive()
+        self.commands = CommandQueue(self._write_stdin, on_sent=self._echo, timers=self.io)
+        self.io.submit(self._spawn(cmd)).result()
+
+    def _open_archive(self):
+        self.archive = None
+        if self.archive_enabled and self.server_root:
+            try:
+                self.archive = ConsoleArchive(self.server_root)
+            except Exception as e:
+                self._emit(f"[archive] disabled: {e}")
+
+    # ---- following a server we didn't launch ----
+    def attach(self, ps_proc, log_path: str | None = None):
+        """
+        Follow a server that is already running (a psutil.Process, see
+        utils.discovery): its log (default <root>/logs/latest.log) is tailed
+        from its current end into the same callbacks as stdout. There is no
+        stdin, so send_command() returns False; on_exit(None) fires when the
+        process goes away. Blocking; not for the I/O loop's own thread.
+        """
+        if self.is_running():
+            raise RuntimeError("A server is already running.")
+        log_path = log_path or os.path.join(self.server_root or os.getcwd(), "logs", "latest.log")
+        self._open_archive()
+        self.commands = None
+        self.proc = None
+        self.io.submit(self._follow(ps_proc, log_path)).result()
+
+    def detach(self):
+        """Stop following an attached server (it keeps running)."""
+        self._attached = None
+
+    async def _follow(self, ps, log_path):
+        self._attached = self.proc_ps = ps
+        try:
+            self._cmd = ps.cmdline()
+        except Exception:
+            self._cmd = None
+        tailer = LogTailer(log_path, encoding="utf-8")    # log4j writes UTF-8 whatever the console uses
+        self._emit(f"[attach] following {os.path.basename(log_path)} of the running server (pid {ps.pid}); "
+                   f"it has no console input here, commands go through RCON if it is enabled")
+        asyncio.get_running_loop().create_task(self._watch(ps, tailer))
 
+    async def _watch(self, ps, tailer):
+        """Tail the log until the process exits (or detach()); file reads run in the default executor."""
+        loop = asyncio.get_running_loop()
+        delay, next_check = TAIL_POLL_SEC, loop.time() + ATTACH_CHECK_SEC
+        alive = True
+        try:
+            while self._attached is ps:
+                lines, more = await loop.run_in_executor(None, tailer.poll)
+                if lines:
+                    self._deliver(lines, from_server=True)
+                if loop.time() >= next_check:
+                    next_check = loop.time() + ATTACH_CHECK_SEC
+                    alive = _alive(ps)
+                    if not alive:
+                        break
+                if not more:
+                    delay = TAIL_POLL_SEC if lines else min(TAIL_IDLE_SEC, delay * 2)
+                    await asyncio.sleep(delay)
+            if not alive:
+                lines, _ = await loop.run_in_executor(None, tailer.poll)     # what it wrote on the way out
+                if lines:
+                    self._deliver(lines, from_server=True)
+        except Exception as e:
+            self._emit(f"[reader] {e}")
+        finally:
+            if self._attached is ps:
+                self._attached = None
+            self._emit(f"> Server process {ps.pid} exited" if not alive else "> Stopped following the server")
+            if self.archive is not None:
+                self.archive.close()
+            self.proc_ps = None
+            self.on_exit(None)
+
+    async def _spawn(self, cmd):
         creationflags = 0
         if hasattr(subprocess, "CREATE_NO_WINDOW"):
             creationflags = subprocess.CREATE_NO_WINDOW  # Windows only
 
-        self.proc = subprocess.Popen(
-            cmd,
+        self.proc = await asyncio.create_subprocess_exec(
+            *cmd,
             cwd=self.server_root,  # important: world/eula/logs in the right place
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             stdin=subprocess.PIPE,
-            text=True,
-            bufsize=1,
             creationflags=creationflags,
         )
-        self.proc_ps = psutil.Process(self.proc.pid) if (psutil and self.proc and self.proc.pid) else None
-        threading.Thread(target=self._pump, daemon=True).start()
+        self._cmd = list(cmd)
+        psutil = _psutil()
+        self.proc_ps = psutil.Process(self.proc.pid) if (psutil and self.proc.pid) else None
+        asyncio.get_running_loop().create_task(self._pump(self.proc))
 
-    def _pump(self):
+    async def _pump(self, proc):
+        decoder = LineDecoder(STDIO_ENCODING)
+        out = proc.stdout
         try:
-            for line in self.proc.stdout:
-                self.on_output(line.rstrip("\n"))
+            while True:
+                chunk = await out.read(READ_CHUNK)  # whatever has arrived, up to READ_CHUNK
+                if not chunk:
+                    break
+                lines = decoder.feed(chunk)
+                if lines:
+                    self._deliver(lines, from_server=True)
+            lines = decoder.flush()
+            if lines:
+                self._deliver(lines, from_server=True)
         except Exception as e:
-            self.on_output(f"[reader] {e}")
+            self._emit(f"[reader] {e}")
         finally:
-            rc = self.proc.poll()
-            self.on_output(f"> Server exited with code {rc}")
+            rc = await proc.wait()
+            if self.commands is not None:
+                self.commands.close(f"server exited with code {rc}")
+            self._emit(f"> Server exited with code {rc}")
+            if self.archive is not None:
+                self.archive.close()
             self.proc_ps = None
             self.on_exit(rc)
 
-    def send_command(self, raw, echo=True):
-        if raw and self.proc and self.proc.poll() is None:
+    def _deliver(self, lines: list[str], from_server: bool = False):
+        parsed = None
+        if self.classify is not None:
+            parsed = [self.classify(ln) for ln in lines]
+            if from_server and self.commands is not None:
+                parsed = self.commands.feed(parsed)
+        if self.archive is not None:
             try:
-                self.proc.stdin.write(raw + "\n")
-                self.proc.stdin.flush()
-                if echo:
-                    self.on_output(f"> {raw}")
-                return True
-            except Exception as e:
-                self.on_output(f"ERROR sending command: {e}")
-        return False
+                self.archive.append((p.text, p.level) for p in parsed) if parsed is not None \
+                    else self.archive.append((ln, 0) for ln in lines)
+            except Exception:
+                pass
+        if self.on_output_batch is not None:
+            self.on_output_batch(parsed if parsed is not None else lines)
+        else:
+            for line in lines:
+                self.on_output(line)
+
+    def _emit(self, line: str):
+        """Our own status messages take the same route as server output."""
+        self._deliver([line])
+
+    def send_command(self, raw, echo=True, matcher=None, coalesce=None) -> CommandHandle | bool:
+        """
+        Queue a console command. Returns a CommandHandle (a Future, truthy)
+        resolving to matcher.result(reply lines) - by default the reply's
+        text lines - or False if the server isn't running. Commands are
+        written one at a time so replies can't interleave; echo=False marks
+        Tempo's own queries, whose replies are tagged EV_REPLY and which
+        coalesce with an identical one already pending.
+        """
+        if not raw or not self.is_running() or self.commands is None:
+            return False
+        return self.commands.submit(raw, matcher=matcher, silent=not echo, coalesce=coalesce)
+
+    def _write_stdin(self, raw: str) -> bool:
+        """Any thread: hand the write to the I/O loop (the stream is not thread-safe)."""
+        if not self.has_stdin:
+            return False
+        self.io.call(self._stdin_write, (raw + "\n").encode(STDIO_ENCODING, errors="replace"))
+        return True
+
+    def _stdin_write(self, data: bytes):
+        try:
+            stdin = self.proc.stdin
+            if stdin is None or stdin.is_closing():
+                raise BrokenPipeError("stdin is closed")
+            stdin.write(data)
+        except Exception as e:
+            self._emit(f"ERROR sending command: {e}")
+
+    def _echo(self, handle: CommandHandle):
+        if not handle.silent:
+            self._emit(f"> {handle.command}")
 
     def stop(self):
-        if not self.proc or self.proc.poll() is not None:
+        """Ask the server to stop; terminate it after STOP_GRACE_SEC, kill it after KILL_GRACE_SEC more."""
+        if not self.is_running():
             return
-        try:
-            if self.proc.stdin:
-                self.proc.stdin.write("stop\n")
-                self.proc.stdin.flush()
-        except Exception:
-            pass
+        if self._attached is not None:
+            self.io.submit(self._stop_attached(self._attached))
+            return
+        self.io.submit(self._shutdown(self.proc))
 
-        def _wait_then_terminate():
-            time.sleep(5)
-            if self.proc and self.proc.poll() is None:
-                self.proc.terminate()
+    async def _stop_attached(self, ps):
+        """
+        No stdin to type `stop` into. On POSIX SIGTERM runs the server's
+        shutdown hook, which saves the world; on Windows terminate() is
+        TerminateProcess, which doesn't, so we don't use it there.
+        """
+        if os.name == "nt":
+            self._emit("[attach] Tempo can't stop a server it didn't start without RCON; "
+                       "enable RCON in server.properties or type `stop` in the server's own window")
+            return
+        try:
+            ps.terminate()
+        except Exception as e:
+            self._emit(f"[attach] stop failed: {e}")
 
-        threading.Thread(target=_wait_then_terminate, daemon=True).start()
+    async def _shutdown(self, proc):
+        self._stdin_write(b"stop\n")
+        for grace, escalate in ((STOP_GRACE_SEC, proc.terminate), (KILL_GRACE_SEC, proc.kill)):
+            try:
+                await asyncio.wait_for(asyncio.shield(proc.wait()), grace)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                escalate()
+            except ProcessLookupError:
+                return
 
     def is_running(self):
-        return bool(self.proc and self.proc.poll() is None)
+        return self.has_stdin or self._attached is not None
+
+    @property
+    def has_stdin(self) -> bool:
+        """Our own child is running, so commands can be typed into it."""
+        return bool(self.proc and self.proc.returncode is None)
+
+    @property
+    def attached(self) -> bool:
+        """Following a server we didn't launch (see attach())."""
+        return self._attached is not None
+
+    @property
+    def pid(self) -> int | None:
+        if self.has_stdin:
+            return self.proc.pid
+        ps = self._attached
+        return ps.pid if ps is not None else None
 
     # ---- RAM verification ----
-    def get_heap_limits(self):
+    def get_heap_limits(self, timeout: float = 5.0):
+        """Blocking wrapper around heap_limits() for non-loop threads."""
+        return self.io.submit(self.heap_limits()).result(timeout)
+
+    async def heap_limits(self):
         """
         Returns {'initial': bytes|None, 'max': bytes|None, 'source': 'jcmd'|'cmdline'|'unknown'}
         for the running Java process, or None if not running.
         """
-        if not self.proc or self.proc.poll() is not None:
+        pid = self.pid
+        if pid is None:
             return None
-        pid = self.proc.pid
 
         # 1) Try jcmd (JDK on PATH) with a short timeout
         try:
             exe = "jcmd.exe" if os.name == "nt" else "jcmd"
-            res = subprocess.run(
-                [exe, str(pid), "VM.flags"],
-                capture_output=True, text=True, timeout=2
-            )
-            if res.returncode == 0 and res.stdout:
-                out = res.stdout
+            res = await run_helper([exe, str(pid), "VM.flags"])
+            if res is not None and res[0] == 0 and res[1]:
+                out = res[1]
                 init = None
                 maxh = None
                 for tok in out.replace("\n", " ").split():
@@ -153,15 +395,12 @@ class ServerController:
         # 2) Fallback: parse the process command line (-Xms / -Xmx)
         cmdline = None
         try:
-            if psutil and self.proc_ps:
+            if self.proc_ps:
                 cmdline = self.proc_ps.cmdline()
         except Exception:
             cmdline = None
         if not cmdline:
-            try:
-                cmdline = list(self.proc.args) if isinstance(self.proc.args, (list, tuple)) else None
-            except Exception:
-                cmdline = None
+            cmdline = self._cmd
 
         if cmdline:
             def _find_flag(flag):
@@ -200,4 +439,4 @@ class ServerController:
         path = os.path.join(root, "eula.txt")
         with open(path, "w", encoding="utf-8") as f:
             f.write("eula=true\n")
-        self.on_output("EULA accepted.")
+        self._emit("EULA accepted.")
@@ -0,0 +1,566 @@
+# server_manager.py
+import json, os, threading, time
+from typing import NamedTuple
+
+from config import (
+    DEFAULT_MIN_RAM, DEFAULT_MAX_RAM, PLAYER_LIST_POLL_SECS, HEALTH_CHECK_SECS, HOST_SAMPLE_SECS,
+    EVENT_BUS_CAPACITY, EVENT_BUS_POLICY, EVENT_BUS_BLOCK_TIMEOUT, CONSOLE_SCROLLBACK_LINES, SERVERS_FILE, DISCOVER_RETRY_SECS,
+)
+from server_controller import ServerController
+from utils.commands import ListMatcher
+from utils.discovery import find_server_process
+from utils.eventbus import EventBus
+from utils.health import HealthMonitor
+from utils.linestore import LineStore
+from utils.parsers import (
+    LogPipeline, classify_line, line_class, EV_JOIN, EV_LEAVE, EV_LIST, EV_LAG, EV_UUID, EV_LOGIN,
+)
+from utils.properties import properties_for
+from utils.rcon import client_for
+from utils.sampler import MetricsSampler
+from utils.servermetrics import ServerMetrics
+from utils.sessions import SessionTracker
+from utils.slp import StatusPoller
+from utils.optional import psutil as _psutil
+from utils.tickmon import TickMonitor
+
+# ServerSummary.status values
+STATUS_STOPPED = "stopped"
+STATUS_STARTING = "starting"     # our process is up, the port isn't yet
+STATUS_RUNNING = "running"
+STATUS_EXTERNAL = "external"     # port answers but it isn't our process
+
+READ_ONLY_NOTE = "[tempo] This server is run by the Tempo daemon; attach to it to control it."
+
+
+class ServerProfile(NamedTuple):
+    name: str
+    jar_path: str
+    min_ram: str = DEFAULT_MIN_RAM
+    max_ram: str = DEFAULT_MAX_RAM
+    nogui: bool = True
+
+
+class ServerSummary(NamedTuple):
+    name: str
+    status: str                  # STATUS_* constant
+    mspt: float | None
+    tps: float | None
+    rss_mb: float | None
+    cpu_pct: float | None
+    players: int
+    max_players: int
+
+
+class HostUsage(NamedTuple):
+    ts: float
+    cpu_pct: float | None        # whole machine, 100 = all cores
+    mem_used_mb: float | None
+    mem_total_mb: float | None
+    servers_rss_mb: float        # summed over running servers
+    servers_cpu_pct: float       # summed over running servers (100 = one core)
+    running: int                 # servers up
+
+
+def status_of(state) -> str:
+    if state.proc_alive and not state.port_open:
+        return STATUS_STARTING
+    if state.running and state.port_open and not state.proc_alive:
+        return STATUS_EXTERNAL
+    return STATUS_RUNNING if state.running else STATUS_STOPPED
+
+
+def _root_of(jar_path: str) -> str:
+    if jar_path and os.path.isfile(jar_path):
+        return os.path.dirname(os.path.abspath(jar_path))
+    return os.path.abspath(os.getcwd())
+
+
+def unique_name(root_or_name: str, taken) -> str:
+    """Folder name of root_or_name, numbered if it is already in `taken`."""
+    base = os.path.basename(root_or_name.rstrip("\\/")) or "server"
+    name, n = base, 2
+    while name in taken:
+        name, n = f"{base} ({n})", n + 1
+    return name
+
+
+class ManagedServer:
+    """
+    One supervised server: its controller, health/status/tick monitors,
+    console scrollback (a LineStore), recorded ServerMetrics and player
+    sessions (a SessionTracker). A server already running from this root
+    when Tempo starts (or that someone else started) is found by its process
+    and followed through its log, with commands going over RCON.
+
+    Worker threads only publish to this server's own EventBus; pump() applies
+    it on the Tk thread. While a console is attached (the server on screen)
+    lines go through it to be drawn; otherwise they are appended straight to
+    the store and nothing is rendered. on_change(server, what) tells the app
+    about "players" and "exit" for the attached server.
+
+    read_only is for a root a Tempo daemon runs (this window detached from
+    it): the server is watched, but nothing is written to its files and it
+    can't be started, stopped or sent commands from here.
+    """
+    def __init__(self, profile: ServerProfile, read_only: bool = False):
+        self.profile = profile
+        self.read_only = read_only
+        self.root = _root_of(profile.jar_path)
+        self.bus = EventBus(EVENT_BUS_CAPACITY, EVENT_BUS_POLICY, EVENT_BUS_BLOCK_TIMEOUT)
+        self.pipeline = LogPipeline()
+        self.store = LineStore(CONSOLE_SCROLLBACK_LINES)
+        self.console = None
+        self.on_change = None
+
+        self.controller = ServerController(on_output_batch=self._on_output_batch, on_exit=self._on_exit,
+                                           classify=classify_line)
+        self.controller.server_root = self.root
+        # process/port checks run on the shared I/O loop; everyone reads health.state
+        self.health = HealthMonitor(self.controller, port_fn=self.port, interval=HEALTH_CHECK_SECS)
+        # player counts/sample come from Server List Ping, not from `list` on stdin
+        self.status_poller = StatusPoller(
+            self.port, on_status=lambda st: self.bus.publish("status", st, key="status"),
+            running_fn=lambda: self.health.state.port_open, interval=PLAYER_LIST_POLL_SECS,
+        )
+        # sampled by ServerManager's thread, recorded into metrics on the Tk thread
+        self.sampler = MetricsSampler(self.controller, self.health)
+        self.metrics = ServerMetrics(self.root, persist=not read_only)
+        self.sessions = SessionTracker(self.root, persist=not read_only)
+        # queries mspt / tick query / spark tps and feeds the metrics
+        self.tickmon = TickMonitor(send=lambda cmd, matcher: self.query(cmd, matcher, self.tickmon.on_reply),
+                                   on_sample=lambda mspt, tps: self.metrics.on_tick_sample(mspt, tps),
+                                   on_status=self.print_line)
+
+        self.players = set()
+        self.max_players = self.props().max_players
+        self.rcon = None                  # RconClient for servers we can't reach via stdin
+        self._rcon_key = None
+        self._port_was_open = False
+        self._discovering = False
+        self._discover_at = 0.0
+        self._sessions_error = None
+
+        self.pipeline.subscribe(None, self._on_parsed_line)
+        self.pipeline.subscribe(EV_JOIN, self._on_player_event)
+        self.pipeline.subscribe(EV_LEAVE, self._on_player_event)
+        self.pipeline.subscribe(EV_LIST, self._on_player_list)
+        self.pipeline.subscribe(EV_UUID, lambda parsed: self.sessions.on_uuid(*parsed.data))
+        self.pipeline.subscribe(EV_LOGIN, lambda parsed: self.sessions.on_login(parsed.data))
+        self.pipeline.subscribe(EV_LAG, lambda parsed: self.metrics.on_lag(parsed))
+
+    @property
+    def name(self) -> str:
+        return self.profile.name
+
+    # ----- lifecycle -----
+    def open(self):
+        self.health.start()
+        self.status_poller.start()
+        self._discover()
+
+    def close(self):
+        self.controller.detach()
+        self.health.stop()
+        self.status_poller.stop()
+        self.metrics.flush()
+        self._flush_sessions()
+        if self.rcon is not None:
+            self.rcon.close()
+
+    def attach(self, console, on_change):
+        """Put this server on screen: console shows its store, on_change hears about players/exit."""
+        console.set_store(self.store)
+        self.console = console
+        self.on_change = on_change
+
+    def detach(self):
+        self.console = None
+        self.on_change = None
+
+    # ----- settings -----
+    def props(self):
+        """Cached server.properties of this server root (re-read only when it changes)."""
+        return properties_for(self.root)
+
+    def port(self) -> int:
+        return self.props().port
+
+    def set_profile(self, profile: ServerProfile) -> bool:
+        """New settings; returns True if the jar moved to another server root."""
+        self.profile = profile
+        root = _root_of(profile.jar_path)
+        if root == self.root:
+            return False
+        self.root = root
+        if not self.controller.is_running():
+            self.controller.server_root = root
+        self.metrics.flush()
+        self.metrics = ServerMetrics(root, persist=not self.read_only)
+        self._flush_sessions()
+        self.sessions = SessionTracker(root, persist=not self.read_only)
+        self.max_players = self.props().max_players
+        return True
+
+    # ----- control -----
+    def start(self):
+        if self.read_only:
+            raise RuntimeError(f"{self.name} is run by the Tempo daemon; attach to it to control this server.")
+        p = self.profile
+        self.tickmon.reset(p.jar_path)
+        self.controller.start(jar_path=p.jar_path, min_ram=p.min_ram, max_ram=p.max_ram,
+                              use_nogui=p.nogui, server_root=self.root)
+        self.store.reset_counts()
+        self.health.check_now()
+
+    def stop(self):
+        if self.read_only:
+            self.print_line(READ_ONLY_NOTE)
+            return
+        if self.controller.attached and self.health.state.port_open and self.rcon_client() is not None:
+            self.send_command("stop")          # no stdin; `stop` over RCON saves the world on every OS
+        else:
+            self.controller.stop()
+        self.health.check_now()
+
+    def send_command(self, raw: str, *, echo: bool = True):
+        if self.read_only:
+            self.print_line(READ_ONLY_NOTE)
+            return False
+        if self.controller.has_stdin or not self.health.state.port_open:
+            return self.controller.send_command(raw, echo=echo)
+        # a server we didn't launch: no stdin, but RCON may be on
+        client = self.rcon_client()
+        if client is None or not raw:
+            return False
+        if echo:
+            self.print_line(f"> {raw}")
+
+        def done(fut):
+            try:
+                text = fut.result()
+            except Exception as e:
+                text = f"RCON: {e}"
+            for line in (text or "").splitlines():
+                self.bus.publish("print", line)
+
+        client.command(raw).add_done_callback(done)
+        return True
+
+    def query(self, raw: str, matcher, on_done):
+        """Silent stdin command whose CommandHandle goes to on_done(handle) on the Tk thread."""
+        handle = self.controller.send_command(raw, echo=False, matcher=matcher)
+        if handle:
+            handle.add_done_callback(lambda h: self.bus.publish("reply", (on_done, h)))
+        return handle
+
+    def _discover(self):
+        """Look for a running server of this root in the I/O loop's executor; follow it if there is one."""
+        now = time.monotonic()
+        if self.read_only or self._discovering or now < self._discover_at or self.controller.is_running():
+            return
+        self._discovering, self._discover_at = True, now + DISCOVER_RETRY_SECS
+        io = self.controller.io        # the scan blocks, and attach() waits on the loop: not on it
+        io.call(lambda: io.loop.run_in_executor(None, self._discover_run))
+
+    def _discover_run(self):
+        try:
+            ps = find_server_process(self.root, self.profile.jar_path)
+            if ps is not None and not self.controller.is_running():
+                self.controller.attach(ps)
+                self.bus.publish("attached", ps.pid, key="attached")
+        except Exception as e:
+            self.bus.publish("print", f"[attach] {e}")
+        finally:
+            self._discovering = False
+
+    def rcon_client(self):
+        """RconClient for the current server.properties, rebuilt when port/password change."""
+        props = self.props()
+        key = (props.path, props.get("enable-rcon"), props.get("rcon.port"), props.get("rcon.password"))
+        if key != self._rcon_key:
+            if self.rcon is not None:
+                self.rcon.close()
+            self.rcon = client_for(props)
+            self._rcon_key = key
+        return self.rcon
+
+    # ----- Tk thread -----
+    def print_line(self, text: str):
+        if self.console is not None:
+            self.console.print_line(text)
+        else:
+            self.store.append(text, line_class(classify_line(text)))
+
+    def pump(self):
+        """Apply everything the worker threads published since the last frame."""
+        for kind, payload in self.bus.drain():
+            if kind == "lines":
+                self.pipeline.dispatch_batch(payload)
+            elif kind == "print":
+                self.print_line(payload)
+            elif kind == "status":
+                self._on_status(payload)
+            elif kind == "reply":
+                on_done, handle = payload
+                on_done(handle)
+            elif kind == "attached":
+                self.tickmon.reset(self.profile.jar_path)
+                self.health.check_now()
+                self.status_poller.poll_now()
+            elif kind == "exit":
+                self.players.clear()
+                self.sessions.end_all()
+                self._changed("players")
+                self._changed("exit")
+
+    def tick(self):
+        """Once a second: record the latest sample and react to the port opening."""
+        self.metrics.record(self.sampler.latest)
+        self.metrics.poll_load()
+        self._flush_sessions(force=False)
+        open_now = self.health.state.port_open
+        if open_now and not self._port_was_open:
+            self.status_poller.poll_now()      # first status as soon as the port opens
+        if open_now and not self.health.state.proc_alive:
+            self._discover()                   # a server we didn't start; follow it if it is ours to see
+        self._port_was_open = open_now
+
+    def _flush_sessions(self, force: bool = True):
+        """Save player sessions; each distinct failure is told once in the console (the save is retried)."""
+        err = self.sessions.flush(force)
+        if err is not None and err != self._sessions_error:
+            self._sessions_error = err
+            self.print_line(f"[sessions] {err}")
+
+    def poll_ticks(self):
+        if self.controller.has_stdin:          # an attached server's tick lines are still observed
+            self.tickmon.poll()
+
+    def summary(self) -> ServerSummary:
+        snap, m = self.sampler.latest, self.metrics
+        status = status_of(self.health.state)
+        up = status != STATUS_STOPPED
+        return ServerSummary(self.name, status, m.last_mspt if up else None, m.last_tps if up else None,
+                             snap.rss_mb if up else None, snap.cpu_pct if up else None,
+                             len(self.players), self.max_players)
+
+    # ----- line/status handlers -----
+    def _changed(self, what: str):
+        if self.on_change is not None:
+            self.on_change(self, what)
+
+    def _on_output_batch(self, parsed: list):
+        """Called from ServerController thread, once per stdout read (already classified)."""
+        self.bus.publish("lines", parsed)
+
+    def _on_exit(self, rc):
+        """Called from ServerController thread."""
+        self.bus.publish("exit", rc, key="exit")
+
+    def _on_parsed_line(self, parsed):
+        self.tickmon.observe(parsed)
+        if self.console is not None:
+            self.console.add_parsed(parsed)
+        else:
+            self.store.append(parsed.text, line_class(parsed))
+
+    def _on_player_event(self, parsed):
+        if parsed.kind == EV_JOIN:
+            if parsed.data in self.players:
+                return
+            self.players.add(parsed.data)
+            self.sessions.join(parsed.data)
+        else:
+            if parsed.data not in self.players:
+                return
+            self.players.discard(parsed.data)
+            self.sessions.leave(parsed.data)
+        self._players_changed()
+
+    def _on_player_list(self, parsed):
+        self._apply_player_list(parsed.data)
+
+    def _on_list_reply(self, handle):
+        try:
+            data = handle.result()
+        except Exception:
+            return                      # timed out or the server went away
+        self._apply_player_list(data)
+
+    def _apply_player_list(self, data):
+        _, running_max, names = data
+        self.max_players = running_max
+        new_set = set(names)
+        if new_set != self.players:
+            self.players = new_set
+            self.sessions.sync(new_set)
+            self._players_changed()
+        else:
+            self._changed("players")
+
+    def _on_status(self, st):
+        """Server List Ping reply. The sample is capped at 12 names, so it only
+        replaces the join/leave-tracked set when it is complete."""
+        self.max_players = st.max
+        if st.online == 0:
+            names = set()
+        elif len(st.sample) == st.online:
+            names = {name for name, _uuid in st.sample}
+        else:
+            names = None
+        if names is not None and names != self.players:
+            self.players = names
+            self.sessions.sync(names)
+            self._players_changed()
+        else:
+            if names is None and self.controller.has_stdin:
+                self.query("list", ListMatcher(), self._on_list_reply)    # sample capped; ask for all names
+            self._changed("players")
+        self.metrics.set_player_count(st.online)
+
+    def _players_changed(self):
+        self.metrics.set_player_count(len(self.players))
+        self._changed("players")
+
+
+class ServerManager:
+    """
+    Supervises any number of ManagedServers. Profiles are kept in
+    SERVERS_FILE; one background thread samples every server's process tree
+    plus the host, so adding servers adds no sampler threads. pump()/tick()
+    are driven by the app on the Tk thread.
+
+    Servers in read_only_roots belong to a running daemon (see
+    ManagedServer.read_only); while there are any, SERVERS_FILE is the
+    daemon's too and isn't written from here.
+    """
+    remote = False          # the servers run in this process (see remote_manager.RemoteManager)
+
+    def __init__(self, path: str = SERVERS_FILE, interval: float = HOST_SAMPLE_SECS, read_only_roots=()):
+        self.path = path
+        self.read_only_roots = frozenset(read_only_roots)
+        self.interval = interval
+        self.servers = []
+        self.selected_name = None
+        self.host = HostUsage(time.time(), None, None, None, 0.0, 0.0, 0)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ----- profiles -----
+    def load(self, default_jar: str = ""):
+        """Read SERVERS_FILE and open every server in it (one from default_jar if there is none)."""
+        profiles = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for d in data.get("servers", ()):
+                try:
+                    profiles.append(ServerProfile(**{k: d[k] for k in ServerProfile._fields if k in d}))
+                except Exception:
+                    continue
+            self.selected_name = data.get("selected")
+        except Exception:
+            pass
+        if not profiles:
+            profiles.append(ServerProfile(self.unique_name(_root_of(default_jar)), default_jar))
+        for p in profiles:
+            self.add(p, save=False)
+
+    def save(self):
+        if self.read_only_roots:
+            return
+        data = {"selected": self.selected_name, "servers": [s.profile._asdict() for s in self.servers]}
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+
+    def unique_name(self, root_or_name: str) -> str:
+        return unique_name(root_or_name, {s.name for s in self.servers})
+
+    # ----- servers -----
+    def add(self, profile: ServerProfile, save: bool = True) -> ManagedServer:
+        server = ManagedServer(profile, read_only=_root_of(profile.jar_path) in self.read_only_roots)
+        with self._lock:
+            self.servers.append(server)
+        server.open()
+        if save:
+            self.save()
+        return server
+
+    def remove(self, server: ManagedServer) -> bool:
+        """Forget a stopped server (its files stay). False if it is still running."""
+        if server.controller.is_running() or len(self.servers) <= 1:
+            return False
+        with self._lock:
+            self.servers.remove(server)
+        server.close()
+        self.save()
+        return True
+
+    def get(self, name: str | None) -> ManagedServer | None:
+        for s in self.servers:
+            if s.name == name:
+                return s
+        return None
+
+    # ----- Tk thread -----
+    def pump(self):
+        for s in self.servers:
+            s.pump()
+
+    def tick(self):
+        for s in self.servers:
+            s.tick()
+
+    def poll_ticks(self):
+        for s in self.servers:
+            s.poll_ticks()
+
+    # ----- sampler thread -----
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="server-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        for s in self.servers:
+            s.close()
+        self.save()
+
+    def _run(self):
+        psutil = _psutil()                         # imported here, off the Tk thread
+        if psutil:
+            try:
+                psutil.cpu_percent(None)           # prime; first reading is always 0.0
+            except Exception:
+                pass
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            with self._lock:
+                servers = list(self.servers)
+            rss = cpu = 0.0
+            running = 0
+            for s in servers:
+                snap = s.sampler.sample()
+                if snap.running:
+                    running += 1
+                    rss += snap.rss_mb or 0.0
+                    cpu += snap.cpu_pct or 0.0
+            host_cpu = used = total = None
+            if psutil:
+                try:
+                    host_cpu = psutil.cpu_percent(None)
+                    vm = psutil.virtual_memory()
+                    used, total = (vm.total - vm.available) / (1024 * 1024), vm.total / (1024 * 1024)
+                except Exception:
+                    pass
+            self.host = HostUsage(time.time(), host_cpu, used, total, rss, cpu, running)
+            self._stop.wait(max(0.05, self.interval - (time.monotonic() - t0)))
@@ -1,27 +1,102 @@
 # tabs/console_tab.py
-import re
+import os, re, time
+from collections import deque
 import customtkinter as ctk
+from utils.parsers import (
+    classify_line, line_class, ParsedLine, LVL_WARN, LVL_ERROR, LEVEL_MASK, TOPIC_CHAT, TOPIC_POLL,
+)
+from utils.linestore import LineStore
+from utils.archive import ARCHIVE_DIRNAME, ArchiveQuery, search_archives
+from utils.framesched import FrameScheduler
+from widgets.virtual_console import VirtualConsole, StoreSource, FilteredSource
+
+FRAME_MS = 16          # at most one flush per frame
+FRAME_BUDGET_MS = 8.0  # starting per-frame budget; FrameScheduler adapts it
+FLUSH_CHUNK = 256      # lines appended between deadline checks
+HIDDEN_SPILL = 4096    # lines queued while hidden before they are moved into the store in one go
+
+TAG_COLORS = {
+    "LOG_ERROR":   "#ff6b6b",  # red
+    "LOG_WARN":    "#ffd166",  # amber
+    "LOG_SUCCESS": "#8bd17c",  # green
+    "LOG_INFO":    "#e0e0e0",  # light gray
+    "LOG_CMD":     "#7bdff6",  # cyan
+    "LOG_APP":     "#b39ddb",  # purple
+}
+
+SEARCH_LEVELS = {
+    "All levels": None,
+    "Warnings + errors": frozenset((LVL_WARN, LVL_ERROR)),
+    "Errors": frozenset((LVL_ERROR,)),
+}
+SHOW_LEVELS = {
+    "All": frozenset(range(7)),
+    "Warn+": frozenset((LVL_WARN, LVL_ERROR)),
+    "Errors": frozenset((LVL_ERROR,)),
+}
+SEARCH_SPANS = {
+    "Any time": None,
+    "Last 15 min": 15 * 60,
+    "Last hour": 3600,
+    "Last 3 hours": 3 * 3600,
+    "Last 24 hours": 24 * 3600,
+}
 
 class ConsoleTab(ctk.CTkFrame):
-    """Buffered console + command entry; trims old lines; color-codes log levels."""
+    """
+    Buffered console + command entry; scrollback lives in a LineStore, only the viewport is rendered.
+    While hidden (another tab, or the window minimized) lines only go into the store; on_show()
+    draws the viewport and counters once.
+    """
     def __init__(self, master, send_callback):
         super().__init__(master, fg_color="transparent")
         self.send_callback = send_callback
 
+        # Archive search row
+        search_outer = ctk.CTkFrame(self, fg_color="#333333", corner_radius=10, border_width=1, border_color="#555555")
+        search_outer.pack(fill="x", padx=8, pady=(8, 0))
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(search_outer, textvariable=self.search_var, corner_radius=8,
+                                         placeholder_text="Search archive (regex)…")
+        self.search_entry.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+        self.search_entry.bind("<Return>", self._on_search)
+        self.search_entry.bind("<KP_Enter>", self._on_search)
+        self.search_level = ctk.StringVar(value="All levels")
+        ctk.CTkOptionMenu(search_outer, variable=self.search_level, values=list(SEARCH_LEVELS),
+                          width=150, fg_color="#555", button_color="#555").pack(side="left", padx=(0, 5))
+        self.search_span = ctk.StringVar(value="Any time")
+        ctk.CTkOptionMenu(search_outer, variable=self.search_span, values=list(SEARCH_SPANS),
+                          width=120, fg_color="#555", button_color="#555").pack(side="left", padx=(0, 5))
+        ctk.CTkButton(search_outer, text="Search", command=self._on_search,
+                      fg_color="#555", width=70, corner_radius=8).pack(side="left", padx=(0, 5))
+        self.live_btn = ctk.CTkButton(search_outer, text="Live", command=self._show_live,
+                                      fg_color="#555", width=60, corner_radius=8, state="disabled")
+        self.live_btn.pack(side="left", padx=(0, 5))
+        self.search_status = ctk.CTkLabel(search_outer, text="", font=("Segoe UI", 11), width=90)
+        self.search_status.pack(side="left", padx=(0, 5))
+
+        # Filter toggles + live counters
+        filter_row = ctk.CTkFrame(self, fg_color="transparent")
+        filter_row.pack(fill="x", padx=12, pady=(4, 0))
+        self.show_level = ctk.StringVar(value="All")
+        ctk.CTkSegmentedButton(filter_row, values=list(SHOW_LEVELS), variable=self.show_level,
+                               command=lambda _v: self._apply_filter()).pack(side="left")
+        self.show_chat = ctk.BooleanVar(value=True)
+        ctk.CTkCheckBox(filter_row, text="Chat", variable=self.show_chat, width=60,
+                        command=self._apply_filter).pack(side="left", padx=(12, 0))
+        self.show_polls = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(filter_row, text="Tempo polls", variable=self.show_polls, width=90,
+                        command=self._apply_filter).pack(side="left", padx=(8, 0))
+        self.counts_lbl = ctk.CTkLabel(filter_row, text="", font=("Segoe UI", 11))
+        self.counts_lbl.pack(side="right")
+
         # Console area
         outer = ctk.CTkFrame(self, fg_color="#333333", corner_radius=10, border_width=1, border_color="#555555")
-        outer.pack(fill="both", expand=True, padx=8, pady=(8, 4))
-        self.console = ctk.CTkTextbox(outer, fg_color="black", text_color="white", corner_radius=10, border_width=0)
+        outer.pack(fill="both", expand=True, padx=8, pady=(4, 4))
+        self.store = LineStore()
+        self.console = VirtualConsole(outer, StoreSource(self.store), tag_colors=TAG_COLORS)
         self.console.pack(fill="both", expand=True, padx=5, pady=5)
-        self.console.configure(state="disabled")
-
-        # Text tags
-        self.console.tag_config("LOG_ERROR",    foreground="#ff6b6b")  # red
-        self.console.tag_config("LOG_WARN",     foreground="#ffd166")  # amber
-        self.console.tag_config("LOG_SUCCESS",  foreground="#8bd17c")  # green
-        self.console.tag_config("LOG_INFO",     foreground="#e0e0e0")  # light gray
-        self.console.tag_config("LOG_CMD",      foreground="#7bdff6")  # cyan
-        self.console.tag_config("LOG_APP",      foreground="#b39ddb")  # purple
+        self._live_source = self.console.source
 
         # Command row
         cmd_outer = ctk.CTkFrame(self, fg_color="#333333", corner_radius=10, border_width=1, border_color="#555555")
@@ -34,98 +109,255 @@ class ConsoleTab(ctk.CTkFrame):
         ctk.CTkButton(cmd_outer, text="Send", command=self._on_send_click,
                       fg_color="#555", width=90, corner_radius=8).pack(side="right", padx=5, pady=5)
 
-        # Buffered printing
-        self._buffer = []          # pending lines
-        self._line_count = 0       # number of lines in widget
-        self._max_lines = 1500     # trim target
-        self._suspended = False    # pause flushing during window drag
+        # Buffered printing: lines wait until the frame scheduler has budget for them
+        self._incoming = []          # (text, class) pairs since the last frame
+        self._incoming_t = 0.0       # arrival time of the first of them
+        self._backlog = deque()      # [arrival time, rows, next index] carried across frames
+        self._warn_window = deque()  # (time, warnings) per flush over the last minute
+        self._counter_job = None
+        self._hidden = False         # not on screen: record only
+        self._dragging = False       # window drag in progress
+        self._sched = FrameScheduler(self, self._flush, frame_ms=FRAME_MS, budget_ms=FRAME_BUDGET_MS)
 
-        # Regex helpers
-        self._ansi = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")  # strip ANSI if present
-        self._re_error = re.compile(r"\b(error|fatal|severe)\b", re.IGNORECASE)
-        self._re_warn  = re.compile(r"\b(warn|warning)\b", re.IGNORECASE)
-        self._re_done  = re.compile(r"\b(done|started|eula accepted)\b", re.IGNORECASE)
-        self._re_mc_l  = re.compile(r"\[.+?/(INFO|WARN|ERROR|DEBUG|TRACE)\]")  # [thread/LEVEL]
+        # Archive search (worker thread -> _search_pages -> _poll_search while it runs)
+        self._archive_dir = None
+        self._results = None        # LineStore of hits while a search is shown
+        self._search_cancel = None
+        self._search_gen = 0        # pages from an older search are ignored
+        self._search_pages = deque()
 
-        self.after(120, self._flush_loop)
+        self._apply_filter()
+        self._update_counters()
 
     # ----- public API -----
-    def print_line(self, text: str):
+    def print_line(self, text: str, level: int | None = None):
+        """Queue a line; level is a parsers.LVL_* value (classified here if omitted)."""
         if text is None:
             return
-        self._buffer.append(text)
+        cls = line_class(classify_line(text)) if level is None else level
+        self._enqueue(text, cls)
+
+    def add_parsed(self, parsed: ParsedLine):
+        """LogPipeline subscriber: the line was already classified upstream."""
+        self._enqueue(parsed.text, line_class(parsed))
 
     def set_max_lines(self, n: int):
-        self._max_lines = max(200, int(n))
+        """Scrollback cap; memory stays flat once it is reached."""
+        self.store.set_max_lines(n)
+
+    def set_store(self, store: LineStore):
+        """Show another scrollback (another server's); queued lines still land in the old one."""
+        if store is self.store:
+            return
+        self._flush(float("inf"))
+        self.store = store
+        self._warn_window.clear()
+        if self._results is not None:
+            self._show_live()
+        self._apply_filter()
+        self.console.set_source(self._live_source, follow=True)
+        self._update_counters()
 
     def set_suspended(self, flag: bool):
-        self._suspended = bool(flag)
+        """Park rendering (window drag); lines keep queueing and catch up on resume."""
+        self._dragging = bool(flag)
+        self._sched.suspend(self._dragging or self._hidden)
+
+    def on_hide(self):
+        """FolderTabs: off screen. Stop rendering; lines are still recorded."""
+        self._hidden = True
+        self._sched.suspend(True)
+
+    def on_show(self):
+        """FolderTabs: back on screen. Everything recorded meanwhile is drawn in one update."""
+        self._record()
+        self._hidden = False
+        self._sched.suspend(self._dragging)
+        if self._results is None:
+            self.console.refresh()
+        self._update_counters()
+
+    def latency_percentiles(self) -> dict:
+        """Line arrival -> on screen, in ms: {50: .., 95: .., 99: ..}."""
+        return self._sched.latency.percentiles()
+
+    def reset_counters(self):
+        """Start a new session for the error/warning counters."""
+        self.store.reset_counts()
+        self._warn_window.clear()
+        self._update_counters()
+
+    def set_server_root(self, root_path: str):
+        if root_path:
+            self._archive_dir = os.path.join(root_path, ARCHIVE_DIRNAME)
 
     # ----- internal -----
-    def _tag_for(self, line: str) -> str | None:
-        s = self._ansi.sub("", line)
-
-        # Verify lines: green on success, red on problems
-        if s.lower().startswith("[verify]"):
-            sl = s.lower()
-            if "✓" in s or "match" in sl or "ok" in sl:
-                return "LOG_SUCCESS"
-            if "⚠" in s or "differ" in sl or "could not" in sl or "not running" in sl or "unknown" in sl or "fail" in sl:
-                return "LOG_ERROR"
-            return "LOG_SUCCESS"
-
-        if s.startswith("> "):  # our echoed commands
-            return "LOG_CMD"
-
-        m = self._re_mc_l.search(s)
-        if m:
-            lvl = m.group(1).upper()
-            if lvl == "ERROR":
-                return "LOG_ERROR"
-            if lvl == "WARN":
-                return "LOG_WARN"
-            if lvl in ("DEBUG", "TRACE"):
-                return "LOG_INFO"
-
-        if self._re_error.search(s):
-            return "LOG_ERROR"
-        if "unknown or incomplete command" in s.lower():
-            return "LOG_WARN"
-        if self._re_warn.search(s):
-            return "LOG_WARN"
-        if self._re_done.search(s):
-            return "LOG_SUCCESS"
-
-        if s.startswith(("Working dir:", "Selected server jar:", "Max players set to", "No server jar selected.", "Server root:")):
-            return "LOG_APP"
-
-        return None
-
-    def _flush_loop(self):
-        if self._buffer and not self._suspended:
-            lines = self._buffer
-            self._buffer = []
-
-            self.console.configure(state="normal")
-            for line in lines:
-                tag = self._tag_for(line)
-                if tag:
-                    self.console.insert("end", line + "\n", tag)
-                else:
-                    self.console.insert("end", line + "\n")
-            self.console.see("end")
-            self.console.configure(state="disabled")
-
-            # Track & trim
-            self._line_count += len(lines)
-            if self._line_count > self._max_lines:
-                overflow = self._line_count - self._max_lines
-                self.console.configure(state="normal")
-                self.console.delete("1.0", f"{overflow + 1}.0")
-                self.console.configure(state="disabled")
-                self._line_count -= overflow
-
-        self.after(120, self._flush_loop)
+    def _enqueue(self, text: str, cls: int):
+        if not self._incoming:
+            self._incoming_t = time.perf_counter()
+            self._sched.notify()
+        self._incoming.append((text, cls))
+        if self._hidden and len(self._incoming) >= HIDDEN_SPILL:
+            self._record()
+
+    def _record(self):
+        """Hidden: move queued lines into the store without drawing (no latency samples either)."""
+        pending = [rows[i:] for _t, rows, i in self._backlog]
+        if self._incoming:
+            pending.append(self._incoming)
+            self._incoming = []
+        self._backlog.clear()
+        warns = 0
+        for rows in pending:
+            self.store.extend(rows)
+            warns += sum(1 for _, cls in rows if cls & LEVEL_MASK == LVL_WARN)
+        if warns:
+            self._warn_window.append((time.monotonic(), warns))
+
+    def _flush(self, deadline: float) -> bool:
+        """FrameScheduler work: append as much backlog as fits before deadline, then render once."""
+        if self._incoming:
+            self._backlog.append([self._incoming_t, self._incoming, 0])
+            self._incoming = []
+
+        backlog, store = self._backlog, self.store
+        added = warns = 0
+        finished = []
+        while backlog:
+            item = backlog[0]
+            t, rows, i = item
+            j = min(len(rows), i + FLUSH_CHUNK)
+            chunk = rows[i:j]
+            store.extend(chunk)
+            warns += sum(1 for _, cls in chunk if cls & LEVEL_MASK == LVL_WARN)
+            added += j - i
+            if j >= len(rows):
+                backlog.popleft()
+                finished.append(t)
+            else:
+                item[2] = j
+            if time.perf_counter() >= deadline:
+                break
+
+        if added:
+            if warns:
+                self._warn_window.append((time.monotonic(), warns))
+            if self._results is None:
+                self.console.refresh()
+            now = time.perf_counter()
+            for t in finished:
+                self._sched.latency.add((now - t) * 1000.0)
+            self._update_counters()
+        return bool(backlog or self._incoming)
+
+    # ----- filters / counters -----
+    def _apply_filter(self):
+        """Swap the live view's row source; only posting lists are merged, no text is touched."""
+        levels = SHOW_LEVELS.get(self.show_level.get(), SHOW_LEVELS["All"])
+        topics = [0]
+        if self.show_chat.get():
+            topics.append(TOPIC_CHAT)
+        if self.show_polls.get():
+            topics.append(TOPIC_POLL)
+        if len(levels) == len(SHOW_LEVELS["All"]) and len(topics) == 3:
+            self._live_source = StoreSource(self.store)
+        else:
+            self._live_source = FilteredSource(self.store, (lvl | t for lvl in levels for t in topics))
+        if self._results is None:
+            self.console.set_source(self._live_source, follow=self.console.follow)
+
+    def _update_counters(self):
+        if self._hidden:
+            return                   # on_show() updates them; the decay timer stops meanwhile
+        now = time.monotonic()
+        win = self._warn_window
+        while win and now - win[0][0] > 60:
+            win.popleft()
+        counts = self.store.counts
+        errors = sum(n for cls, n in counts.items() if cls & LEVEL_MASK == LVL_ERROR)
+        text = f"Errors: {errors}  ·  Warnings/min: {sum(n for _, n in win)}"
+        p95 = self._sched.latency.percentiles((95,)).get(95)
+        if p95 is not None:
+            text += f"  ·  p95 latency: {p95:.0f} ms"
+        self.counts_lbl.configure(text=text)
+        # keep warnings/min decaying while the console is quiet
+        if win and self._counter_job is None:
+            self._counter_job = self.after(1000, self._counter_tick)
+
+    def _counter_tick(self):
+        self._counter_job = None
+        self._update_counters()
+
+    # ----- archive search -----
+    def _on_search(self, _evt=None):
+        if not self._archive_dir or not os.path.isdir(self._archive_dir):
+            self.search_status.configure(text="no archive yet")
+            return "break"
+        pattern = (self.search_var.get() or "").strip() or None
+        span = SEARCH_SPANS.get(self.search_span.get())
+        query = ArchiveQuery(
+            pattern=pattern,
+            levels=SEARCH_LEVELS.get(self.search_level.get()),
+            since=(time.time() - span) if span else None,
+        )
+        if self._search_cancel is not None:
+            self._search_cancel.set()
+        self._search_pages.clear()
+        self._search_gen += 1
+        gen = self._search_gen
+        results = LineStore()
+        try:
+            self._search_cancel = search_archives(
+                self._archive_dir, query,
+                on_page=lambda hits: self._search_pages.append((gen, hits, None)),
+                on_done=lambda total, truncated: self._search_pages.append((gen, None, (total, truncated))),
+            )
+        except re.error as e:
+            where = f" at {e.pos}" if e.pos is not None else ""
+            self.search_status.configure(text=f"bad regex: {e.msg}{where}")
+            return "break"
+        self._results = results
+        self.console.set_source(StoreSource(results), follow=False)
+        self.live_btn.configure(state="normal")
+        self.search_status.configure(text="searching…")
+        self._poll_search(gen)
+        return "break"
+
+    def _poll_search(self, gen: int):
+        if gen != self._search_gen:
+            return
+        if self._sched.suspended or not self._drain_search_pages():
+            self.after(FRAME_MS * 6, self._poll_search, gen)
+
+    def _drain_search_pages(self) -> bool:
+        """Move finished result pages into the results view; True once the search is done."""
+        results = self._results
+        finished = False
+        while self._search_pages:
+            gen, hits, done = self._search_pages.popleft()
+            if results is None or gen != self._search_gen:
+                continue
+            if done is not None:
+                total, truncated = done
+                self.search_status.configure(text=f"{total:,} hits" + ("+" if truncated else ""))
+                finished = True
+                continue
+            results.extend((f"{time.strftime('%m-%d %H:%M:%S', time.localtime(h.ts))}  {h.text}", h.level)
+                           for h in hits)
+        if results is not None:
+            self.console.refresh()
+        return finished
+
+    def _show_live(self):
+        if self._search_cancel is not None:
+            self._search_cancel.set()
+            self._search_cancel = None
+        self._search_gen += 1
+        self._search_pages.clear()
+        self._results = None
+        self.console.set_source(self._live_source, follow=True)
+        self.live_btn.configure(state="disabled")
+        self.search_status.configure(text="")
 
     def _on_send(self, _evt=None):
         raw = (self.cmd_var.get() or "").strip()
@@ -1,13 +1,56 @@
 # tabs/players_tab.py
+import bisect, time
 import customtkinter as ctk
 from theme import COLORS
 
+LABEL_H = 26                  # row label height (px, before UI scaling)
+ROW_PITCH = LABEL_H + 2 * 3 + 2 * 2   # label + its padding + the row's own grid padding
+REFRESH_MS = 1000             # session clocks on the visible rows
+SORT_JOINED, SORT_NAME, SORT_ONLINE, SORT_TOTAL, SORT_SESSIONS = "#", "Player", "Online", "Playtime", "Sessions"
+COLUMNS = ((SORT_JOINED, 40), (SORT_NAME, 0), (SORT_ONLINE, 80), (SORT_TOTAL, 80), (SORT_SESSIONS, 70))
+# (title, width); 0 stretches
+
+
+def fmt_duration(secs: float) -> str:
+    secs = int(max(0, secs))
+    if secs < 60:
+        return f"{secs}s"
+    if secs < 3600:
+        return f"{secs // 60}m"
+    return f"{secs // 3600}h {secs % 3600 // 60:02d}m"
+
+
 class PlayersTab(ctk.CTkFrame):
+    """
+    Online players as a virtual list: only the rows that fit on screen exist,
+    as a pool of row widgets that are pointed at other players when the list
+    scrolls or changes. The sorted, filtered view is kept by key (a join or
+    leave is one bisect), and a row label is only reconfigured when its text
+    changed. Click a column title to sort; the entry filters by name.
+
+    With a SessionTracker (set_sessions) each row also shows the current
+    session, total playtime and session count, and the header line shows
+    concurrency peaks and login latency. A sort key is taken when a player
+    joins and kept until they leave: session starts don't move while they
+    are online, so the order stays valid while the clocks run.
+    """
     def __init__(self, master, initial_max_players: int = 20):
         super().__init__(master, fg_color=COLORS["tab_bg"])
 
         self.max_players = int(initial_max_players)
-        self._current_players: list[str] = []
+        self._joined = {}            # name -> join sequence number ("#" sorts by it)
+        self._seq = 0
+        self._sessions = None        # SessionTracker of the server on screen
+        self._keys = {}              # name -> sort key taken when it entered the view
+        self._view = []              # names that pass the filter, ascending by their key
+        self._job = None
+        self._sort = SORT_JOINED
+        self._descending = False
+        self._needle = ""            # case-folded filter text
+        self._top = 0                # view index of the first visible row
+        self._pool = []              # [frame, [labels], shown cells or None] per visible row
+        self._rows = 1               # rows that fit in the body
+        self._visible = False
 
         card = ctk.CTkFrame(
             self, fg_color=COLORS["card_bg"], corner_radius=12,
@@ -15,7 +58,7 @@ class PlayersTab(ctk.CTkFrame):
         )
         card.pack(fill="both", expand=True, padx=8, pady=8)
 
-        # Header row: title on the left, "X/Y" on the right
+        # Header row: title on the left, "X/Y" and the filter on the right
         header_row = ctk.CTkFrame(card, fg_color=COLORS["card_bg"])
         header_row.pack(fill="x", padx=12, pady=(10, 4))
 
@@ -26,28 +69,73 @@ class PlayersTab(ctk.CTkFrame):
         self.count_lbl = ctk.CTkLabel(header_row, text="", font=("Segoe UI Semibold", 14))
         self.count_lbl.pack(side="right")
 
-        # Table area
-        self.table = ctk.CTkScrollableFrame(card, fg_color=COLORS["players_list_bg"], corner_radius=10)
-        self.table.pack(fill="both", expand=True, padx=12, pady=8)
-        self.table.grid_columnconfigure(0, minsize=40)   # index column
-        self.table.grid_columnconfigure(1, weight=1)     # name column
-
-        # Table header
-        head = ctk.CTkFrame(self.table, fg_color=COLORS["players_list_bg"])
-        head.grid(row=0, column=0, columnspan=2, sticky="ew", padx=8, pady=(8, 4))
-        ctk.CTkLabel(head, text="#", width=40, anchor="w",
-                     font=("Segoe UI Semibold", 12)).pack(side="left", padx=(4, 6))
-        ctk.CTkLabel(head, text="Player", anchor="w",
-                     font=("Segoe UI Semibold", 12)).pack(side="left")
-
-        self._render([])
-        self._update_counter()
+        self.stats_lbl = ctk.CTkLabel(card, text="", font=("Segoe UI", 12), anchor="w",
+                                      text_color=COLORS["muted_text"])
+        self.detail_lbl = ctk.CTkLabel(card, text="Click a player for their recent sessions.",
+                                       font=("Segoe UI", 12), anchor="w", text_color=COLORS["muted_text"])
+
+        self.filter_var = ctk.StringVar()
+        self.filter_var.trace_add("write", lambda *_: self._on_filter())
+        ctk.CTkEntry(header_row, textvariable=self.filter_var, width=180, corner_radius=8,
+                     placeholder_text="Filter by name…").pack(side="right", padx=(0, 12))
+
+        self.stats_lbl.pack(fill="x", padx=14)
+        self.detail_lbl.pack(fill="x", padx=14)
+
+        # Table area: column titles, then the row pool beside a scrollbar
+        table = ctk.CTkFrame(card, fg_color=COLORS["players_list_bg"], corner_radius=10)
+        table.pack(fill="both", expand=True, padx=12, pady=8)
+
+        head = ctk.CTkFrame(table, fg_color=COLORS["players_list_bg"])
+        head.pack(fill="x", padx=8, pady=(8, 4))
+        self._titles = {}
+        for title, width in COLUMNS:
+            lbl = ctk.CTkLabel(head, text=title, width=width, anchor="w" if title == SORT_NAME else "e",
+                               cursor="hand2", font=("Segoe UI Semibold", 12))
+            lbl.pack(side="left", padx=(4, 6), fill="x", expand=not width)
+            lbl.bind("<Button-1>", lambda _e, c=title: self._sort_by(c))
+            self._titles[title] = lbl
+        self._show_titles()
+
+        body_row = ctk.CTkFrame(table, fg_color=COLORS["players_list_bg"])
+        body_row.pack(fill="both", expand=True, padx=(0, 4), pady=(0, 8))
+        self.scroll = ctk.CTkScrollbar(body_row, command=self._on_scrollbar)
+        self.scroll.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(body_row, fg_color=COLORS["players_list_bg"], corner_radius=0)
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.grid_columnconfigure(0, weight=1)
+        self.body.grid_propagate(False)      # the pool is sized to the body, never the other way round
+        self.empty_lbl = ctk.CTkLabel(self.body, text="", text_color=COLORS["muted_text"])
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
 
     # ---- public API called by app.py ----
     def set_players(self, names: list[str]):
-        self._current_players = list(names)
-        self._render(self._current_players)
-        self._update_counter()
+        """The full online list; only joins and leaves touch the view."""
+        online = set(names)
+        left = [n for n in self._joined if n not in online]
+        joined = [n for n in dict.fromkeys(names) if n not in self._joined]
+        for name in left:
+            if name in self._keys:
+                self._view_remove(name)
+            del self._joined[name]
+        for name in joined:
+            self._seq += 1
+            self._joined[name] = self._seq
+            if self._matches(name):
+                self._view_add(name)
+        if left or joined:
+            self._render()
+
+    def set_sessions(self, sessions):
+        """SessionTracker of the server on screen (None hides the session columns' values)."""
+        if sessions is self._sessions:
+            return
+        self._sessions = sessions
+        self.detail_lbl.configure(text="Click a player for their recent sessions.")
+        self._rebuild_view()
+        self._render()
 
     def set_max_players(self, n: int):
         try:
@@ -56,48 +144,228 @@ class PlayersTab(ctk.CTkFrame):
             return
         self._update_counter()
 
+    def on_show(self):
+        self._visible = True
+        self._render()               # everything that changed while hidden, in one pass
+        if self._job is None:
+            self._job = self.after(REFRESH_MS, self._tick)
+
+    def on_hide(self):
+        self._visible = False
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+
+    # ---- view (sorted + filtered names) ----
+    def _key(self, name: str):
+        if self._sort == SORT_NAME:
+            return (name.casefold(), name)
+        if self._sort == SORT_JOINED:
+            return (self._joined[name], name)
+        rec = self._sessions.get(name) if self._sessions is not None else None
+        since = rec.online_since if rec is not None and rec.online_since is not None else 0.0
+        if rec is None:
+            value = 0.0
+        elif self._sort == SORT_ONLINE:
+            value = -since                    # longer online = earlier start
+        elif self._sort == SORT_TOTAL:
+            value = rec.total - since         # + now, the same for everyone
+        else:
+            value = rec.sessions
+        return (value, name.casefold(), name)
+
+    def _matches(self, name: str) -> bool:
+        return not self._needle or self._needle in name.casefold()
+
+    def _view_add(self, name: str):
+        self._keys[name] = self._key(name)
+        bisect.insort(self._view, name, key=self._keys.__getitem__)
+
+    def _view_remove(self, name: str):
+        i = bisect.bisect_left(self._view, self._keys[name], key=self._keys.__getitem__)
+        if i < len(self._view) and self._view[i] == name:
+            del self._view[i]
+        del self._keys[name]
+
+    def _rebuild_view(self):
+        self._keys = {n: self._key(n) for n in self._joined if self._matches(n)}
+        self._view = sorted(self._keys, key=self._keys.__getitem__)
+        self._top = 0
+
+    def _sort_by(self, column: str):
+        if column == self._sort:
+            self._descending = not self._descending
+        else:
+            self._sort, self._descending = column, False
+        self._rebuild_view()
+        self._show_titles()
+        self._render()
+
+    def _on_filter(self):
+        needle = (self.filter_var.get() or "").strip().casefold()
+        if needle != self._needle:
+            self._needle = needle
+            self._rebuild_view()
+            self._render()
+
+    def _name_at(self, k: int) -> str:
+        """Name on the k-th row (the view is ascending; descending reads it backwards)."""
+        return self._view[-1 - k] if self._descending else self._view[k]
+
     # ---- internal ----
     def _update_counter(self):
-        self.count_lbl.configure(text=f"{len(self._current_players)}/{self.max_players}")
-
-    def _render(self, players: list[str]):
-        # Clear existing rows (but keep header at grid row 0)
-        for w in self.table.winfo_children():
-            # don't delete the header frame we added first
-            if isinstance(w, ctk.CTkFrame) and any(isinstance(c, ctk.CTkLabel) for c in w.winfo_children()):
-                # it's the header if it's at row=0 and columnspan=2; we skip it
-                # we can't easily inspect grid_info for columnspan, so just skip the first frame
-                header = w
-                break
-        # remove everything then re-add header
-        for child in self.table.winfo_children():
-            child.destroy()
-
-        # Recreate header
-        head = ctk.CTkFrame(self.table, fg_color=COLORS["players_list_bg"])
-        head.grid(row=0, column=0, columnspan=2, sticky="ew", padx=8, pady=(8, 4))
-        ctk.CTkLabel(head, text="#", width=40, anchor="w",
-                     font=("Segoe UI Semibold", 12)).pack(side="left", padx=(4, 6))
-        ctk.CTkLabel(head, text="Player", anchor="w",
-                     font=("Segoe UI Semibold", 12)).pack(side="left")
-
-        if not players:
-            empty = ctk.CTkLabel(self.table, text="No players online.", text_color=COLORS["muted_text"])
-            empty.grid(row=1, column=0, columnspan=2, sticky="w", padx=16, pady=(4, 10))
+        if not self._visible:
             return
+        text = f"{len(self._joined)}/{self.max_players}"
+        if self._needle:
+            text = f"{len(self._view)} shown  ·  " + text
+        self.count_lbl.configure(text=text)
+
+    def _show_titles(self):
+        arrow = " ▼" if self._descending else " ▲"
+        for title, lbl in self._titles.items():
+            lbl.configure(text=title + (arrow if title == self._sort else ""))
 
-        # One row per player: index + indented name
-        for idx, name in enumerate(players, start=1):
-            row = ctk.CTkFrame(self.table, fg_color=COLORS["player_row_bg"], corner_radius=8)
-            row.grid(row=idx, column=0, columnspan=2, sticky="ew", padx=8, pady=4)
+    def _render(self):
+        """Point the pool at the visible slice of the view; unchanged labels are left alone."""
+        if not self._visible:
+            return                   # on_show() catches up
+        n = len(self._view)
+        self._top = max(0, min(self._top, n - self._rows))
+        now = time.time()
+        for i, row in enumerate(self._pool):
+            k = self._top + i
+            cells = self._cells(k, now) if k < n else None
+            if cells == row[2]:
+                continue
+            if cells is None:
+                row[0].grid_remove()
+            else:
+                for lbl, old, new in zip(row[1], row[2] or (None,) * len(cells), cells):
+                    if old != new:
+                        lbl.configure(text=new)
+                if row[2] is None:
+                    row[0].grid()
+            row[2] = cells
 
-            # index column
-            ctk.CTkLabel(row, text=str(idx), width=40, anchor="e",
-                         font=("Segoe UI", 12)).grid(row=0, column=0, sticky="e", padx=(8, 6), pady=8)
+        if n:
+            self.empty_lbl.grid_remove()
+            self.scroll.set(self._top / n, min(n, self._top + self._rows) / n)
+        else:
+            self.empty_lbl.configure(text="No players match." if self._joined else "No players online.")
+            self.empty_lbl.grid(row=0, column=0, sticky="w", padx=16, pady=(4, 10))
+            self.scroll.set(0.0, 1.0)
+        self._update_counter()
+        self._update_stats()
 
-            # name column (indented)
-            name_lbl = ctk.CTkLabel(row, text=name, anchor="w", font=("Segoe UI", 13, "bold"))
-            name_lbl.grid(row=0, column=1, sticky="w", padx=(12, 10), pady=8)
+    def _cells(self, k: int, now: float) -> tuple:
+        name = self._name_at(k)
+        rec = self._sessions.get(name) if self._sessions is not None else None
+        if rec is None:
+            return (str(k + 1), name, "—", "—", "—")
+        online = rec.online_since is not None
+        return (str(k + 1), name, fmt_duration(rec.session_secs(now)) if online else "—",
+                fmt_duration(rec.total_secs(now)), str(rec.sessions + online))
 
-            row.grid_columnconfigure(0, minsize=40)
-            row.grid_columnconfigure(1, weight=1)
+    def _update_stats(self):
+        """Header line: today's and recent concurrency peaks, login latency percentiles."""
+        t = self._sessions
+        if t is None:
+            return
+        parts = []
+        peaks = t.recent_peaks(7)
+        if peaks:
+            day, n, ts = peaks[-1]
+            if day == time.strftime("%Y-%m-%d"):
+                parts.append(f"Peak today {n} at {time.strftime('%H:%M', time.localtime(ts))}")
+            parts.append("last 7 days " + " ".join(
+                f"{time.strftime('%a', time.strptime(d, '%Y-%m-%d'))} {p}" for d, p, _ts in peaks))
+        pct = t.latency_percentiles()["auth"]
+        if pct:
+            parts.append(f"login p50 {pct[50]:.0f} / p95 {pct[95]:.0f} / p99 {pct[99]:.0f} ms")
+        text = "  ·  ".join(parts) or "No sessions recorded yet."
+        if self.stats_lbl.cget("text") != text:
+            self.stats_lbl.configure(text=text)
+
+    def _tick(self):
+        self._render()               # only the clock labels that changed are touched
+        self._job = self.after(REFRESH_MS, self._tick)
+
+    def _click(self, row):
+        if row[2] is None or self._sessions is None:
+            return
+        name = row[2][1]
+        rec = self._sessions.get(name)
+        if rec is None:
+            return
+        past = self._sessions.sessions_of(name, limit=5)
+        text = f"{name}: longest {fmt_duration(rec.longest)}"
+        if rec.first_seen:
+            text += f"  ·  first seen {time.strftime('%Y-%m-%d', time.localtime(rec.first_seen))}"
+        if past:
+            text += "  ·  recent " + ", ".join(
+                f"{fmt_duration(s.end - s.start)} ({time.strftime('%m-%d %H:%M', time.localtime(s.start))})"
+                for s in past)
+        self.detail_lbl.configure(text=text)
+
+    def _make_row(self, i: int):
+        frame = ctk.CTkFrame(self.body, fg_color=COLORS["player_row_bg"], corner_radius=8)
+        frame.grid(row=i, column=0, sticky="ew", padx=8, pady=2)
+        row = [frame, [], None]
+
+        # index column, the indented name, then the session columns
+        for col, (title, width) in enumerate(COLUMNS):
+            if title == SORT_NAME:
+                lbl = ctk.CTkLabel(frame, text="", height=LABEL_H, anchor="w", font=("Segoe UI", 13, "bold"))
+                lbl.grid(row=0, column=col, sticky="w", padx=(12, 10), pady=3)
+                frame.grid_columnconfigure(col, weight=1)
+            else:
+                lbl = ctk.CTkLabel(frame, text="", width=width, height=LABEL_H, anchor="e", font=("Segoe UI", 12))
+                lbl.grid(row=0, column=col, sticky="e", padx=(8, 6), pady=3)
+            row[1].append(lbl)
+
+        for w in (frame, *row[1]):
+            self._bind_wheel(w)
+            w.bind("<Button-1>", lambda _e, r=row: self._click(r))
+        frame.grid_remove()          # shown once it has a player
+        return row
+
+    def _on_resize(self, evt):
+        pitch = ROW_PITCH * ctk.ScalingTracker.get_widget_scaling(self)
+        rows = max(1, int(evt.height // pitch))
+        if rows == self._rows and len(self._pool) == rows:
+            return
+        self._rows = rows
+        while len(self._pool) < rows:
+            self._pool.append(self._make_row(len(self._pool)))
+        while len(self._pool) > rows:
+            self._pool.pop()[0].destroy()
+        self._render()
+
+    # ---- scrolling ----
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda _e: self._scroll_to(self._top - 3))
+        widget.bind("<Button-5>", lambda _e: self._scroll_to(self._top + 3))
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(int(top), len(self._view) - self._rows))
+        if top != self._top:
+            self._top = top
+            self._render()
+        return "break"
+
+    def _on_wheel(self, evt):
+        step = -1 if evt.delta > 0 else 1
+        if abs(evt.delta) >= 120:            # Windows reports multiples of 120
+            step *= 3 * (abs(evt.delta) // 120)
+        return self._scroll_to(self._top + step)
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * len(self._view))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self._scroll_to(self._top + (amount * (self._rows - 1) if args[2] == "pages" else amount))
@@ -0,0 +1,163 @@
+# tabs/servers_tab.py
+import customtkinter as ctk
+from theme import COLORS
+from server_manager import STATUS_RUNNING, STATUS_STARTING, STATUS_EXTERNAL
+
+REFRESH_MS = 1000
+COLUMNS = (("Server", 170), ("Status", 90), ("MSPT", 70), ("TPS", 60), ("Memory", 80), ("CPU", 60), ("Players", 70))
+STATUS_COLORS = {STATUS_RUNNING: "#2fa84f", STATUS_EXTERNAL: "#2fa84f", STATUS_STARTING: "#d6a21e"}
+
+
+def _cells(s) -> tuple:
+    return (
+        s.name,
+        "● " + s.status,
+        f"{s.mspt:.1f}" if s.mspt is not None else "—",
+        f"{s.tps:.1f}" if s.tps is not None else "—",
+        f"{s.rss_mb:.0f} mb" if s.rss_mb is not None else "—",
+        f"{s.cpu_pct:.0f}%" if s.cpu_pct is not None else "—",
+        f"{s.players}/{s.max_players}",
+    )
+
+
+class ServersTab(ctk.CTkFrame):
+    """
+    One row per managed server (status, MSPT, memory, players) plus host
+    totals. Rows are label pools updated in place, and only while the tab is
+    visible (between on_show and on_hide); clicking a row puts that server on screen. The daemon button
+    attaches the app to a running `python daemon.py` (or detaches from it).
+    """
+    def __init__(self, master, manager, on_select, on_add, on_remove, on_daemon):
+        super().__init__(master, fg_color=COLORS["tab_bg"])
+        self.manager = manager
+        self.on_select = on_select
+        self.on_add = on_add
+        self.on_remove = on_remove
+        self.on_daemon = on_daemon
+        self.selected = None
+        self._rows = []             # [frame, [labels], last cells, server]
+        self._visible = False
+        self._job = None
+
+        card = ctk.CTkFrame(self, fg_color=COLORS["card_bg"], corner_radius=12,
+                            border_width=1, border_color=COLORS["card_border"])
+        card.pack(fill="both", expand=True, padx=8, pady=8)
+
+        header_row = ctk.CTkFrame(card, fg_color=COLORS["card_bg"])
+        header_row.pack(fill="x", padx=12, pady=(10, 4))
+        ctk.CTkLabel(header_row, text="Servers", font=("Segoe UI", 14, "bold")).pack(side="left")
+        ctk.CTkButton(header_row, text="Remove", width=80, fg_color=COLORS["btn_alt"],
+                      hover_color=COLORS["btn_hover"], command=self._remove).pack(side="right", padx=(6, 0))
+        ctk.CTkButton(header_row, text="Add server…", width=100, fg_color=COLORS["btn_alt"],
+                      hover_color=COLORS["btn_hover"], command=self.on_add).pack(side="right")
+        self.daemon_btn = ctk.CTkButton(header_row, text="", width=150, fg_color=COLORS["btn_alt"],
+                                        hover_color=COLORS["btn_hover"], command=self.on_daemon)
+        self.daemon_btn.pack(side="right", padx=(0, 6))
+        self._show_daemon_state()
+
+        self.host_lbl = ctk.CTkLabel(card, text="Host: —", font=("Segoe UI", 12), anchor="w")
+        self.host_lbl.pack(fill="x", padx=14, pady=(0, 4))
+
+        self.table = ctk.CTkScrollableFrame(card, fg_color=COLORS["players_list_bg"], corner_radius=10)
+        self.table.pack(fill="both", expand=True, padx=12, pady=8)
+        head = ctk.CTkFrame(self.table, fg_color=COLORS["players_list_bg"])
+        head.pack(fill="x", padx=4, pady=(6, 2))
+        for text, width in COLUMNS:
+            ctk.CTkLabel(head, text=text, width=width, anchor="w",
+                         font=("Segoe UI Semibold", 12)).pack(side="left", padx=4)
+
+    # ----- API -----
+    def set_manager(self, manager):
+        """Local servers or a daemon's; rows are rebound on the next refresh."""
+        self.manager = manager
+        self.selected = None
+        self._show_daemon_state()
+        self.refresh()
+
+    def set_selected(self, server):
+        self.selected = server
+        for row in self._rows:
+            self._style_row(row)
+
+    def on_show(self):
+        self._visible = True
+        self.refresh()
+        if self._job is None:
+            self._job = self.after(REFRESH_MS, self._tick)
+
+    def on_hide(self):
+        self._visible = False
+        if self._job is not None:
+            self.after_cancel(self._job)
+            self._job = None
+
+    def refresh(self):
+        if not self._visible:
+            return
+        servers = list(self.manager.servers)
+        while len(self._rows) < len(servers):
+            self._rows.append(self._make_row())
+        while len(self._rows) > len(servers):
+            self._rows.pop()[0].destroy()
+        for row, server in zip(self._rows, servers):
+            summary = server.summary()
+            cells = _cells(summary)
+            if row[3] is not server:
+                row[3] = server
+                self._style_row(row)
+            if cells != row[2]:
+                for lbl, old, new in zip(row[1], row[2] or (None,) * len(cells), cells):
+                    if old != new:
+                        lbl.configure(text=new)
+                row[1][1].configure(text_color=STATUS_COLORS.get(summary.status, COLORS["muted_text"]))
+                row[2] = cells
+        self._show_host()
+
+    # ----- internal -----
+    def _tick(self):
+        self.refresh()
+        self._job = self.after(REFRESH_MS, self._tick)
+
+    def _make_row(self):
+        frame = ctk.CTkFrame(self.table, fg_color=COLORS["players_list_bg"], corner_radius=6)
+        frame.pack(fill="x", padx=4, pady=1)
+        row = [frame, [], None, None]
+        for _text, width in COLUMNS:
+            lbl = ctk.CTkLabel(frame, text="", width=width, anchor="w", font=("Segoe UI", 12))
+            lbl.pack(side="left", padx=4)
+            lbl.bind("<Button-1>", lambda _e, r=row: self._click(r))
+            row[1].append(lbl)
+        frame.bind("<Button-1>", lambda _e, r=row: self._click(r))
+        return row
+
+    def _style_row(self, row):
+        on = row[3] is not None and row[3] is self.selected
+        row[0].configure(fg_color=COLORS["tab_selected_bg"] if on else COLORS["players_list_bg"])
+
+    def _click(self, row):
+        if row[3] is not None:
+            self.on_select(row[3])
+
+    def _remove(self):
+        if self.selected is not None:
+            self.on_remove(self.selected)
+
+    def _show_daemon_state(self):
+        self.daemon_btn.configure(text="Detach from daemon" if self.manager.remote else "Attach to daemon")
+
+    def _show_host(self):
+        h = self.manager.host
+        parts = []
+        if h.cpu_pct is not None:
+            parts.append(f"CPU {h.cpu_pct:.0f}%")
+        if h.mem_used_mb is not None:
+            parts.append(f"RAM {h.mem_used_mb / 1024:.1f}/{h.mem_total_mb / 1024:.1f} GiB")
+        parts.append(f"{h.running}/{len(self.manager.servers)} servers up")
+        parts.append(f"servers use {h.servers_rss_mb:.0f} mb, CPU {h.servers_cpu_pct:.0f}%")
+        players = sum(len(s.players) for s in self.manager.servers)
+        parts.append(f"{players} player{'s' if players != 1 else ''} online")
+        if self.manager.remote and not self.manager.connected:
+            parts.append("daemon unreachable")
+        text = "Host: " + "  ·  ".join(parts)
+        if self.host_lbl.cget("text") != text:
+            self.host_lbl.configure(text=text)
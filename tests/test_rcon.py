@@ -0,0 +1,153 @@
+# tests/test_rcon.py
+import socket, struct, threading, time, unittest
+from utils.rcon import RconClient, RconPool, RconAuthError, RconError
+
+PASSWORD = "secret"
+
+
+class VanillaRconStub:
+    """
+    RCON server framed like vanilla's RconClient thread: one read of at most
+    1460 bytes per request, which must hold exactly one packet (otherwise the
+    connection is closed), requests handled one at a time, replies split
+    into packets of 4096 characters, "Unknown request" for other types.
+    """
+    def __init__(self, reply=None):
+        self.reply = reply or (lambda cmd: f"ran {cmd}")
+        self.commands = []
+        self.bad_frames = 0
+        self.connections = 0
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self._clients = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def close(self):
+        self.sock.close()
+        self.drop_all()
+
+    def drop_all(self):
+        for c in self._clients:
+            try:
+                c.shutdown(socket.SHUT_RDWR)
+                c.close()
+            except OSError:
+                pass
+        self._clients.clear()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._clients.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _send(conn, req_id, ptype, body):
+        data = body.encode("utf-8") + b"\x00\x00"
+        conn.sendall(struct.pack("<iii", len(data) + 8, req_id, ptype) + data)
+
+    def _serve(self, conn):
+        authed = False
+        try:
+            while True:
+                buf = conn.recv(1460)
+                if len(buf) < 10:
+                    return
+                (length,) = struct.unpack_from("<i", buf)
+                if length != len(buf) - 4:
+                    self.bad_frames += 1
+                    return
+                req_id, ptype = struct.unpack_from("<ii", buf, 4)
+                body = buf[12:-2].decode("utf-8")
+                if ptype == 3:
+                    authed = body == PASSWORD
+                    self._send(conn, req_id if authed else -1, 2, "")
+                elif ptype == 2:
+                    if not authed:
+                        self._send(conn, -1, 2, "")
+                        continue
+                    self.commands.append(body)
+                    text = self.reply(body)
+                    for i in range(0, max(1, len(text)), 4096):
+                        self._send(conn, req_id, 0, text[i:i + 4096])
+                else:
+                    self._send(conn, req_id, 0, f"Unknown request {ptype:x}")
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+
+class RconClientTest(unittest.TestCase):
+    def setUp(self):
+        self.stub = VanillaRconStub(reply=self._reply)
+        self.client = RconClient("127.0.0.1", self.stub.port, PASSWORD)
+
+    def tearDown(self):
+        self.client.close()
+        self.stub.close()
+
+    @staticmethod
+    def _reply(cmd):
+        if cmd.startswith("big "):
+            return "x" * int(cmd[4:])
+        return f"ran {cmd}"
+
+    def test_command_reply(self):
+        self.assertEqual(self.client.run("list"), "ran list")
+        self.assertEqual(self.stub.bad_frames, 0)
+
+    def test_many_queued_commands_resolve_in_order(self):
+        futs = [self.client.command(f"say {i}") for i in range(300)]
+        self.assertEqual([f.result(10) for f in futs], [f"ran say {i}" for i in range(300)])
+        self.assertEqual(self.stub.bad_frames, 0)
+        self.assertEqual(self.stub.connections, 1)
+
+    def test_multi_packet_replies(self):
+        for n in (4095, 4096, 4097, 8192, 10000):
+            self.assertEqual(len(self.client.run(f"big {n}")), n)
+        self.assertEqual(self.client.run("list"), "ran list")     # nothing left over from the probes
+        self.assertEqual(self.stub.bad_frames, 0)
+
+    def test_reconnects_after_drop(self):
+        self.assertEqual(self.client.run("one"), "ran one")
+        self.stub.drop_all()
+        time.sleep(0.2)
+        self.assertEqual(self.client.run("two"), "ran two")
+        self.assertEqual(self.stub.connections, 2)
+
+    def test_wrong_password(self):
+        bad = RconClient("127.0.0.1", self.stub.port, "nope")
+        try:
+            with self.assertRaises(RconAuthError):
+                bad.run("list")
+        finally:
+            bad.close()
+
+    def test_closed_port(self):
+        s = socket.create_server(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+        s.close()
+        c = RconClient("127.0.0.1", port, PASSWORD)
+        try:
+            with self.assertRaises(RconError):
+                c.run("list")
+        finally:
+            c.close()
+
+    def test_pool(self):
+        pool = RconPool(3, host="127.0.0.1", port=self.stub.port, password=PASSWORD)
+        try:
+            futs = [pool.command(f"say {i}") for i in range(90)]
+            self.assertEqual([f.result(10) for f in futs], [f"ran say {i}" for i in range(90)])
+        finally:
+            pool.close()
+        self.assertEqual(self.stub.bad_frames, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+# utils/aioloop.py
+import asyncio, os, sys, threading
+
+_lock = threading.Lock()
+_shared = None
+
+
+def _use_pidfd_watcher(loop):
+    """
+    Before 3.12 asyncio reaps children with one waiter thread per process on
+    Unix; a pidfd watcher waits on the loop itself instead (Linux 5.3+).
+    """
+    if sys.platform == "win32" or sys.version_info >= (3, 12) or not hasattr(asyncio, "PidfdChildWatcher"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+        watcher = asyncio.PidfdChildWatcher()
+        watcher.attach_loop(loop)
+        asyncio.set_child_watcher(watcher)
+    except Exception:
+        pass
+
+
+class LoopThread:
+    """
+    One asyncio event loop running forever on one daemon thread. Every
+    ServerController schedules its process I/O here, so starting, stopping
+    and querying servers never creates threads.
+
+    The bridge is thread-safe both ways: submit() runs a coroutine from any
+    thread and returns a concurrent.futures.Future (wait on it, or add a
+    done-callback that publishes to an EventBus for the Tk thread); call()
+    runs a plain function on the loop.
+    """
+    def __init__(self, name: str = "tempo-io"):
+        self.loop = asyncio.new_event_loop()             # proactor on Windows: subprocess pipes work
+        _use_pidfd_watcher(self.loop)
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    @property
+    def in_loop(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """Run a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, fn, *args):
+        """Run fn(*args) on the loop soon (directly if already on it)."""
+        if self.in_loop:
+            fn(*args)
+        else:
+            self.loop.call_soon_threadsafe(fn, *args)
+
+    def call_later(self, delay: float, fn, *args):
+        """fn(*args) on the loop after delay seconds; callable from any thread."""
+        if self.in_loop:
+            self.loop.call_later(delay, fn, *args)
+        else:
+            self.loop.call_soon_threadsafe(self.loop.call_later, delay, fn, *args)
+
+
+def shared_loop() -> LoopThread:
+    """The process-wide I/O loop (started on first use)."""
+    global _shared
+    with _lock:
+        if _shared is None:
+            _shared = LoopThread()
+        return _shared
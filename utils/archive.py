@@ -0,0 +1,193 @@
+# utils/archive.py
+import bisect, glob, mmap, os, re, struct, threading, time
+from typing import NamedTuple
+
+ARCHIVE_DIRNAME = "tempo-console"
+KEEP_SESSIONS = 30
+
+# one fixed-width index record per line: byte offset, byte length, unix time, level
+_REC = struct.Struct("<QIdB3x")
+
+
+class ArchiveQuery(NamedTuple):
+    pattern: str | None = None          # regex (case-insensitive), None = everything
+    levels: frozenset | None = None     # parsers.LVL_* values to keep, None = all
+    since: float | None = None          # unix time bounds, inclusive
+    until: float | None = None
+
+
+class ArchiveHit(NamedTuple):
+    ts: float
+    level: int
+    text: str
+
+
+class ConsoleArchive:
+    """
+    Append-only per-session console archive in <server root>/tempo-console/:
+      <session>.log  raw UTF-8 lines
+      <session>.idx  fixed-width (offset, length, time, level) record per line
+    Written from the reader thread and Tk thread (echoes), one flush per
+    batch (no fsync); append() is thread-safe.
+    """
+    def __init__(self, root: str, session: str | None = None):
+        self.dir = os.path.join(root, ARCHIVE_DIRNAME)
+        os.makedirs(self.dir, exist_ok=True)
+        self.session = session or time.strftime("%Y%m%d-%H%M%S")
+        base = os.path.join(self.dir, self.session)
+        self._log = open(base + ".log", "ab")
+        self._idx = open(base + ".idx", "ab")
+        self._offset = self._log.tell()
+        self._lock = threading.Lock()
+        prune_sessions(self.dir)
+
+    def append(self, rows, ts: float | None = None):
+        """rows: iterable of (text, level)."""
+        ts = time.time() if ts is None else ts
+        chunks = [(text.encode("utf-8", "replace") + b"\n", level) for text, level in rows]
+        if not chunks:
+            return
+        # the loop thread (stdout) and the Tk thread (echoes) both append: offsets are taken under the lock
+        with self._lock:
+            if self._log is None:
+                return
+            recs, off = [], self._offset
+            for b, level in chunks:
+                recs.append(_REC.pack(off, len(b) - 1, ts, level))
+                off += len(b)
+            self._log.write(b"".join(b for b, _level in chunks))
+            self._idx.write(b"".join(recs))
+            self._log.flush()
+            self._idx.flush()
+            self._offset = off
+
+    def close(self):
+        with self._lock:
+            for f in (self._log, self._idx):
+                try:
+                    f.close()
+                except Exception:
+                    pass
+            self._log = self._idx = None
+
+
+def list_sessions(archive_dir: str) -> list[str]:
+    """Session base paths (without extension), oldest first."""
+    return sorted(p[:-4] for p in glob.glob(os.path.join(archive_dir, "*.idx")))
+
+
+def prune_sessions(archive_dir: str, keep: int = KEEP_SESSIONS):
+    for base in list_sessions(archive_dir)[:-keep]:
+        for ext in (".log", ".idx"):
+            try:
+                os.remove(base + ext)
+            except Exception:
+                pass
+
+
+class _SearchFull(Exception):
+    pass
+
+
+class _Column:
+    """Sequence view of one field of the mmapped index (for bisect)."""
+    def __init__(self, idx, field: int):
+        self._idx, self._field, self._n = idx, field, len(idx) // _REC.size
+
+    def __len__(self):
+        return self._n
+
+    def __getitem__(self, i):
+        return _REC.unpack_from(self._idx, i * _REC.size)[self._field]
+
+
+def _search_session(base: str, query: ArchiveQuery, rx, emit, cancel) -> bool:
+    """Stream one session's mmaps through the query; emit(hit) per match. False if cancelled."""
+    try:
+        with open(base + ".idx", "rb") as fi, open(base + ".log", "rb") as fl:
+            if os.fstat(fi.fileno()).st_size < _REC.size or os.fstat(fl.fileno()).st_size == 0:
+                return True
+            with mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ) as idx, \
+                 mmap.mmap(fl.fileno(), 0, access=mmap.ACCESS_READ) as log:
+                times = _Column(idx, 2)
+                n = len(times)
+                i0 = bisect.bisect_left(times, query.since) if query.since is not None else 0
+                i1 = bisect.bisect_right(times, query.until) if query.until is not None else n
+                if i0 >= i1:
+                    return True
+                levels = query.levels
+                unpack = _REC.unpack_from
+                size = _REC.size
+
+                if rx is None:
+                    for i in range(i0, i1):
+                        if i & 0x3FFF == 0 and cancel.is_set():
+                            return False
+                        off, ln, ts, lvl = unpack(idx, i * size)
+                        if levels is None or lvl in levels:
+                            emit(ArchiveHit(ts, lvl, log[off:off + ln].decode("utf-8", "replace")))
+                    return True
+
+                # regex: scan the log bytes directly, map each hit back to its record; a match
+                # that runs past its line's end (\s, [^x], \W eat the newline) only counts if
+                # the line matches on its own
+                offsets = _Column(idx, 0)
+                pos = unpack(idx, i0 * size)[0]
+                last_off, last_ln = unpack(idx, (i1 - 1) * size)[:2]
+                end = last_off + last_ln
+                checked, lo = 0, i0
+                while pos < end:
+                    m = rx.search(log, pos, end)
+                    if not m:
+                        break
+                    i = bisect.bisect_right(offsets, m.start(), lo, i1) - 1
+                    lo = i + 1
+                    off, ln, ts, lvl = unpack(idx, i * size)
+                    if (levels is None or lvl in levels) and (m.end() <= off + ln or rx.search(log, off, off + ln)):
+                        emit(ArchiveHit(ts, lvl, log[off:off + ln].decode("utf-8", "replace")))
+                    pos = off + ln + 1
+                    checked += 1
+                    if checked & 0x3FF == 0 and cancel.is_set():
+                        return False
+                return True
+    except (OSError, ValueError):
+        return True
+
+
+def search_archives(archive_dir: str, query: ArchiveQuery, on_page, on_done=None,
+                    page_size: int = 500, max_hits: int = 100_000, cancel: threading.Event | None = None):
+    """
+    Run a query over every session in archive_dir (oldest first) on a worker
+    thread. on_page(list[ArchiveHit]) and on_done(total, truncated) are called
+    from that thread. Returns the cancel Event; raises re.error for a bad pattern.
+    """
+    cancel = cancel or threading.Event()
+    rx = re.compile(query.pattern.encode("utf-8"), re.IGNORECASE | re.MULTILINE) if query.pattern else None
+
+    def worker():
+        page, total = [], 0
+
+        def emit(hit):
+            nonlocal page, total
+            page.append(hit)
+            total += 1
+            if len(page) >= page_size:
+                on_page(page)
+                page = []
+            if total >= max_hits:
+                raise _SearchFull
+
+        truncated = False
+        try:
+            for base in list_sessions(archive_dir):
+                if cancel.is_set() or not _search_session(base, query, rx, emit, cancel):
+                    break
+        except _SearchFull:
+            truncated = True
+        if page:
+            on_page(page)
+        if on_done:
+            on_done(total, truncated)
+
+    threading.Thread(target=worker, daemon=True).start()
+    return cancel
@@ -0,0 +1,241 @@
+# utils/commands.py
+import threading, time
+from collections import deque
+from concurrent.futures import Future
+from utils.parsers import EV_LIST, EV_REPLY
+
+
+class CommandError(Exception):
+    pass
+
+
+class UnknownCommandError(CommandError):
+    """The server answered 'Unknown or incomplete command'."""
+
+
+def _is_unknown(low: str) -> bool:
+    return low.startswith("unknown or incomplete command") or low.endswith("<--[here]")
+
+
+def message_of(text: str) -> str:
+    """Message part of a console line (after the '[time] [thread/LEVEL]: ' header)."""
+    j = text.find("]: ")
+    return (text[j + 3:] if j != -1 else text).strip()
+
+
+class ResponseMatcher:
+    """
+    Decides which console lines answer a command and when the answer is
+    complete. Only plain lines (no event kind) are offered, plus event lines
+    of the kinds in `kinds`; those are read but passed on unchanged, so a
+    join or a "Done" during a reply still reaches everyone else.
+
+    The default is for commands whose reply shape is unknown: it takes up to
+    `max_lines` plain lines until `quiet` seconds pass without one, for at
+    most `timeout` seconds. Subclasses narrow accept() and end early in
+    complete().
+    """
+    timeout = 1.0      # hard cap from the moment the command is written
+    quiet = 0.3        # complete after this long without an accepted line (None = wait for complete())
+    max_lines = 50
+    kinds = frozenset()
+
+    def accept(self, parsed) -> bool:
+        return parsed.kind is None
+
+    def complete(self, lines: list) -> bool:
+        return len(lines) >= self.max_lines
+
+    def result(self, lines: list):
+        return [p.text for p in lines]
+
+
+class ListMatcher(ResponseMatcher):
+    """`list` -> (online, max, [names]) from the single 'There are X of a max of Y' line."""
+    quiet = None
+    kinds = frozenset((EV_LIST,))
+
+    def accept(self, parsed) -> bool:
+        return parsed.kind == EV_LIST
+
+    def complete(self, lines) -> bool:
+        return bool(lines)
+
+    def result(self, lines):
+        return lines[0].data
+
+
+class CommandHandle(Future):
+    """
+    Future for one stdin command; resolves to matcher.result(lines), or
+    fails with UnknownCommandError / TimeoutError / CommandError. `lines`
+    holds the ParsedLines attributed to it. Truthy, like the old True.
+    """
+    def __init__(self, command: str, matcher: ResponseMatcher, silent: bool):
+        super().__init__()
+        self.command = command
+        self.matcher = matcher
+        self.silent = silent
+        self.lines = []
+        self.sent_at = None
+        self._deadline = None
+        self._unknown = False
+
+
+class CommandQueue:
+    """
+    Serializes stdin commands so every reply line can be attributed to the
+    one command in flight. Identical pending silent commands (several queued
+    `list` polls, say) coalesce into one handle. Replies end on their
+    quiet/timeout deadlines, timed by `timers` (anything with
+    call_later(delay, fn), e.g. the I/O LoopThread) or, without one, by a
+    small clock thread.
+
+    write(text) does the actual stdin write and returns False if it failed.
+    """
+    def __init__(self, write, on_sent=None, timers=None):
+        self.write = write
+        self.on_sent = on_sent            # on_sent(handle) once written (e.g. to echo it)
+        self.timers = timers
+        self._lock = threading.RLock()     # callbacks (on_sent, future callbacks) may re-enter
+        self._cv = threading.Condition(self._lock)
+        self._pending = deque()
+        self._current = None
+        self._closed = False
+        self._timer_gen = 0               # only the newest scheduled timer acts
+        self._armed_at = None             # deadline the live timer was set for
+        if timers is None:
+            threading.Thread(target=self._clock, name="command-clock", daemon=True).start()
+
+    def submit(self, command: str, matcher: ResponseMatcher | None = None,
+               silent: bool = False, coalesce: bool | None = None) -> CommandHandle:
+        coalesce = silent if coalesce is None else coalesce
+        with self._lock:
+            if self._closed:
+                h = CommandHandle(command, matcher or ResponseMatcher(), silent)
+                h.set_exception(CommandError("server is not running"))
+                return h
+            if coalesce:
+                for h in ([self._current] if self._current else []) + list(self._pending):
+                    if h.command == command and h.silent == silent:
+                        return h
+            h = CommandHandle(command, matcher or ResponseMatcher(), silent)
+            self._pending.append(h)
+            self._pump_locked()
+            return h
+
+    def feed(self, parsed: list) -> list:
+        """
+        Reader thread: offer server lines to the command in flight. Plain
+        lines a silent command claims come back re-tagged EV_REPLY, so the
+        console files them under Tempo's own polls; event lines are never
+        changed.
+        """
+        with self._lock:
+            h = self._current
+            if h is None:
+                return parsed
+            out = []
+            moved = False
+            now = time.monotonic()
+            for p in parsed:
+                claimed = False
+                if self._current is h and not h.done() and (p.kind is None or p.kind in h.matcher.kinds):
+                    low = message_of(p.text).lower()
+                    if _is_unknown(low):
+                        h._unknown = True
+                        claimed = True
+                        if low.endswith("<--[here]"):
+                            self._finish_locked(h)
+                    elif h.matcher.accept(p):
+                        claimed = True
+                        h.lines.append(p)
+                        if h.matcher.complete(h.lines):
+                            self._finish_locked(h)
+                        elif h.matcher.quiet is not None:
+                            h._deadline = min(h.sent_at + h.matcher.timeout, now + h.matcher.quiet)
+                            moved = True
+                out.append(p._replace(kind=EV_REPLY) if claimed and h.silent and p.kind is None else p)
+            if moved:
+                self._arm_locked()
+            return out
+
+    def close(self, reason: str = "server exited"):
+        with self._lock:
+            self._closed = True
+            for h in ([self._current] if self._current else []) + list(self._pending):
+                if not h.done():
+                    h.set_exception(CommandError(reason))
+            self._current = None
+            self._pending.clear()
+            self._cv.notify()
+
+    # ----- internal (lock held) -----
+    def _pump_locked(self):
+        while self._current is None and self._pending:
+            h = self._pending.popleft()
+            if not self.write(h.command):
+                h.set_exception(CommandError("could not write to the server"))
+                continue
+            h.sent_at = time.monotonic()
+            q = h.matcher.quiet
+            h._deadline = h.sent_at + (min(q, h.matcher.timeout) if q is not None else h.matcher.timeout)
+            self._current = h
+            if self.on_sent:
+                self.on_sent(h)
+            self._arm_locked()
+
+    def _finish_locked(self, h, timed_out: bool = False):
+        if self._current is h:
+            self._current = None
+        if not h.done():
+            if h._unknown:
+                h.set_exception(UnknownCommandError(h.command))
+            elif timed_out and h.matcher.quiet is None:
+                h.set_exception(TimeoutError(f"no reply to {h.command!r}"))
+            else:
+                try:
+                    h.set_result(h.matcher.result(h.lines))
+                except Exception as e:
+                    h.set_exception(e)
+        self._pump_locked()
+
+    def _arm_locked(self):
+        """One live timer per queue: a new one only if it must fire before the live one."""
+        if self.timers is None:
+            self._cv.notify()
+            return
+        h = self._current
+        if h is None or (self._armed_at is not None and self._armed_at <= h._deadline):
+            return                          # the live timer fires first and re-arms for the rest
+        self._timer_gen += 1
+        self._armed_at = h._deadline
+        self.timers.call_later(max(0.0, h._deadline - time.monotonic()), self._on_timer, self._timer_gen)
+
+    def _on_timer(self, gen: int):
+        with self._lock:
+            if gen != self._timer_gen:
+                return                      # superseded by an earlier deadline
+            self._armed_at = None
+            h = self._current
+            if h is None or self._closed:
+                return
+            now = time.monotonic()
+            if now < h._deadline:
+                self._arm_locked()          # deadline moved (or the timer fired a hair early)
+                return
+            self._finish_locked(h, timed_out=now >= h.sent_at + h.matcher.timeout)
+
+    def _clock(self):
+        with self._lock:
+            while not self._closed:
+                h = self._current
+                if h is None:
+                    self._cv.wait()
+                    continue
+                left = h._deadline - time.monotonic()
+                if left > 0:
+                    self._cv.wait(left)
+                    continue
+                hard = time.monotonic() >= h.sent_at + h.matcher.timeout
+                self._finish_locked(h, timed_out=hard)
@@ -0,0 +1,52 @@
+# utils/discovery.py
+import os
+from utils.optional import psutil as _psutil
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+def _is_java(name: str, cmdline: list) -> bool:
+    exe = os.path.basename(cmdline[0]) if cmdline else ""
+    return (name or "").lower().startswith("java") or exe.lower().startswith("java")
+
+
+def find_server_process(root: str, jar_path: str | None = None):
+    """
+    The java process serving `root`: its working directory is the server
+    root, or it was started with `-jar <jar_path>` (relative jars resolved
+    against its cwd). Returns a psutil.Process, or None if there is none,
+    psutil is missing or we may not inspect it. Blocking; call it off the Tk
+    thread and off the I/O loop (one pass over the process table).
+    """
+    psutil = _psutil()
+    if psutil is None or not root:
+        return None
+    root = _norm(root)
+    jar = _norm(jar_path) if jar_path else None
+    own = os.getpid()
+    for p in psutil.process_iter(["pid", "name", "cmdline"]):
+        try:
+            info = p.info
+            cmdline = info.get("cmdline") or []
+            if info["pid"] == own or not _is_java(info.get("name"), cmdline):
+                continue
+            try:
+                cwd = _norm(p.cwd())
+            except (psutil.AccessDenied, OSError):
+                cwd = None
+            if cwd == root:
+                return p
+            if jar is None:
+                continue
+            for i, arg in enumerate(cmdline[:-1]):
+                if arg == "-jar":
+                    target = cmdline[i + 1]
+                    if not os.path.isabs(target) and cwd is not None:
+                        target = os.path.join(cwd, target)
+                    if _norm(target) == jar:
+                        return p
+        except Exception:
+            continue            # gone, or not ours to inspect
+    return None
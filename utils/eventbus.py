@@ -0,0 +1,159 @@
+# utils/eventbus.py
+import asyncio, threading
+
+POLICY_BLOCK = "block"              # publisher waits for room (back-pressure onto the pipe)
+POLICY_DROP_OLDEST = "drop_oldest"  # overwrite the oldest pending event
+POLICY_COALESCE = "coalesce"        # merge into pending events first, then drop oldest
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_COALESCE)
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class EventBus:
+    """
+    Bounded ring buffer between worker threads (publish) and the Tk thread (drain).
+
+    Events are (kind, payload) pairs. An event published with a key replaces a
+    still-pending event with the same key (latest state wins, e.g. "exit").
+    Under POLICY_COALESCE a full ring merges list payloads into the newest
+    pending event of the same kind before anything is dropped. Keyed events
+    are never the ones dropped to make room.
+
+    POLICY_BLOCK never blocks the consumer's own thread (the one calling
+    drain()): a publish from there, e.g. a command echo on the Tk thread,
+    drops the oldest event instead of waiting for a drain that can't come.
+    Nor does it block a thread running an asyncio loop (the shared I/O loop
+    publishes every server's output), which would stall all of its servers.
+    """
+    def __init__(self, capacity: int = 1024, policy: str = POLICY_COALESCE, block_timeout: float | None = None):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown overflow policy: {policy}")
+        self.capacity = max(2, int(capacity))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self._slots = [None] * self.capacity   # (kind, payload, key)
+        self._head = 0                         # sequence number of the oldest pending slot
+        self._tail = 0                         # sequence number of the next free slot
+        self._keys = {}                        # key -> sequence number
+        self._consumer = None                  # ident of the thread that drains
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+
+        # counters
+        self.queued = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.peak = 0
+
+    # ----- producer side (any thread) -----
+    def publish(self, kind: str, payload=None, key=None) -> bool:
+        """Returns False only if the event was dropped (block timeout)."""
+        with self._lock:
+            if key is not None:
+                seq = self._keys.get(key)
+                if seq is not None and seq >= self._head:
+                    self._slots[seq % self.capacity] = (kind, payload, key)
+                    self.coalesced += 1
+                    return True
+
+            if self._tail - self._head >= self.capacity:
+                outcome = self._make_room(kind, payload, key)
+                if outcome == "merged":
+                    return True
+                if outcome == "dropped":
+                    return False
+
+            slot = self._tail % self.capacity
+            self._slots[slot] = (kind, payload, key)
+            if key is not None:
+                self._keys[key] = self._tail
+            self._tail += 1
+            self.queued += 1
+            depth = self._tail - self._head
+            if depth > self.peak:
+                self.peak = depth
+            return True
+
+    def _make_room(self, kind, payload, key) -> str:
+        """Called with the lock held and the ring full -> 'append', 'merged' or 'dropped'."""
+        if self.policy == POLICY_BLOCK and threading.get_ident() != self._consumer and not _in_event_loop():
+            if self._not_full.wait_for(lambda: self._tail - self._head < self.capacity, self.block_timeout):
+                return "append"
+            if key is None:
+                self.dropped += 1
+                return "dropped"
+            # a keyed event (state, "exit") still gets in: fall through and evict
+
+        if self.policy == POLICY_COALESCE and isinstance(payload, list):
+            newest = self._slots[(self._tail - 1) % self.capacity]
+            if newest is not None and newest[0] == kind and isinstance(newest[1], list):
+                newest[1].extend(payload)
+                self.coalesced += 1
+                return "merged"
+
+        self._evict_oldest()
+        return "append"
+
+    def _evict_oldest(self):
+        """Drop the oldest pending event without a key; the keyed ones before it move up a slot."""
+        cap = self.capacity
+        seq = self._head
+        while seq < self._tail and self._slots[seq % cap][2] is not None:
+            seq += 1
+        if seq == self._tail:                  # only keyed events pending: the oldest has to go
+            seq = self._head
+            key = self._slots[seq % cap][2]
+            if self._keys.get(key) == seq:
+                del self._keys[key]
+        for s in range(seq, self._head, -1):
+            ev = self._slots[(s - 1) % cap]
+            self._slots[s % cap] = ev
+            if self._keys.get(ev[2]) == s - 1:
+                self._keys[ev[2]] = s
+        self._slots[self._head % cap] = None
+        self._head += 1
+        self.dropped += 1
+
+    # ----- consumer side (Tk thread) -----
+    def drain(self, max_items: int | None = None) -> list:
+        """Pop pending events in order as (kind, payload) pairs."""
+        with self._lock:
+            self._consumer = threading.get_ident()
+            n = self._tail - self._head
+            if max_items is not None:
+                n = min(n, max_items)
+            if n <= 0:
+                return []
+            out = []
+            for seq in range(self._head, self._head + n):
+                slot = seq % self.capacity
+                kind, payload, key = self._slots[slot]
+                self._slots[slot] = None
+                if key is not None and self._keys.get(key) == seq:
+                    del self._keys[key]
+                out.append((kind, payload))
+            self._head += n
+            self._not_full.notify_all()
+            return out
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._tail - self._head
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "depth": self._tail - self._head,
+                "queued": self.queued,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "peak": self.peak,
+                "capacity": self.capacity,
+                "policy": self.policy,
+            }
@@ -0,0 +1,55 @@
+# utils/fanout.py
+import asyncio
+
+
+class FanoutRing:
+    """
+    Fixed-size ring of already-encoded frames (bytes) for streaming clients.
+    A frame is encoded once when it is published; each reader only keeps a
+    cursor (the sequence number of the next frame it wants) and writes the
+    very same bytes objects to its own socket, so another client costs a
+    cursor, not a copy of the stream.
+
+    A reader that falls more than `capacity` frames behind skips to the
+    oldest frame still held and is told how many it missed. Loop thread
+    only: publish() and every reader run on one asyncio loop.
+    """
+    def __init__(self, capacity: int = 1024):
+        self.capacity = max(2, int(capacity))
+        self._frames = [None] * self.capacity
+        self.head = 0              # sequence number of the oldest retained frame
+        self.tail = 0              # sequence number of the next frame
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def publish(self, frame: bytes) -> int:
+        seq = self.tail
+        self._frames[seq % self.capacity] = frame
+        self.tail = seq + 1
+        if self.tail - self.head > self.capacity:
+            self.head = self.tail - self.capacity
+        self._wake()
+        return seq
+
+    def read(self, cursor: int, limit: int = 256):
+        """-> (frames, next cursor, frames skipped because the reader fell behind)."""
+        skipped = 0
+        if cursor < self.head:
+            skipped, cursor = self.head - cursor, self.head
+        stop = min(self.tail, cursor + limit)
+        cap = self.capacity
+        return [self._frames[s % cap] for s in range(cursor, stop)], stop, skipped
+
+    async def wait(self, cursor: int):
+        """Return once a frame at or past cursor exists, or the ring is closed."""
+        while cursor >= self.tail and not self.closed:
+            await self._event.wait()
+
+    def close(self):
+        self.closed = True
+        self._wake()
+
+    def _wake(self):
+        # set() resolves every waiter's future; clearing right away re-arms it for the next frame
+        self._event.set()
+        self._event.clear()
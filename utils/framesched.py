@@ -0,0 +1,77 @@
+# utils/framesched.py
+import time
+from utils.timeseries import PercentileWindow
+
+
+class FrameScheduler:
+    """
+    Runs work(deadline) on the Tk loop only while something is pending, at
+    most once per frame, and never past a per-frame time budget. work()
+    returns True if it left work for the next frame.
+
+    The budget adapts: if frames arrive late (the loop is busy elsewhere) it
+    shrinks, when they are on time it grows back toward max_budget_ms.
+    suspend() parks the scheduler (e.g. during a window drag); pending work
+    runs as soon as it is resumed.
+    """
+    def __init__(self, widget, work, frame_ms: int = 16, budget_ms: float = 8.0,
+                 min_budget_ms: float = 2.0, max_budget_ms: float = 12.0):
+        self.widget = widget
+        self.work = work
+        self.frame_ms = frame_ms
+        self.budget_ms = budget_ms
+        self.min_budget_ms = min_budget_ms
+        self.max_budget_ms = max_budget_ms
+        self.latency = PercentileWindow()
+        self._job = None
+        self._due = None           # when the scheduled run was supposed to happen
+        self._pending = False
+        self._suspended = False
+
+    # ----- public API -----
+    def notify(self):
+        """Something is pending; make sure a frame is scheduled."""
+        self._pending = True
+        if self._job is None and not self._suspended:
+            self._schedule(0)
+
+    def suspend(self, flag: bool):
+        self._suspended = bool(flag)
+        if self._suspended:
+            self._cancel()
+        elif self._pending:
+            self._schedule(0)
+
+    @property
+    def suspended(self) -> bool:
+        return self._suspended
+
+    # ----- internal -----
+    def _schedule(self, delay_ms: int):
+        self._due = time.perf_counter() + delay_ms / 1000.0
+        self._job = self.widget.after(delay_ms, self._run) if delay_ms else self.widget.after_idle(self._run)
+
+    def _cancel(self):
+        if self._job is not None:
+            try:
+                self.widget.after_cancel(self._job)
+            except Exception:
+                pass
+            self._job = None
+
+    def _run(self):
+        self._job = None
+        if self._suspended:
+            return
+        start = time.perf_counter()
+        self._adapt((start - self._due) * 1000.0)
+        more = bool(self.work(start + self.budget_ms / 1000.0))
+        self._pending = more
+        if more:
+            self._schedule(self.frame_ms)
+
+    def _adapt(self, late_ms: float):
+        if late_ms > self.frame_ms / 2:
+            self.budget_ms = max(self.min_budget_ms, self.budget_ms * 0.75)
+        elif late_ms < 2.0:
+            self.budget_ms = min(self.max_budget_ms, self.budget_ms * 1.05)
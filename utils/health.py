@@ -0,0 +1,104 @@
+# utils/health.py
+import asyncio, time
+from typing import NamedTuple
+from utils.aioloop import shared_loop
+
+
+class HealthState(NamedTuple):
+    ts: float                    # time.time() of the check
+    running: bool                # debounced: flips to False only after FALSE_STREAK misses
+    proc_alive: bool             # our own child process is alive
+    port_open: bool              # something accepts connections on the server port
+    latency_ms: float | None     # connect time when port_open
+    port: int
+
+
+FALSE_STREAK = 2                 # consecutive negative checks before running -> False
+
+
+async def probe_port(host: str, port: int, timeout: float = 0.25):
+    """TCP connect on the event loop; returns connect latency in ms, or None if nothing listens."""
+    t0 = time.perf_counter()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    latency = (time.perf_counter() - t0) * 1000.0
+    writer.close()
+    return latency
+
+
+class HealthMonitor:
+    """
+    Owns "is the server up?": every `interval` seconds it checks our child
+    process and probes the server port, then publishes an immutable
+    HealthState. The app header, the Start button guard and the Stats
+    sampler all read `state` instead of probing on their own, so the Tk
+    thread never waits on a socket.
+
+    The checks run as one task on the shared I/O loop; no thread per server.
+    """
+    def __init__(self, controller, port_fn=None, interval: float = 2.0, host: str = "127.0.0.1", io=None):
+        self.controller = controller
+        self.port_fn = port_fn or (lambda: 25565)
+        self.interval = interval
+        self.host = host
+        self.io = io or shared_loop()
+        self.state = HealthState(time.time(), False, False, False, None, 25565)
+        self._false_streak = 0
+        self._task = None            # loop only
+        self._wake = None
+
+    def start(self):
+        self.io.call(self._start)
+
+    def stop(self):
+        self.io.call(self._stop)
+
+    def check_now(self):
+        """Ask for a fresh check (e.g. right after Start/Stop) instead of waiting a full interval."""
+        self.io.call(lambda: self._wake is not None and self._wake.set())
+
+    # ----- I/O loop -----
+    def _start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = self.io.loop.create_task(self._run())
+
+    def _stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = self._wake = None
+
+    async def _run(self):
+        wake = self._wake
+        while True:
+            try:
+                self.state = await self._check()
+            except Exception:
+                pass
+            try:
+                await asyncio.wait_for(wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
+
+    async def _check(self) -> HealthState:
+        try:
+            proc_alive = bool(self.controller.is_running())
+        except Exception:
+            proc_alive = False
+        try:
+            port = int(self.port_fn())
+        except Exception:
+            port = 25565
+        latency = await probe_port(self.host, port)
+        port_open = latency is not None
+
+        if proc_alive or port_open:
+            self._false_streak = 0
+            running = True
+        else:
+            self._false_streak += 1
+            running = self.state.running and self._false_streak < FALSE_STREAK
+        return HealthState(time.time(), running, proc_alive, port_open, latency, port)
@@ -0,0 +1,41 @@
+# utils/linereader.py
+import codecs, locale, re
+
+_ANSI = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+
+
+class LineDecoder:
+    """
+    Turn raw stdout chunks into complete text lines.
+    - multi-byte characters split across chunks are held by the incremental decoder
+    - a partial last line (including a half-received ANSI sequence) is kept until
+      its newline arrives, so escape codes are only stripped from whole lines
+    - CRLF is normalized and lines come back without their terminator
+    """
+    def __init__(self, encoding: str | None = None, strip_ansi: bool = True):
+        encoding = encoding or locale.getpreferredencoding(False) or "utf-8"
+        self._dec = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self._tail = ""
+        self._strip_ansi = strip_ansi
+
+    def feed(self, chunk: bytes) -> list[str]:
+        text = self._tail + self._dec.decode(chunk)
+        cut = text.rfind("\n")
+        if cut == -1:
+            self._tail = text
+            return []
+        self._tail = text[cut + 1:]
+        return self._split(text[:cut])
+
+    def flush(self) -> list[str]:
+        """Everything still buffered (call once the stream hit EOF)."""
+        text = self._tail + self._dec.decode(b"", final=True)
+        self._tail = ""
+        return self._split(text) if text else []
+
+    def _split(self, text: str) -> list[str]:
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").rstrip("\r")
+        if self._strip_ansi and "\x1b" in text:
+            text = _ANSI.sub("", text)
+        return text.split("\n")
@@ -0,0 +1,127 @@
+# utils/linestore.py
+import bisect, heapq
+from array import array
+
+BLOCK_LINES = 4096   # lines per block; trimming drops whole blocks from the front
+
+
+class _Block:
+    __slots__ = ("data", "offs", "levels")
+
+    def __init__(self):
+        self.data = bytearray()            # UTF-8 text of every line, back to back
+        self.offs = array("I", [0])        # start offset of line k is offs[k], end is offs[k + 1]
+        self.levels = bytearray()          # one class byte per line (parsers.line_class)
+
+    def __len__(self):
+        return len(self.levels)
+
+
+class LineStore:
+    """
+    Compact console scrollback: no Python str per line, just UTF-8 bytes,
+    a uint32 offset array and a class byte per line, grouped into blocks.
+
+    Lines have global ids that never change (0 = first line ever appended);
+    only ids in [first, end) are still retained. Once more than max_lines are
+    held the oldest block is dropped, so memory stays flat at the cap.
+
+    Every class byte also gets a posting list (sorted global ids), so filtered
+    views are built by merging lists, never by re-reading text.
+    """
+    def __init__(self, max_lines: int = 500_000):
+        self.max_lines = max(BLOCK_LINES, int(max_lines))
+        self._blocks = [_Block()]
+        self.first = 0      # global id of the oldest retained line
+        self.end = 0        # global id one past the newest line
+        self.postings = {}  # class byte -> array('Q') of global ids
+        self.counts = {}    # class byte -> lines ever appended (survives trimming)
+
+    def __len__(self):
+        return self.end - self.first
+
+    # ----- writing -----
+    def append(self, text: str, cls: int = 0):
+        blk = self._blocks[-1]
+        if len(blk) >= BLOCK_LINES:
+            blk = _Block()
+            self._blocks.append(blk)
+            self._trim()
+        blk.data += text.encode("utf-8", "replace")
+        blk.offs.append(len(blk.data))
+        blk.levels.append(cls)
+        post = self.postings.get(cls)
+        if post is None:
+            post = self.postings[cls] = array("Q")
+            self.counts[cls] = 0
+        post.append(self.end)
+        self.counts[cls] += 1
+        self.end += 1
+
+    def extend(self, rows):
+        """rows: iterable of (text, class byte)."""
+        for text, cls in rows:
+            self.append(text, cls)
+
+    def set_max_lines(self, n: int):
+        self.max_lines = max(BLOCK_LINES, int(n))
+        self._trim()
+
+    def _trim(self):
+        dropped = False
+        while len(self._blocks) > 1 and self.end - self.first - len(self._blocks[0]) >= self.max_lines:
+            self.first += len(self._blocks.pop(0))
+            dropped = True
+        if dropped:
+            for post in self.postings.values():
+                k = bisect.bisect_left(post, self.first)
+                if k:
+                    del post[:k]
+
+    def reset_counts(self):
+        for cls in self.counts:
+            self.counts[cls] = 0
+
+    # ----- class filters -----
+    def merged_ids(self, classes, start: int = 0) -> array:
+        """Sorted global ids >= start whose class is in classes."""
+        parts = []
+        for cls in classes:
+            post = self.postings.get(cls)
+            if post:
+                k = bisect.bisect_left(post, start)
+                if k < len(post):
+                    parts.append(post[k:])
+        if not parts:
+            return array("Q")
+        if len(parts) == 1:
+            return parts[0]
+        return array("Q", heapq.merge(*parts))
+
+    # ----- reading -----
+    def _locate(self, gid: int):
+        k = gid - self.first
+        if k < 0 or gid >= self.end:
+            raise IndexError(gid)
+        b, i = divmod(k, BLOCK_LINES)  # every block but the last is full
+        return self._blocks[b], i
+
+    def text(self, gid: int) -> str:
+        blk, i = self._locate(gid)
+        return blk.data[blk.offs[i]:blk.offs[i + 1]].decode("utf-8", "replace")
+
+    def cls(self, gid: int) -> int:
+        blk, i = self._locate(gid)
+        return blk.levels[i]
+
+    def row(self, gid: int):
+        blk, i = self._locate(gid)
+        return blk.data[blk.offs[i]:blk.offs[i + 1]].decode("utf-8", "replace"), blk.levels[i]
+
+    def rows(self, start: int, stop: int):
+        """(text, class byte) for global ids in [start, stop), clamped to what is retained."""
+        start, stop = max(start, self.first), min(stop, self.end)
+        return [self.row(g) for g in range(start, stop)]
+
+    def nbytes(self) -> int:
+        return sum(len(b.data) + b.offs.itemsize * len(b.offs) + len(b.levels) for b in self._blocks)
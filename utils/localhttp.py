@@ -0,0 +1,246 @@
+# utils/localhttp.py
+import asyncio, json, os, socket
+from typing import NamedTuple
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+
+MAX_HEAD_BYTES = 16 * 1024       # request/response line + headers
+MAX_BODY_BYTES = 1024 * 1024
+SSE_READ_CHUNK = 64 * 1024       # one read -> one batch of events
+CONNECT_TIMEOUT_SEC = 3.0
+
+_REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+            405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+            422: "Unprocessable Entity", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+SSE_HEAD = (b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+            b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+SSE_KEEPALIVE = b": keep-alive\n\n"
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str = ""):
+        super().__init__(message or _REASONS.get(status, "error"))
+        self.status = status
+
+
+class Request(NamedTuple):
+    method: str
+    path: str                    # as sent
+    parts: tuple                 # path segments, each percent-decoded
+    query: dict
+    headers: dict                # lower-case names
+    body: bytes
+
+    def json(self) -> dict:
+        if not self.body:
+            return {}
+        try:
+            obj = json.loads(self.body)
+        except Exception:
+            raise HttpError(400, "body is not JSON")
+        if not isinstance(obj, dict):
+            raise HttpError(400, "body must be a JSON object")
+        return obj
+
+
+class Endpoint(NamedTuple):
+    """Where the daemon listens; unix wins over host/port when set."""
+    host: str | None
+    port: int | None
+    unix: str | None
+    token: str
+
+
+# ----- endpoint file (written by the daemon, read by clients) -----
+def save_endpoint(path: str, ep: Endpoint):
+    tmp = path + ".tmp"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)   # it holds the access token
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({**ep._asdict(), "pid": os.getpid()}, f)
+    os.replace(tmp, path)
+
+
+def load_endpoint(path: str) -> Endpoint | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            d = json.load(f)
+        return Endpoint(d.get("host"), d.get("port"), d.get("unix"), d["token"])
+    except Exception:
+        return None
+
+
+def remove_endpoint(path: str):
+    try:
+        os.remove(path)
+    except Exception:
+        pass
+
+
+# ----- server side -----
+async def read_request(reader) -> Request | None:
+    """One request from the stream, or None if the peer went away first."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(413, "headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "bad request line")
+    headers = {}
+    for ln in lines[1:]:
+        k, sep, v = ln.partition(":")
+        if sep:
+            headers[k.strip().lower()] = v.strip()
+    try:
+        n = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise HttpError(400, "bad content-length")
+    if n > MAX_BODY_BYTES:
+        raise HttpError(413)
+    body = await reader.readexactly(n) if n > 0 else b""
+    url = urlsplit(target)
+    parts = tuple(unquote(p) for p in url.path.strip("/").split("/") if p)
+    return Request(method.upper(), url.path, parts, dict(parse_qsl(url.query)), headers, body)
+
+
+def authorized(req: Request, token: str) -> bool:
+    """Bearer token in the Authorization header (or ?token= for plain EventSource clients)."""
+    import hmac                     # daemon only; the app never loads it
+    got = req.headers.get("authorization", "")
+    got = got[7:] if got.startswith("Bearer ") else req.query.get("token", "")
+    return hmac.compare_digest(got.encode(), token.encode())
+
+
+def json_response(status: int, obj) -> bytes:
+    body = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+    return (f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n").encode("latin-1") + body
+
+
+def sse_event(event: str, data: str, id=None) -> str:
+    """One Server-Sent Event; data must be a single line."""
+    return (f"id: {id}\n" if id is not None else "") + f"event: {event}\ndata: {data}\n\n"
+
+
+# ----- client side -----
+async def _connect(ep: Endpoint):
+    if ep.unix:
+        return await asyncio.wait_for(asyncio.open_unix_connection(ep.unix, limit=MAX_HEAD_BYTES * 4),
+                                      CONNECT_TIMEOUT_SEC)
+    return await asyncio.wait_for(asyncio.open_connection(ep.host, ep.port, limit=MAX_HEAD_BYTES * 4),
+                                  CONNECT_TIMEOUT_SEC)
+
+
+def _request_bytes(ep: Endpoint, method: str, path: str, body: bytes = b"", extra: str = "") -> bytes:
+    host = "localhost" if ep.unix else f"{ep.host}:{ep.port}"
+    return (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Authorization: Bearer {ep.token}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n{extra}Connection: close\r\n\r\n").encode("utf-8") + body
+
+
+async def _read_status(reader) -> tuple[int, dict]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    parts = lines[0].split(" ", 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise HttpError(500, "bad response from daemon")
+    headers = {}
+    for ln in lines[1:]:
+        k, sep, v = ln.partition(":")
+        if sep:
+            headers[k.strip().lower()] = v.strip()
+    return int(parts[1]), headers
+
+
+async def request(ep: Endpoint, method: str, path: str, obj=None, timeout: float = 10.0):
+    """JSON request -> decoded JSON reply; non-2xx replies raise HttpError with the daemon's message."""
+    async def go():
+        reader, writer = await _connect(ep)
+        try:
+            body = json.dumps(obj).encode("utf-8") if obj is not None else b""
+            writer.write(_request_bytes(ep, method, path, body))
+            await writer.drain()
+            status, headers = await _read_status(reader)
+            n = int(headers.get("content-length") or 0)
+            data = await reader.readexactly(n) if n else await reader.read()
+        finally:
+            writer.close()
+        reply = json.loads(data) if data else {}
+        if not 200 <= status < 300:
+            raise HttpError(status, reply.get("error", "") if isinstance(reply, dict) else "")
+        return reply
+    return await asyncio.wait_for(go(), timeout)
+
+
+class SseEvent(NamedTuple):
+    event: str
+    data: str
+    id: str | None
+
+
+def _parse_event(block: str) -> SseEvent | None:
+    event, data, eid = "message", [], None
+    for ln in block.split("\n"):
+        if not ln or ln.startswith(":"):
+            continue
+        field, _, value = ln.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            event = value
+        elif field == "data":
+            data.append(value)
+        elif field == "id":
+            eid = value
+    return SseEvent(event, "\n".join(data), eid) if data else None
+
+
+async def event_batches(ep: Endpoint, path: str, last_id: str | None = None):
+    """
+    Follow an SSE stream; yields lists of SseEvents, one list per socket read,
+    so a burst of console lines arrives as one batch. Ends when the daemon
+    closes the stream; raises on connection errors.
+    """
+    reader, writer = await _connect(ep)
+    try:
+        extra = f"Last-Event-ID: {last_id}\r\n" if last_id is not None else ""
+        writer.write(_request_bytes(ep, "GET", path, extra=extra))
+        await writer.drain()
+        status, _headers = await _read_status(reader)
+        if status != 200:
+            data = await reader.read(MAX_BODY_BYTES)
+            try:
+                msg = json.loads(data).get("error", "")
+            except Exception:
+                msg = ""
+            raise HttpError(status, msg)
+        buf = b""
+        while True:
+            chunk = await reader.read(SSE_READ_CHUNK)
+            if not chunk:
+                return
+            buf += chunk
+            end = buf.rfind(b"\n\n")
+            if end == -1:
+                continue
+            blocks, buf = buf[:end].decode("utf-8", "replace"), buf[end + 2:]
+            batch = [ev for ev in map(_parse_event, blocks.split("\n\n")) if ev is not None]
+            if batch:
+                yield batch
+    finally:
+        writer.close()
+
+
+def api_path(*segments, **query) -> str:
+    """'/api/servers/My%20World/console?since=5' from raw segments and query values."""
+    path = "/" + "/".join(quote(str(s), safe="") for s in segments)
+    q = "&".join(f"{k}={quote(str(v), safe='')}" for k, v in query.items() if v is not None)
+    return path + ("?" + q if q else "")
+
+
+def unix_sockets_supported() -> bool:
+    return hasattr(socket, "AF_UNIX") and os.name != "nt"
@@ -0,0 +1,67 @@
+# utils/logtail.py
+import os
+from utils.linereader import LineDecoder
+
+READ_CHUNK = 256 * 1024        # bytes per read; everything new is read in as few calls as possible
+MAX_READ_PER_POLL = 4 * 1024 * 1024
+
+
+class LogTailer:
+    """
+    Follows a growing log file (a server's logs/latest.log) by byte offset.
+    poll() stats the file and, only if it grew, opens it, reads everything
+    past the offset in bulk and closes it again: nothing is read line by
+    line and no handle stays open, so the server can still rename the file
+    when it rotates its logs.
+
+    Rotation is a different file under the same name (inode/file index
+    changed) or a file shorter than the offset; the new file is then read
+    from its start. The tail of the old one is lost if it was rotated away
+    between two polls.
+    """
+    def __init__(self, path: str, encoding: str = "utf-8", from_end: bool = True):
+        self.path = path
+        self.encoding = encoding
+        self.offset = 0
+        self.rotations = 0
+        self._id = None              # (st_dev, st_ino) of the file the offset belongs to
+        self._decoder = LineDecoder(encoding)
+        if from_end:
+            try:
+                st = os.stat(path)
+                self.offset, self._id = st.st_size, (st.st_dev, st.st_ino)
+            except OSError:
+                pass
+
+    def poll(self) -> tuple[list[str], bool]:
+        """-> (new complete lines, True if more is waiting already). Blocking file I/O; small."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return [], False         # between rotate and re-create, or no log yet
+        file_id = (st.st_dev, st.st_ino)
+        if self._id is not None and (file_id != self._id or st.st_size < self.offset):
+            lines = self._decoder.flush()       # a half line left from the old file
+            self._decoder = LineDecoder(self.encoding)
+            self.offset = 0
+            self.rotations += 1
+        else:
+            lines = []
+        self._id = file_id
+        if st.st_size <= self.offset:
+            return lines, False
+        want = min(st.st_size - self.offset, MAX_READ_PER_POLL)
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                got = 0
+                while got < want:
+                    chunk = f.read(min(READ_CHUNK, want - got))
+                    if not chunk:
+                        break
+                    got += len(chunk)
+                    lines.extend(self._decoder.feed(chunk))
+        except OSError:
+            return lines, False
+        self.offset += got
+        return lines, self.offset < st.st_size
@@ -0,0 +1,168 @@
+# utils/metricslog.py
+import calendar, glob, os, struct, time
+
+METRICS_DIRNAME = "tempo-metrics"
+RAW_DAYS = 2              # days of per-sample segments kept as written
+KEEP_DAYS = 7             # 10-minute rollups kept this long (matches the coarsest in-memory tier)
+ROLLUP_SEC = 600
+FLUSH_BYTES = 64 * 1024   # flush early if the buffer grows past this
+FLUSH_SECS = 30           # otherwise flush at most this often
+
+# raw sample: unix time, series id, value
+_RAW = struct.Struct("<dHxxf")
+# rollup bucket: start, series id, min, max, avg, sample count
+_ROLL = struct.Struct("<dHxxfffI")
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y%m%d", time.gmtime(ts))
+
+
+def _day_age(day: str, now: float) -> float:
+    try:
+        start = calendar.timegm(time.strptime(day, "%Y%m%d"))
+    except ValueError:
+        return 0.0
+    return (now - start) / 86400.0
+
+
+class MetricsLog:
+    """
+    Append-only metrics history in <server root>/tempo-metrics/:
+      series.txt       one series name per line; the line number is its id
+      <YYYYMMDD>.raw   fixed-width (time, id, value) samples, one file per UTC day
+      <YYYYMMDD>.r600  10-minute (start, id, min, max, avg, count) rollups
+
+    add() only appends to an in-memory buffer; flush() writes it with one
+    write() per segment and no fsync, at most every FLUSH_SECS. Raw days older
+    than RAW_DAYS are rolled up to 10-minute buckets and anything older than
+    KEEP_DAYS is deleted when history is loaded.
+    """
+    def __init__(self, root: str):
+        self.dir = os.path.join(root, METRICS_DIRNAME)
+        self._names = []
+        self._ids = {}
+        self._buf = bytearray()
+        self._buf_day = None
+        self._flushed_at = time.monotonic()
+        self._read_names()
+
+    # ----- writing (Tk thread) -----
+    def add(self, name: str, ts: float, value):
+        if value is None:
+            return
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = self._new_name(name)
+            if sid is None:
+                return
+        day = _day(ts)
+        if day != self._buf_day:
+            self.flush()
+            self._buf_day = day
+        self._buf += _RAW.pack(ts, sid, value)
+        if len(self._buf) >= FLUSH_BYTES or time.monotonic() - self._flushed_at >= FLUSH_SECS:
+            self.flush()
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        if not self._buf:
+            return
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            with open(os.path.join(self.dir, self._buf_day + ".raw"), "ab") as f:
+                f.write(self._buf)
+        except Exception:
+            pass
+        self._buf.clear()
+
+    def _read_names(self):
+        try:
+            with open(os.path.join(self.dir, "series.txt"), "r", encoding="utf-8") as f:
+                self._names = [ln.strip() for ln in f if ln.strip()]
+        except Exception:
+            self._names = []
+        self._ids = {n: i for i, n in enumerate(self._names)}
+
+    def _new_name(self, name: str):
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            with open(os.path.join(self.dir, "series.txt"), "a", encoding="utf-8") as f:
+                f.write(name + "\n")
+        except Exception:
+            return None
+        self._ids[name] = len(self._names)
+        self._names.append(name)
+        return self._ids[name]
+
+    # ----- loading / retention (worker thread) -----
+    def load(self, store, until: float | None = None):
+        """
+        Replay history older than `until` into a MetricStore, oldest first
+        (rollups, then raw days). Runs retention first. Touches only files
+        older than today's segment, plus today's up to `until`.
+        """
+        self.compact()
+        names = self._names_snapshot()
+        for path in sorted(glob.glob(os.path.join(self.dir, "*.r600"))):
+            for start, sid, lo, hi, avg, cnt in _iter_file(path, _ROLL):
+                if sid < len(names) and (until is None or start < until):
+                    store.append_bucket(names[sid], start, lo, hi, avg, cnt)
+        for path in sorted(glob.glob(os.path.join(self.dir, "*.raw"))):
+            for ts, sid, value in _iter_file(path, _RAW):
+                if sid < len(names) and (until is None or ts < until):
+                    store.append(names[sid], ts, value)
+
+    def compact(self, now: float | None = None):
+        now = time.time() if now is None else now
+        for path in glob.glob(os.path.join(self.dir, "*.raw")):
+            day = os.path.basename(path)[:-4]
+            if _day_age(day, now) >= RAW_DAYS:
+                self._rollup(path, os.path.join(self.dir, day + ".r600"))
+        for path in glob.glob(os.path.join(self.dir, "*.r600")):
+            if _day_age(os.path.basename(path)[:-5], now) >= KEEP_DAYS:
+                try:
+                    os.remove(path)
+                except Exception:
+                    pass
+
+    def _rollup(self, raw_path: str, out_path: str):
+        buckets = {}
+        for ts, sid, value in _iter_file(raw_path, _RAW):
+            key = (ts // ROLLUP_SEC * ROLLUP_SEC, sid)
+            b = buckets.get(key)
+            if b is None:
+                buckets[key] = [value, value, value, 1]
+            else:
+                if value < b[0]:
+                    b[0] = value
+                if value > b[1]:
+                    b[1] = value
+                b[2] += value
+                b[3] += 1
+        out = b"".join(_ROLL.pack(start, sid, lo, hi, sm / n, n)
+                       for (start, sid), (lo, hi, sm, n) in sorted(buckets.items()))
+        try:
+            with open(out_path + ".tmp", "wb") as f:
+                f.write(out)
+            os.replace(out_path + ".tmp", out_path)
+            os.remove(raw_path)
+        except Exception:
+            pass
+
+    def _names_snapshot(self) -> list[str]:
+        try:
+            with open(os.path.join(self.dir, "series.txt"), "r", encoding="utf-8") as f:
+                return [ln.strip() for ln in f if ln.strip()]
+        except Exception:
+            return list(self._names)
+
+
+def _iter_file(path: str, rec: struct.Struct):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except Exception:
+        return iter(())
+    usable = len(data) - len(data) % rec.size       # ignore a torn last record
+    return rec.iter_unpack(memoryview(data)[:usable])
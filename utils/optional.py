@@ -0,0 +1,28 @@
+# utils/optional.py
+import importlib, threading
+
+_lock = threading.Lock()
+_modules = {}
+
+
+def optional_import(name: str):
+    """
+    Module `name`, imported on first use instead of at startup; None if it
+    isn't installed. Callable from any thread (the first caller pays).
+    """
+    try:
+        return _modules[name]
+    except KeyError:
+        pass
+    with _lock:
+        if name not in _modules:
+            try:
+                _modules[name] = importlib.import_module(name)
+            except Exception:
+                _modules[name] = None
+        return _modules[name]
+
+
+def psutil():
+    """psutil or None; its platform layer alone costs ~20 ms, so worker threads import it."""
+    return optional_import("psutil")
@@ -1,6 +1,222 @@
 # utils/parsers.py
 import re
+from typing import NamedTuple
 
+# ---- line levels (one byte per line; index into LEVEL_TAGS for console colors) ----
+LVL_NONE, LVL_INFO, LVL_WARN, LVL_ERROR, LVL_SUCCESS, LVL_CMD, LVL_APP = range(7)
+LEVEL_TAGS = (None, "LOG_INFO", "LOG_WARN", "LOG_ERROR", "LOG_SUCCESS", "LOG_CMD", "LOG_APP")
+LEVEL_MASK = 0x07
+
+# ---- line topics, or-ed onto the level to form the console's per-line class byte ----
+TOPIC_CHAT = 0x08     # '<Player> message'
+TOPIC_POLL = 0x10     # replies to commands Tempo sends on its own (e.g. the `list` poll)
+
+# ---- event kinds emitted by the classifier ----
+EV_JOIN = "join"      # data: player name
+EV_LEAVE = "leave"    # data: player name
+EV_UUID = "uuid"      # data: (player name, uuid) -- first step of a login
+EV_LOGIN = "login"    # data: player name -- 'logged in with entity id', before 'joined the game'
+EV_LIST = "list"      # data: (online, max, [names])
+EV_TICK = "tick"      # data: mspt (float)
+EV_LAG = "lag"        # data: (ms_behind, ticks_behind)
+EV_DONE = "done"      # data: startup seconds (float) or None
+EV_CHAT = "chat"      # data: (player name, message)
+EV_REPLY = "reply"    # set on replies to Tempo's own silent commands (see utils.commands)
+
+POLL_KINDS = {EV_LIST, EV_REPLY}
+
+
+class ParsedLine(NamedTuple):
+    text: str             # line with ANSI sequences removed
+    level: int            # LVL_* constant
+    kind: str | None      # EV_* constant or None
+    data: object = None
+
+
+_ANSI = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+_RE_MC_LEVEL = re.compile(r"\[.+?/(INFO|WARN|ERROR|DEBUG|TRACE)\]")
+_RE_ERROR = re.compile(r"\b(error|fatal|severe)\b")
+_RE_WARN = re.compile(r"\b(warn|warning)\b")
+_RE_DONE = re.compile(r"\b(done|started|eula accepted)\b")
+_RE_NAME = re.compile(r"[A-Za-z0-9_]{1,16}")
+_RE_COUNTS = re.compile(r"there are\s+(\d+)\s+of a max of\s+(\d+)\s+players online")
+_RE_LAG = re.compile(r"running\s+(\d+)\s*ms\s+or\s+(\d+)\s+ticks behind")
+_RE_DONE_SECS = re.compile(r"Done \(([0-9.]+)s\)")
+_RE_UUID = re.compile(r"UUID of player ([A-Za-z0-9_]{1,16}) is ([0-9a-fA-F-]{32,36})")
+_RE_LOGIN = re.compile(r"([A-Za-z0-9_]{1,16})\[.*\] logged in with entity id")
+
+_RE_TICK_MSPT = re.compile(r"\bmspt\b[^\d]*([0-9]+(?:\.[0-9]+)?)")
+_RE_TICK_AVG = re.compile(r"(?:average|mean)\s+tick\s+time[^\d]*([0-9]+(?:\.[0-9]+)?)\s*ms")
+_RE_TICK_TIME = re.compile(r"tick\s+(?:duration|time|times?)[^\d]*([0-9]+(?:\.[0-9]+)?)\s*ms")
+_RE_TICK_MS = re.compile(r"([0-9]+(?:\.[0-9]+)?)\s*ms")
+
+_MC_LEVELS = {"INFO": LVL_INFO, "WARN": LVL_WARN, "ERROR": LVL_ERROR, "DEBUG": LVL_INFO, "TRACE": LVL_INFO}
+_APP_PREFIXES = ("Working dir:", "Selected server jar:", "Max players set to", "No server jar selected.", "Server root:")
+_VERIFY_BAD = ("⚠", "differ", "could not", "not running", "unknown", "fail")
+
+
+def _tick_from_lower(low: str):
+    """MSPT from an already-lowered line; see maybe_parse_tick for the formats."""
+    for rx in (_RE_TICK_MSPT, _RE_TICK_AVG, _RE_TICK_TIME):
+        m = rx.search(low)
+        if m:
+            try:
+                return float(m.group(1))
+            except ValueError:
+                return None
+    if "spark" in low:
+        m = _RE_TICK_MS.search(low)
+        if m:
+            try:
+                return float(m.group(1))
+            except ValueError:
+                return None
+    return None
+
+
+def classify_line(line: str) -> ParsedLine:
+    """
+    Classify one console line in a single pass: strip ANSI, pick a level and
+    pull out at most one event. Cheap substring checks gate every regex so
+    ordinary chatter never hits the regex engine more than once.
+    """
+    s = _ANSI.sub("", line) if "\x1b" in line else line
+    low = s.lower()
+
+    # Our own verify output: green on success, red on problems
+    if low.startswith("[verify]"):
+        if "✓" in s or "match" in low or "ok" in low:
+            return ParsedLine(s, LVL_SUCCESS, None)
+        if any(k in low for k in _VERIFY_BAD):
+            return ParsedLine(s, LVL_ERROR, None)
+        return ParsedLine(s, LVL_SUCCESS, None)
+
+    if s.startswith("> "):  # our echoed commands
+        return ParsedLine(s, LVL_CMD, None)
+
+    # '[12:00:00] [Server thread/INFO]: message' -> header level + message part
+    level = LVL_NONE
+    msg = s
+    j = s.find("]: ")
+    if j != -1:
+        k = s.rfind("/", 0, j)
+        lvl = _MC_LEVELS.get(s[k + 1:j]) if k != -1 else None
+        if lvl is None:
+            m = _RE_MC_LEVEL.search(s)
+            lvl = _MC_LEVELS.get(m.group(1)) if m else None
+        if lvl is not None:
+            level = lvl
+        msg = s[j + 3:]
+    elif "/" in s and "]" in s:
+        m = _RE_MC_LEVEL.search(s)
+        if m:
+            level = _MC_LEVELS[m.group(1)]
+
+    # ---- events ----
+    kind, data = None, None
+    if msg.startswith("<"):
+        close = msg.find("> ")
+        if close != -1 and _RE_NAME.fullmatch(msg[1:close]):
+            kind, data = EV_CHAT, (msg[1:close], msg[close + 2:])
+    elif msg.endswith(" the game"):
+        head, _, action = msg[:-9].rpartition(" ")
+        name = head.strip()
+        if action in ("joined", "left") and _RE_NAME.fullmatch(name):
+            kind, data = (EV_JOIN if action == "joined" else EV_LEAVE), name
+    elif msg.startswith("UUID of player "):
+        m = _RE_UUID.match(msg)
+        if m:
+            kind, data = EV_UUID, (m.group(1), m.group(2).lower())
+    elif "logged in with entity id" in msg:
+        m = _RE_LOGIN.match(msg)
+        if m:
+            kind, data = EV_LOGIN, m.group(1)
+    elif "players online" in low:
+        m = _RE_COUNTS.search(low)
+        if m:
+            marker = low.rfind("players online:")
+            names = []
+            if marker != -1:
+                seg = s[marker + len("players online:"):]
+                names = [n.strip() for n in seg.split(",") if n.strip()]
+            kind, data = EV_LIST, (int(m.group(1)), int(m.group(2)), names)
+    elif "can't keep up" in low:
+        m = _RE_LAG.search(low)
+        kind, data = EV_LAG, ((int(m.group(1)), int(m.group(2))) if m else (None, None))
+    elif msg.startswith("Done ("):
+        m = _RE_DONE_SECS.match(msg)
+        kind, data = EV_DONE, (float(m.group(1)) if m else None)
+    elif "tick" in low or "mspt" in low or "spark" in low:
+        mspt = _tick_from_lower(low)
+        if mspt is not None:
+            kind, data = EV_TICK, mspt
+
+    # ---- level (header WARN/ERROR wins; INFO lines still get keyword colors) ----
+    if level in (LVL_WARN, LVL_ERROR):
+        return ParsedLine(s, level, kind, data)
+    if ("error" in low or "fatal" in low or "severe" in low) and _RE_ERROR.search(low):
+        return ParsedLine(s, LVL_ERROR, kind, data)
+    if "unknown or incomplete command" in low:
+        return ParsedLine(s, LVL_WARN, kind, data)
+    if "warn" in low and _RE_WARN.search(low):
+        return ParsedLine(s, LVL_WARN, kind, data)
+    if kind is EV_DONE or (("done" in low or "started" in low or "eula accepted" in low) and _RE_DONE.search(low)):
+        return ParsedLine(s, LVL_SUCCESS, kind, data)
+    if s.startswith(_APP_PREFIXES):
+        return ParsedLine(s, LVL_APP, kind, data)
+    return ParsedLine(s, LVL_NONE, kind, data)
+
+
+def line_class(parsed: ParsedLine) -> int:
+    """Level plus topic bits; the console keeps one posting list per class."""
+    if parsed.kind is None:
+        return parsed.level
+    if parsed.kind == EV_CHAT:
+        return parsed.level | TOPIC_CHAT
+    if parsed.kind in POLL_KINDS:
+        return parsed.level | TOPIC_POLL
+    return parsed.level
+
+
+class LogPipeline:
+    """
+    Classify each server line once and fan the result out.
+    subscribe(None, fn) receives every ParsedLine; subscribe(EV_*, fn) only
+    receives lines carrying that event.
+    """
+    def __init__(self):
+        self._line_subs = []
+        self._event_subs = {}
+
+    def subscribe(self, kind, fn):
+        if kind is None:
+            self._line_subs.append(fn)
+        else:
+            self._event_subs.setdefault(kind, []).append(fn)
+
+    def feed(self, line: str) -> ParsedLine:
+        parsed = classify_line(line)
+        self.dispatch(parsed)
+        return parsed
+
+    def feed_batch(self, lines: list[str]) -> list[ParsedLine]:
+        parsed = [classify_line(ln) for ln in lines]
+        self.dispatch_batch(parsed)
+        return parsed
+
+    def dispatch_batch(self, parsed: list[ParsedLine]):
+        for p in parsed:
+            self.dispatch(p)
+
+    def dispatch(self, parsed: ParsedLine):
+        for fn in self._line_subs:
+            fn(parsed)
+        if parsed.kind is not None:
+            for fn in self._event_subs.get(parsed.kind, ()):
+                fn(parsed)
+
+
+# ---- single-purpose helpers (kept for callers that only need one answer) ----
 def maybe_parse_tick(line: str):
     """
     Try to extract MSPT (milliseconds per tick) from a variety of sources:
@@ -11,51 +227,7 @@ def maybe_parse_tick(line: str):
       - Spark-ish lines containing 'spark' and a '... ms' value
     Returns float(ms) or None if not found.
     """
-    s = line.strip()
-    low = s.lower()
-
-    # 1) Explicit MSPT label (may not include 'ms' unit)
-    m = re.search(r"\bmspt\b[^\d]*([0-9]+(?:\.[0-9]+)?)", low)
-    if m:
-        try:
-            return float(m.group(1))
-        except ValueError:
-            return None
-
-    # 2) Average/mean tick time ... ms
-    m = re.search(r"(?:average|mean)\s+tick\s+time[^\d]*([0-9]+(?:\.[0-9]+)?)\s*ms", low)
-    if m:
-        try:
-            return float(m.group(1))
-        except ValueError:
-            return None
-
-    # 3) Tick time/duration ... ms
-    m = re.search(r"tick\s+(?:duration|time|times?)[^\d]*([0-9]+(?:\.[0-9]+)?)\s*ms", low)
-    if m:
-        try:
-            return float(m.group(1))
-        except ValueError:
-            return None
-
-    # 4) Spark-style: any line containing 'spark' and a '... ms' number
-    if "spark" in low:
-        m = re.search(r"([0-9]+(?:\.[0-9]+)?)\s*ms", low)
-        if m:
-            try:
-                return float(m.group(1))
-            except ValueError:
-                return None
-
-    # 5) Legacy exact string (kept for completeness)
-    m = re.search(r"Average tick time:\s*([0-9.]+)\s*ms", s, flags=re.IGNORECASE)
-    if m:
-        try:
-            return float(m.group(1))
-        except ValueError:
-            return None
-
-    return None
+    return _tick_from_lower(line.strip().lower())
 
 
 def parse_online_counts(line: str):
@@ -65,13 +237,9 @@ def parse_online_counts(line: str):
       'There are 0 of a max of Y players online'
     Returns (current, max) as ints, or None if no match.
     """
-    m = re.search(
-        r"There are\s+(\d+)\s+of a max of\s+(\d+)\s+players online",
-        line,
-        flags=re.IGNORECASE,
-    )
-    if m:
-        return int(m.group(1)), int(m.group(2))
+    p = classify_line(line)
+    if p.kind == EV_LIST:
+        return p.data[0], p.data[1]
     return None
 
 
@@ -83,31 +251,12 @@ def maybe_parse_players(line: str, current_players: set[str]) -> set[str] | None
       - '] <Player> joined the game' / '] <Player> left the game'
     Returns a NEW set if changed, else None.
     """
-    updated = False
-    players = set(current_players)
-    low = line.lower()
-
-    if "players online" in low:
-        try:
-            marker = low.rfind("players online:")
-            if marker != -1:
-                names_segment = line[marker + len("players online:"):].strip()
-            else:
-                names_segment = ""  # case with 0 players, no trailing colon
-            names = [n.strip() for n in names_segment.split(",") if n.strip()]
-            new_set = set(names)
-            if new_set != players:
-                players = new_set
-                updated = True
-        except Exception:
-            pass
-
-    m = re.search(r"]:\s*([A-Za-z0-9_]{1,16})\s+(joined|left) the game", line)
-    if m:
-        pname, action = m.group(1), m.group(2)
-        if action == "joined" and pname not in players:
-            players.add(pname); updated = True
-        if action == "left" and pname in players:
-            players.discard(pname); updated = True
-
-    return players if updated else None
+    p = classify_line(line)
+    if p.kind == EV_LIST:
+        new_set = set(p.data[2])
+        return new_set if new_set != current_players else None
+    if p.kind == EV_JOIN and p.data not in current_players:
+        return current_players | {p.data}
+    if p.kind == EV_LEAVE and p.data in current_players:
+        return current_players - {p.data}
+    return None
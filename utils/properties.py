@@ -0,0 +1,268 @@
+# utils/properties.py
+import os, stat, tempfile, threading
+
+PROPERTIES_FILENAME = "server.properties"
+
+# vanilla keys -> (type, default); anything else in the file is kept and read as str
+VANILLA_KEYS = {
+    "accepts-transfers": (bool, False),
+    "allow-flight": (bool, False),
+    "allow-nether": (bool, True),
+    "broadcast-console-to-ops": (bool, True),
+    "broadcast-rcon-to-ops": (bool, True),
+    "bug-report-link": (str, ""),
+    "difficulty": (str, "easy"),
+    "enable-command-block": (bool, False),
+    "enable-jmx-monitoring": (bool, False),
+    "enable-query": (bool, False),
+    "enable-rcon": (bool, False),
+    "enable-status": (bool, True),
+    "enforce-secure-profile": (bool, True),
+    "enforce-whitelist": (bool, False),
+    "entity-broadcast-range-percentage": (int, 100),
+    "force-gamemode": (bool, False),
+    "function-permission-level": (int, 2),
+    "gamemode": (str, "survival"),
+    "generate-structures": (bool, True),
+    "generator-settings": (str, "{}"),
+    "hardcore": (bool, False),
+    "hide-online-players": (bool, False),
+    "initial-disabled-packs": (str, ""),
+    "initial-enabled-packs": (str, "vanilla"),
+    "level-name": (str, "world"),
+    "level-seed": (str, ""),
+    "level-type": (str, "minecraft:normal"),
+    "log-ips": (bool, True),
+    "max-chained-neighbor-updates": (int, 1000000),
+    "max-players": (int, 20),
+    "max-tick-time": (int, 60000),
+    "max-world-size": (int, 29999984),
+    "motd": (str, "A Minecraft Server"),
+    "network-compression-threshold": (int, 256),
+    "online-mode": (bool, True),
+    "op-permission-level": (int, 4),
+    "pause-when-empty-seconds": (int, 60),
+    "player-idle-timeout": (int, 0),
+    "prevent-proxy-connections": (bool, False),
+    "pvp": (bool, True),
+    "query.port": (int, 25565),
+    "rate-limit": (int, 0),
+    "rcon.password": (str, ""),
+    "rcon.port": (int, 25575),
+    "region-file-compression": (str, "deflate"),
+    "require-resource-pack": (bool, False),
+    "resource-pack": (str, ""),
+    "resource-pack-id": (str, ""),
+    "resource-pack-prompt": (str, ""),
+    "resource-pack-sha1": (str, ""),
+    "server-ip": (str, ""),
+    "server-port": (int, 25565),
+    "simulation-distance": (int, 10),
+    "spawn-monsters": (bool, True),
+    "spawn-protection": (int, 16),
+    "sync-chunk-writes": (bool, True),
+    "text-filtering-config": (str, ""),
+    "text-filtering-version": (int, 0),
+    "use-native-transport": (bool, True),
+    "view-distance": (int, 10),
+    "white-list": (bool, False),
+}
+
+# keys that matter for server performance, with the range the UI accepts
+PERF_KEYS = {
+    "view-distance": (3, 32),
+    "simulation-distance": (3, 32),
+    "network-compression-threshold": (-1, 65535),
+    "entity-broadcast-range-percentage": (10, 1000),
+    "max-tick-time": (-1, 2 ** 31 - 1),
+    "pause-when-empty-seconds": (0, 2 ** 31 - 1),
+    "sync-chunk-writes": None,
+}
+
+
+def _unescape(s: str) -> str:
+    if "\\" not in s:
+        return s
+    out, i = [], 0
+    while i < len(s):
+        c = s[i]
+        if c == "\\" and i + 1 < len(s):
+            n = s[i + 1]
+            if n == "u" and i + 5 < len(s):
+                try:
+                    out.append(chr(int(s[i + 2:i + 6], 16)))
+                    i += 6
+                    continue
+                except ValueError:
+                    pass
+            out.append({"t": "\t", "n": "\n", "r": "\r", "f": "\f"}.get(n, n))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _escape(s: str) -> str:
+    return (s.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+             .replace(":", "\\:").replace("=", "\\="))
+
+
+def _split(line: str):
+    """'key=value' -> (key, raw value) for a property line, None for comments/blank lines."""
+    s = line.lstrip()
+    if not s or s[0] in "#!":
+        return None
+    for i, c in enumerate(s):
+        if c in "=:" and (i == 0 or s[i - 1] != "\\"):
+            return s[:i].strip(), s[i + 1:].strip()
+    return s.strip(), ""
+
+
+def to_type(key: str, value):
+    """Coerce a value (str from the file or UI, or already typed) to the key's type."""
+    typ = VANILLA_KEYS.get(key, (str, ""))[0]
+    if typ is bool:
+        if isinstance(value, bool):
+            return value
+        v = str(value).strip().lower()
+        if v in ("true", "1", "yes", "on"):
+            return True
+        if v in ("false", "0", "no", "off"):
+            return False
+        raise ValueError(f"{key}: expected true/false, got {value!r}")
+    if typ is int:
+        return int(str(value).strip())
+    return str(value)
+
+
+def _to_text(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class ServerProperties:
+    """
+    server.properties parsed once and re-read only when the file's mtime or
+    size changes, so polling loops cost one stat() instead of a full read.
+
+    get() returns values typed per VANILLA_KEYS (unknown keys as str, missing
+    keys as their vanilla default). update() rewrites the file atomically
+    (temp file + rename) with comments, ordering and untouched lines kept.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._sig = None          # (mtime_ns, size) of what we parsed, None = not loaded
+        self._lines = []          # file lines without line endings
+        self._index = {}          # key -> line number
+        self._values = {}         # key -> raw (unescaped) string
+
+    # ----- reading -----
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            sig = (None, None)
+        if sig == self._sig:
+            return
+        lines = []
+        if sig[0] is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+                    lines = f.read().splitlines()
+            except OSError:
+                lines = []
+        index, values = {}, {}
+        for n, line in enumerate(lines):
+            kv = _split(line)
+            if kv is not None:
+                index[kv[0]] = n
+                values[kv[0]] = _unescape(kv[1])
+        self._lines, self._index, self._values, self._sig = lines, index, values, sig
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            self._refresh()
+            raw = self._values.get(key)
+        if raw is None:
+            return VANILLA_KEYS[key][1] if default is None and key in VANILLA_KEYS else default
+        try:
+            return to_type(key, raw)
+        except ValueError:
+            return VANILLA_KEYS[key][1] if default is None and key in VANILLA_KEYS else default
+
+    def get_raw(self, key: str) -> str | None:
+        with self._lock:
+            self._refresh()
+            return self._values.get(key)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            self._refresh()
+            keys = list(self._values)
+        return {k: self.get(k) for k in keys}
+
+    @property
+    def port(self) -> int:
+        return self.get("server-port")
+
+    @property
+    def max_players(self) -> int:
+        return self.get("max-players")
+
+    # ----- writing -----
+    def set(self, key: str, value):
+        self.update({key: value})
+
+    def update(self, changes: dict):
+        """Validate and write several keys in one atomic replace. Raises ValueError / OSError."""
+        typed = {k: to_type(k, v) for k, v in changes.items()}
+        with self._lock:
+            self._refresh()
+            lines = list(self._lines)
+            for key, value in typed.items():
+                line = f"{key}={_escape(_to_text(value))}"
+                n = self._index.get(key)
+                if n is None:
+                    lines.append(line)
+                else:
+                    lines[n] = line
+            folder = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(prefix=".server.properties.", dir=folder)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                    f.write("\n".join(lines) + "\n")
+                # mkstemp makes it 0600; keep the original's mode (the server may run as another user)
+                try:
+                    mode = stat.S_IMODE(os.stat(self.path).st_mode)
+                except FileNotFoundError:
+                    mode = 0o644
+                os.chmod(tmp, mode)
+                os.replace(tmp, self.path)
+            except BaseException:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+            self._sig = None          # re-read (and re-index) on next access
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def properties_for(root: str) -> ServerProperties:
+    """Shared ServerProperties for <root>/server.properties (one instance per file)."""
+    path = os.path.join(os.path.abspath(root or os.getcwd()), PROPERTIES_FILENAME)
+    with _cache_lock:
+        props = _cache.get(path)
+        if props is None:
+            props = _cache[path] = ServerProperties(path)
+        return props
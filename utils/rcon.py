@@ -0,0 +1,249 @@
+# utils/rcon.py
+import asyncio, itertools, struct, threading, time
+from collections import deque
+from concurrent.futures import Future
+from utils.aioloop import shared_loop
+
+RCON_DEFAULT_PORT = 25575
+
+# packet types
+_AUTH = 3
+_AUTH_RESPONSE = 2
+_EXEC = 2
+_RESPONSE = 0
+
+_HEAD = struct.Struct("<iii")          # length, request id, type
+MAX_BODY = 1446                        # vanilla reads 1460 bytes per packet
+MAX_REPLY_CHUNK = 4096                 # vanilla splits longer replies into packets of this many characters
+
+
+class RconError(Exception):
+    pass
+
+
+class RconAuthError(RconError):
+    pass
+
+
+def _encode(req_id: int, ptype: int, body: str) -> bytes:
+    data = body.encode("utf-8") + b"\x00\x00"
+    return _HEAD.pack(len(data) + 8, req_id, ptype) + data
+
+
+class RconClient:
+    """
+    One persistent RCON connection, driven by a coroutine on the shared I/O
+    loop (it has no threads of its own).
+
+    command() returns a Future resolving to the full response text. The
+    vanilla server reads at most 1460 bytes at a time and drops the
+    connection unless that read holds exactly one packet, so requests go one
+    at a time: write a packet, read its answer, then the next. Replies over
+    one packet (4096 characters) are continued: after a full-size packet an
+    empty probe is written, and everything before the probe's answer
+    belongs to the reply. Use RconPool for parallel connections.
+
+    The connection is opened and authenticated on demand and reopened (with
+    backoff) on the next command after it drops. A command whose connection
+    drops mid-reply fails with RconError (it may have run); queued ones fail
+    if connecting fails.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = RCON_DEFAULT_PORT, password: str = "",
+                 connect_timeout: float = 3.0, reply_timeout: float = 10.0, max_backoff: float = 10.0, io=None):
+        self.host, self.port, self.password = host, port, password
+        self.connect_timeout = connect_timeout
+        self.reply_timeout = reply_timeout
+        self.max_backoff = max_backoff
+        self.io = io or shared_loop()
+        self._ids = itertools.count(1)
+        # everything below is only touched on the loop
+        self._queue = deque()              # (command, future) not sent yet
+        self._current = None               # future of the command on the wire
+        self._task = None
+        self._reader = self._writer = None
+        self._backoff = 0.5
+        self._retry_at = 0.0
+        self._closed = False
+
+    # ----- public API (any thread) -----
+    def command(self, cmd: str) -> Future:
+        fut = Future()
+        if len(cmd.encode("utf-8")) > MAX_BODY:
+            fut.set_exception(RconError("command too long for RCON"))
+            return fut
+        self.io.call(self._enqueue, cmd, fut)
+        return fut
+
+    def run(self, cmd: str, timeout: float = 5.0) -> str:
+        """Blocking convenience wrapper around command(); not for the I/O loop's own thread."""
+        return self.command(cmd).result(timeout)
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    def close(self):
+        self.io.call(self._close)
+
+    # ----- I/O loop -----
+    def _enqueue(self, cmd: str, fut: Future):
+        if self._closed:
+            fut.set_exception(RconError("client closed"))
+            return
+        self._queue.append((cmd, fut))
+        if self._task is None:
+            self._task = self.io.loop.create_task(self._run())
+
+    def _close(self):
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._disconnect()
+        self._fail(RconError("client closed"))
+
+    async def _run(self):
+        try:
+            while self._queue and not self._closed:
+                if self._writer is not None and (self._writer.is_closing() or self._reader.at_eof()):
+                    self._disconnect()             # dropped while idle; nothing was lost
+                if self._writer is None and not await self._reconnect():
+                    continue
+                cmd, fut = self._queue.popleft()
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                self._current = fut
+                try:
+                    text = await asyncio.wait_for(self._exchange(cmd), self.reply_timeout)
+                except (OSError, EOFError, asyncio.TimeoutError, RconError, struct.error) as e:
+                    self._disconnect()
+                    self._current = None
+                    fut.set_exception(e if isinstance(e, RconError) else
+                                      RconError(f"connection lost: {e or type(e).__name__}"))
+                    continue
+                self._current = None
+                fut.set_result(text)
+        finally:
+            if self._task is asyncio.current_task():
+                self._task = None
+
+    async def _reconnect(self) -> bool:
+        delay = self._retry_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            self._reader, self._writer = await self._connect()
+            self._backoff = 0.5
+            return True
+        except RconAuthError as e:
+            self._fail(e)                          # a wrong password won't fix itself
+        except (OSError, EOFError, asyncio.TimeoutError, RconError, struct.error) as e:
+            self._fail(RconError(f"cannot connect to RCON: {e or type(e).__name__}"))
+            self._retry_at = time.monotonic() + self._backoff
+            self._backoff = min(self.max_backoff, self._backoff * 2)
+        return False
+
+    async def _connect(self):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port),
+                                                self.connect_timeout)
+        try:
+            writer.write(_encode(next(self._ids), _AUTH, self.password))
+            await writer.drain()
+            while True:
+                req_id, ptype, _body = await asyncio.wait_for(_read_packet(reader), self.connect_timeout)
+                if ptype == _AUTH_RESPONSE:
+                    if req_id == -1:
+                        raise RconAuthError("RCON password rejected")
+                    return reader, writer
+        except BaseException:
+            writer.close()
+            raise
+
+    async def _exchange(self, cmd: str) -> str:
+        req_id = next(self._ids)
+        self._writer.write(_encode(req_id, _EXEC, cmd))
+        await self._writer.drain()
+        chunks, probe = [], None
+        while True:
+            got_id, _ptype, body = await _read_packet(self._reader)
+            if got_id == probe:
+                return "".join(chunks)
+            if got_id != req_id:
+                continue                           # a late answer to something that timed out
+            chunks.append(body)
+            if probe is None:
+                if len(body) < MAX_REPLY_CHUNK:
+                    return body
+                # a full packet: maybe more follow. The server answers requests in order,
+                # so the probe's answer comes after the last packet of this reply.
+                probe = next(self._ids)
+                self._writer.write(_encode(probe, _RESPONSE, ""))
+                await self._writer.drain()
+
+    def _disconnect(self):
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        self._reader = self._writer = None
+
+    def _fail(self, err):
+        if self._current is not None and not self._current.done():
+            self._current.set_exception(err)
+        self._current = None
+        while self._queue:
+            _cmd, fut = self._queue.popleft()
+            if not fut.done():
+                fut.set_exception(err)
+
+
+async def _read_packet(reader):
+    (length,) = struct.unpack("<i", await reader.readexactly(4))
+    if length < 10 or length > 1 << 20:
+        raise RconError(f"bad packet length {length}")
+    data = await reader.readexactly(length)
+    req_id, ptype = struct.unpack_from("<ii", data)
+    return req_id, ptype, data[8:-2].decode("utf-8", "replace")
+
+
+class RconPool:
+    """A few RconClients used round-robin, for automation that runs many commands at once."""
+    def __init__(self, size: int = 2, **kwargs):
+        self.clients = [RconClient(**kwargs) for _ in range(max(1, size))]
+        self._next = itertools.cycle(self.clients)
+        self._lock = threading.Lock()
+
+    def command(self, cmd: str) -> Future:
+        with self._lock:
+            client = next(self._next)
+        return client.command(cmd)
+
+    def run(self, cmd: str, timeout: float = 5.0) -> str:
+        return self.command(cmd).result(timeout)
+
+    def close(self):
+        for c in self.clients:
+            c.close()
+
+
+def enable_rcon(props, port: int | None = None) -> str:
+    """
+    Turn RCON on in a ServerProperties (takes effect on the next server start).
+    Keeps an existing password, otherwise generates one. Returns the password.
+    """
+    import secrets                  # only needed here; keeps it off the startup path
+    password = props.get("rcon.password") or secrets.token_urlsafe(18)
+    props.update({
+        "enable-rcon": True,
+        "rcon.password": password,
+        "rcon.port": port or props.get("rcon.port") or RCON_DEFAULT_PORT,
+    })
+    return password
+
+
+def client_for(props, host: str = "127.0.0.1") -> RconClient | None:
+    """An RconClient for the server described by props, or None if RCON is off there."""
+    if not props.get("enable-rcon") or not props.get("rcon.password"):
+        return None
+    return RconClient(host, props.get("rcon.port"), props.get("rcon.password"))
@@ -0,0 +1,120 @@
+# utils/sampler.py
+import threading, time
+from typing import NamedTuple
+
+from utils.optional import psutil as _psutil
+
+
+class MetricsSnapshot(NamedTuple):
+    ts: float                    # time.time() of the sample
+    running: bool
+    rss_mb: float | None         # largest RSS among the server process and its children
+    cpu_pct: float | None        # summed CPU% of the process tree (100 = one core)
+    threads: int | None
+    sys_free_pct: float | None
+    source: str                  # what rss_mb came from, for the Stats label
+
+
+class MetricsSampler:
+    """
+    Samples the server process tree on its own thread and publishes an
+    immutable MetricsSnapshot; the Tk side only ever reads `latest`.
+
+    psutil.Process handles are cached (CPU% needs the same handle between
+    calls), each process is read inside oneshot(), and the child list is only
+    re-walked every `children_every` seconds. Whether a server without our
+    process handle is up comes from the shared HealthMonitor, if one is set.
+    """
+    def __init__(self, controller, health=None, interval: float = 1.0, children_every: float = 10.0):
+        self.controller = controller
+        self.health = health
+        self.interval = interval
+        self.children_every = children_every
+        self.latest = MetricsSnapshot(time.time(), False, None, None, None, None, "source: not sampled yet")
+        self._root = None            # cached psutil.Process for the server pid
+        self._children = []
+        self._children_at = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def sample(self) -> MetricsSnapshot:
+        """Take one snapshot now (for callers that drive several samplers from one thread)."""
+        try:
+            self.latest = self._sample()
+        except Exception:
+            pass
+        return self.latest
+
+    # ----- sampler thread -----
+    def _run(self):
+        while not self._stop.is_set():
+            t0 = time.monotonic()
+            self.sample()
+            self._stop.wait(max(0.05, self.interval - (time.monotonic() - t0)))
+
+    def _server_pid(self):
+        return getattr(self.controller, "pid", None)
+
+    def _externally_running(self) -> bool:
+        health = self.health
+        return bool(health is not None and health.state.running)
+
+    def _sample(self) -> MetricsSnapshot:
+        psutil = _psutil()
+        now = time.time()
+        pid = self._server_pid()
+        running = pid is not None or self._externally_running()
+
+        free_pct = None
+        if psutil:
+            try:
+                free_pct = 100 - psutil.virtual_memory().percent
+            except Exception:
+                free_pct = None
+
+        if pid is None or not psutil:
+            self._root, self._children = None, []
+            src = "source: server stopped" if not running else "source: external server (no handle)"
+            return MetricsSnapshot(now, running, None, None, None, free_pct, src)
+
+        if self._root is None or self._root.pid != pid:
+            try:
+                self._root = psutil.Process(pid)
+            except Exception:
+                self._root = None
+                return MetricsSnapshot(now, running, None, None, None, free_pct, "source: process vanished")
+            self._root.cpu_percent(None)   # prime; first reading is always 0.0
+            self._children, self._children_at = [], 0.0
+
+        mono = time.monotonic()
+        if mono - self._children_at >= self.children_every:
+            self._children_at = mono
+            try:
+                fresh = {c.pid: c for c in self._root.children(recursive=True)}
+            except Exception:
+                fresh = {}
+            known = {c.pid: c for c in self._children}
+            self._children = [known.get(cpid, c) for cpid, c in fresh.items()]
+
+        rss, cpu, threads = [], 0.0, 0
+        for p in [self._root] + self._children:
+            try:
+                with p.oneshot():
+                    rss.append(p.memory_info().rss)
+                    cpu += p.cpu_percent(None)
+                    threads += p.num_threads()
+            except Exception:
+                pass
+        if not rss:
+            return MetricsSnapshot(now, running, None, None, None, free_pct, "source: process vanished")
+        return MetricsSnapshot(now, running, max(rss) / (1024 * 1024), cpu, threads, free_pct,
+                               "source: Java RSS (process/children)")
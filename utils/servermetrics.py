@@ -0,0 +1,113 @@
+# utils/servermetrics.py
+import threading, time
+from utils.metricslog import MetricsLog
+from utils.timeseries import MetricStore, PercentileWindow
+
+SERIES = ("rss_mb", "cpu_pct", "threads", "mspt", "tps", "players", "sys_free_pct")
+TICK_PCT_SAMPLES = 720         # percentiles over the last N tick samples (1 h at 5 s)
+
+
+class ServerMetrics:
+    """
+    Everything recorded about one server root: the fixed-memory MetricStore
+    the Stats charts read, the on-disk MetricsLog behind it, and the latest
+    tick/memory readings. Recording never touches widgets, so servers that
+    aren't on screen keep their history at no GUI cost. Tk thread only.
+
+    persist=False keeps samples in memory only, for a client that mirrors a
+    server the daemon already records to disk.
+    """
+    def __init__(self, root: str, persist: bool = True):
+        self.root = root
+        self.persist = persist
+        self.history = MetricStore(SERIES)
+        self.mspt_pct = PercentileWindow(TICK_PCT_SAMPLES)
+        self.snapshot = None          # last MetricsSnapshot recorded
+        self.last_mspt = None
+        self.last_tps = None
+        self.last_tick_ts = None      # time.time() of the last MSPT/TPS reading
+        self.last_good_mb = 0.0
+        self.lag_warnings = 0
+        self.log = None               # MetricsLog, opened on the first sample
+        self._session_t0 = None       # samples from here on are already in memory
+        self.loaded = False           # older history merged in from disk
+        self._load_result = None
+
+    # ----- recording -----
+    def record(self, snap):
+        """Sampler snapshot; persisted only while the server is running."""
+        if snap is self.snapshot:
+            return
+        self.snapshot = snap
+        if not snap.running:
+            self.history.append("sys_free_pct", snap.ts, snap.sys_free_pct)
+            return
+        if snap.rss_mb is not None:
+            self.last_good_mb = snap.rss_mb
+        self.put("sys_free_pct", snap.ts, snap.sys_free_pct)
+        self.put("rss_mb", snap.ts, snap.rss_mb)
+        self.put("cpu_pct", snap.ts, snap.cpu_pct)
+        self.put("threads", snap.ts, snap.threads)
+
+    def on_tick_sample(self, mspt: float, tps: float):
+        """TickMonitor callback: one MSPT/TPS reading."""
+        now = time.time()
+        self.last_mspt, self.last_tps = mspt, tps
+        self.last_tick_ts = now
+        self.put("mspt", now, mspt)
+        self.put("tps", now, tps)
+        self.mspt_pct.add(mspt)
+
+    def set_player_count(self, n: int):
+        self.put("players", time.time(), n)
+
+    def on_lag(self, parsed):
+        """LogPipeline subscriber for EV_LAG ("Can't keep up!") lines."""
+        self.lag_warnings += 1
+
+    def put(self, name: str, ts: float, value):
+        """Record a sample in memory and (buffered) on disk."""
+        if value is None:
+            return
+        self.history.append(name, ts, value)
+        if self._session_t0 is None:
+            self._session_t0 = ts
+        if not self.persist:
+            return
+        if self.log is None:
+            self.log = MetricsLog(self.root)
+        self.log.add(name, ts, value)
+
+    def flush(self):
+        if self.log is not None:
+            self.log.flush()
+
+    # ----- older history -----
+    def start_load(self):
+        """Read older history from disk on a worker thread; poll_load() merges it in."""
+        if self.loaded:
+            return
+        self.loaded = True
+        log = self.log or MetricsLog(self.root)
+        until = self._session_t0 if self._session_t0 is not None else time.time()
+
+        def worker():
+            older = MetricStore(SERIES)
+            try:
+                log.load(older, until=until)
+            except Exception:
+                older = None
+            self._load_result = (older,)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def poll_load(self) -> bool | None:
+        """None while loading; True once older history was merged, False if it failed."""
+        res = self._load_result
+        if res is None:
+            return None
+        self._load_result = None
+        if res[0] is None:
+            return False
+        self.history.absorb_older(res[0])
+        return True
@@ -0,0 +1,342 @@
+# utils/sessions.py
+import json, os, time
+from typing import NamedTuple
+from utils.timeseries import PercentileWindow
+
+SESSIONS_DIRNAME = "tempo-sessions"
+LOG_NAME = "sessions.log"      # one line per finished session, append-only
+INDEX_NAME = "players.json"    # per-player totals + byte offsets of that player's sessions in the log
+PEAK_DAYS = 14                 # daily concurrent-player peaks kept
+LATENCY_SAMPLES = 256          # login latency percentiles over the last N logins
+PENDING_LOGIN_SECS = 60        # a login that hasn't joined by then is forgotten
+FLUSH_SECS = 30
+
+
+class PlayerRecord:
+    """Everything known about one player name; updated in place."""
+    __slots__ = ("name", "uuid", "first_seen", "last_seen", "sessions", "total", "longest",
+                 "offsets", "online_since", "latency")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.uuid = None
+        self.first_seen = None
+        self.last_seen = None
+        self.sessions = 0            # finished sessions
+        self.total = 0.0             # seconds over finished sessions
+        self.longest = 0.0
+        self.offsets = []            # where this player's sessions start in the log
+        self.online_since = None     # start of the current session while online
+        self.latency = (None, None)  # current session's (UUID -> joined, logged in -> joined) ms
+
+    def session_secs(self, now: float) -> float:
+        return now - self.online_since if self.online_since is not None else 0.0
+
+    def total_secs(self, now: float) -> float:
+        return self.total + self.session_secs(now)
+
+
+class Session(NamedTuple):
+    start: float
+    end: float
+    name: str
+    uuid: str | None
+    auth_ms: float | None        # UUID line -> joined
+    login_ms: float | None       # logged in -> joined
+
+
+def _field(v):
+    return "-" if v is None else str(v)
+
+
+def _session_line(s: Session) -> str:
+    return "\t".join((f"{s.start:.3f}", f"{s.end:.3f}", s.name, _field(s.uuid),
+                      _field(None if s.auth_ms is None else round(s.auth_ms)),
+                      _field(None if s.login_ms is None else round(s.login_ms)))) + "\n"
+
+
+def _parse_session(line: str) -> Session | None:
+    parts = line.rstrip("\r\n").split("\t")
+    if len(parts) != 6:
+        return None
+    try:
+        return Session(float(parts[0]), float(parts[1]), parts[2], None if parts[3] == "-" else parts[3],
+                       None if parts[4] == "-" else float(parts[4]), None if parts[5] == "-" else float(parts[5]))
+    except ValueError:
+        return None
+
+
+def _day(ts: float) -> str:
+    return time.strftime("%Y-%m-%d", time.localtime(ts))
+
+
+class SessionTracker:
+    """
+    Player sessions of one server root. Join/leave lines, and the login
+    pipeline before a join ('UUID of player' -> 'logged in' -> 'joined the
+    game'), update per-player records, the online set, daily concurrency
+    peaks and login-latency percentiles, each in O(1).
+
+    Finished sessions are appended to <root>/tempo-sessions/sessions.log;
+    players.json indexes it by player (totals plus the byte offset of each
+    session), so sessions_of(name) seeks straight to one player's lines.
+    Both are written by flush(), at most every FLUSH_SECS. The index notes
+    how much of the log it covers and anything past that is re-read on load.
+
+    Times are taken when Tempo handles a line, so latencies are accurate to
+    the app's frame. persist=False only reads the files, for a client that
+    mirrors a daemon which writes them. Tk thread only.
+    """
+    def __init__(self, root: str, persist: bool = True):
+        self.root = root
+        self.persist = persist
+        self.dir = os.path.join(root, SESSIONS_DIRNAME)
+        self.players = {}            # name -> PlayerRecord
+        self.online = {}             # name -> PlayerRecord, in join order
+        self.peaks = {}              # local day "YYYY-MM-DD" -> [players, time of the peak]
+        self.auth_ms = PercentileWindow(LATENCY_SAMPLES)
+        self.login_ms = PercentileWindow(LATENCY_SAMPLES)
+        self._pending = {}           # name -> [uuid, t_uuid, t_login] while logging in
+        self._latencies = []         # recent [auth_ms, login_ms], saved in the index
+        self._buf = []               # session lines not written yet
+        self._log_size = 0           # bytes in the log including the buffer
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+        self._load()
+
+    # ----- events (LogPipeline / ManagedServer) -----
+    def on_uuid(self, name: str, uuid: str):
+        now = time.time()
+        if len(self._pending) > 32:
+            self._pending = {n: p for n, p in self._pending.items() if now - p[1] < PENDING_LOGIN_SECS}
+        self._pending[name] = [uuid, now, None]
+
+    def on_login(self, name: str):
+        p = self._pending.get(name)
+        if p is not None:
+            p[2] = time.time()
+
+    def join(self, name: str):
+        if name in self.online:
+            return
+        now = time.time()
+        rec = self.players.get(name)
+        if rec is None:
+            rec = self.players[name] = PlayerRecord(name)
+            rec.first_seen = now
+        rec.online_since = rec.last_seen = now
+        rec.latency = (None, None)
+        p = self._pending.pop(name, None)
+        if p is not None and now - p[1] < PENDING_LOGIN_SECS:
+            rec.uuid = p[0]
+            auth = (now - p[1]) * 1000.0
+            login = (now - p[2]) * 1000.0 if p[2] is not None else None
+            rec.latency = (auth, login)
+            self._add_latency(auth, login)
+            self._dirty = True
+        self.online[name] = rec
+        self._count_changed(now)
+
+    def leave(self, name: str):
+        rec = self.online.pop(name, None)
+        if rec is None:
+            return
+        now = time.time()
+        self._finish(rec, now)
+        self._count_changed(now)
+
+    def sync(self, names):
+        """Online set from a `list` reply or a status ping: join the new names, end the missing ones."""
+        for name in [n for n in self.online if n not in names]:
+            self.leave(name)
+        for name in names:
+            if name not in self.online:
+                self.join(name)
+
+    def end_all(self):
+        """The server stopped: every open session ends now."""
+        for name in list(self.online):
+            self.leave(name)
+        self._pending.clear()
+
+    # ----- reading -----
+    def get(self, name: str) -> PlayerRecord | None:
+        return self.players.get(name)
+
+    def latency_percentiles(self) -> dict:
+        """{"auth": {50: ms, 95: .., 99: ..}, "login": {...}}; empty dicts until someone logs in."""
+        return {"auth": self.auth_ms.percentiles(), "login": self.login_ms.percentiles()}
+
+    def recent_peaks(self, days: int = 7) -> list:
+        """[(day, players, time of the peak)] for the last `days` days that had players, oldest first."""
+        return [(d, n, ts) for d, (n, ts) in sorted(self.peaks.items())[-days:]]
+
+    def sessions_of(self, name: str, limit: int = 20) -> list:
+        """The player's last `limit` finished sessions, newest first (seeks by the index)."""
+        rec = self.players.get(name)
+        if rec is None or not rec.offsets:
+            return []
+        pending = dict(self._buf)        # finished but not flushed yet
+        try:
+            f = open(os.path.join(self.dir, LOG_NAME), "rb")
+        except OSError:
+            f = None
+        out = []
+        try:
+            for off in reversed(rec.offsets[-limit:]):
+                line = pending.get(off)
+                if line is None and f is not None:
+                    f.seek(off)
+                    line = f.readline().decode("utf-8", "replace")
+                s = _parse_session(line) if line else None
+                if s is not None and s.name == name:
+                    out.append(s)
+        finally:
+            if f is not None:
+                f.close()
+        return out
+
+    # ----- persistence -----
+    def flush(self, force: bool = True) -> str | None:
+        """
+        Append finished sessions to the log, then rewrite the index (only if
+        something changed). Returns None, or the error that kept it from
+        being saved; what wasn't written is retried on the next flush.
+        """
+        if not self.persist or not self._dirty:
+            return None
+        if not force and time.monotonic() - self._flushed_at < FLUSH_SECS:
+            return None
+        self._flushed_at = time.monotonic()
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            if self._buf:
+                self._write_buf()
+            index = {
+                "log_size": self._log_size,
+                "peaks": self.peaks,
+                "latencies": self._latencies,
+                "players": {r.name: [r.uuid, r.first_seen, r.last_seen, r.sessions, round(r.total, 3),
+                                     round(r.longest, 3), r.offsets] for r in self.players.values()},
+            }
+            path = os.path.join(self.dir, INDEX_NAME)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(index, f, separators=(",", ":"))
+            os.replace(path + ".tmp", path)
+            self._dirty = False
+        except Exception as e:
+            return f"couldn't save player sessions: {e}"
+        return None
+
+    def _write_buf(self):
+        """Append the buffered lines; after a failed write, re-base the buffer on what is on disk."""
+        path = os.path.join(self.dir, LOG_NAME)
+        try:
+            with open(path, "ab") as f:
+                f.write("".join(line for _off, line in self._buf).encode("utf-8"))
+        except Exception:
+            # part of it may have landed: give the lines still buffered the offsets they
+            # will really get (the index only covers sessions already in the file)
+            try:
+                self._log_size = os.path.getsize(path)
+            except OSError:
+                self._log_size = 0
+            self._rebase_buf()
+            raise
+        self._buf.clear()
+
+    def _rebase_buf(self):
+        moved = {}
+        off = self._log_size
+        for i, (old, line) in enumerate(self._buf):
+            moved[old] = off
+            self._buf[i] = (off, line)
+            off += len(line.encode("utf-8"))
+        for rec in self.players.values():
+            if rec.offsets and rec.offsets[-1] in moved:
+                rec.offsets = [moved.get(o, o) for o in rec.offsets]
+        self._log_size = off
+
+    def _load(self):
+        covered = 0
+        try:
+            with open(os.path.join(self.dir, INDEX_NAME), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            for name, (uuid, first, last, sessions, total, longest, offsets) in index["players"].items():
+                rec = self.players[name] = PlayerRecord(name)
+                rec.uuid, rec.first_seen, rec.last_seen = uuid, first, last
+                rec.sessions, rec.total, rec.longest, rec.offsets = sessions, total, longest, offsets
+            self.peaks = {d: list(v) for d, v in index.get("peaks", {}).items()}
+            for auth, login in index.get("latencies", ()):
+                self._add_latency(auth, login)
+            covered = int(index.get("log_size", 0))
+        except Exception:
+            self.players, self.peaks, covered = {}, {}, 0
+        self._catch_up(covered)
+
+    def _catch_up(self, covered: int):
+        """Index the log lines written after the index was (a crash between the two writes, or no index)."""
+        path = os.path.join(self.dir, LOG_NAME)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._log_size = size
+        if size <= covered:
+            return
+        with open(path, "rb") as f:
+            f.seek(covered)
+            off = covered
+            for raw in f:
+                s = _parse_session(raw.decode("utf-8", "replace"))
+                if s is not None:
+                    rec = self.players.get(s.name) or self.players.setdefault(s.name, PlayerRecord(s.name))
+                    self._account(rec, s, off)
+                off += len(raw)
+        self._dirty = True
+
+    # ----- internal -----
+    def _finish(self, rec: PlayerRecord, now: float):
+        s = Session(rec.online_since, now, rec.name, rec.uuid, *rec.latency)
+        rec.online_since = None
+        rec.last_seen = now
+        line = _session_line(s)
+        off = self._log_size
+        if self.persist:
+            self._log_size += len(line.encode("utf-8"))
+            self._buf.append((off, line))
+            self._dirty = True
+        self._account(rec, s, off if self.persist else None)     # a mirror doesn't know the daemon's offsets
+
+    @staticmethod
+    def _account(rec: PlayerRecord, s: Session, off: int | None):
+        dur = max(0.0, s.end - s.start)
+        rec.sessions += 1
+        rec.total += dur
+        rec.longest = max(rec.longest, dur)
+        if off is not None:
+            rec.offsets.append(off)
+        if s.uuid:
+            rec.uuid = s.uuid
+        if rec.first_seen is None or s.start < rec.first_seen:
+            rec.first_seen = s.start
+        if rec.last_seen is None or s.end > rec.last_seen:
+            rec.last_seen = s.end
+
+    def _add_latency(self, auth, login):
+        if auth is not None:
+            self.auth_ms.add(auth)
+        if login is not None:
+            self.login_ms.add(login)
+        self._latencies.append([None if auth is None else round(auth), None if login is None else round(login)])
+        del self._latencies[:-LATENCY_SAMPLES]
+
+    def _count_changed(self, now: float):
+        n = len(self.online)
+        day = _day(now)
+        peak = self.peaks.get(day)
+        if n and (peak is None or n > peak[0]):
+            self.peaks[day] = [n, now]
+            if peak is None and len(self.peaks) > PEAK_DAYS:
+                del self.peaks[min(self.peaks)]
+            self._dirty = True
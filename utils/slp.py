@@ -0,0 +1,196 @@
+# utils/slp.py
+import asyncio, json, struct, time
+from typing import NamedTuple
+from utils.aioloop import shared_loop
+
+PROTOCOL_ANY = -1          # "whatever you speak"; servers answer status for any version
+
+
+class ServerStatus(NamedTuple):
+    ts: float                # time.time() of the reply
+    online: int
+    max: int
+    sample: tuple            # ((name, uuid), ...) - vanilla sends at most 12, none if hidden
+    version: str
+    protocol: int
+    motd: str
+    latency_ms: float        # ping/pong round trip
+
+
+class StatusError(Exception):
+    pass
+
+
+# ----- wire format -----
+def _varint(n: int) -> bytes:
+    n &= 0xFFFFFFFF
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _packet(pid: int, payload: bytes = b"") -> bytes:
+    body = _varint(pid) + payload
+    return _varint(len(body)) + body
+
+
+def _mc_string(s: str) -> bytes:
+    b = s.encode("utf-8")
+    return _varint(len(b)) + b
+
+
+def _read_varint(buf: bytes, pos: int):
+    """-> (value, new pos); raises IndexError if buf ends first."""
+    val = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        val |= (b & 0x7F) << shift
+        if not b & 0x80:
+            break
+        shift += 7
+        if shift > 35:
+            raise StatusError("varint too long")
+    if val & 0x80000000:
+        val -= 1 << 32
+    return val, pos
+
+
+def _flatten_chat(desc) -> str:
+    if isinstance(desc, str):
+        return desc
+    if isinstance(desc, dict):
+        return str(desc.get("text", "")) + "".join(_flatten_chat(e) for e in desc.get("extra", ()))
+    if isinstance(desc, list):
+        return "".join(_flatten_chat(e) for e in desc)
+    return ""
+
+
+async def _read_packet(reader):
+    """-> (packet id, payload bytes) from a length-prefixed packet."""
+    length = shift = 0
+    while True:
+        b = (await reader.readexactly(1))[0]
+        length |= (b & 0x7F) << shift
+        if not b & 0x80:
+            break
+        shift += 7
+        if shift > 35:
+            raise StatusError("varint too long")
+    if not 0 < length <= 1 << 21:
+        raise StatusError(f"bad packet length {length}")
+    body = await reader.readexactly(length)
+    pid, p = _read_varint(body, 0)
+    return pid, body[p:]
+
+
+async def ping_status(host: str = "127.0.0.1", port: int = 25565, timeout: float = 2.0) -> ServerStatus:
+    """
+    One Server List Ping (1.7+ protocol): handshake, status request, then a
+    ping/pong for the round trip. Runs on the event loop with one overall
+    timeout. Raises StatusError if the server doesn't answer properly.
+    """
+    try:
+        return await asyncio.wait_for(_ping(host, port), timeout)
+    except asyncio.TimeoutError:
+        raise StatusError("timed out")
+    except (OSError, asyncio.IncompleteReadError) as e:
+        raise StatusError(f"connection failed: {e}")
+
+
+async def _ping(host: str, port: int) -> ServerStatus:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        handshake = _varint(PROTOCOL_ANY) + _mc_string(host) + struct.pack(">H", port) + _varint(1)
+        writer.write(_packet(0x00, handshake) + _packet(0x00))
+        pid, payload = await _read_packet(reader)
+        if pid != 0x00:
+            raise StatusError(f"unexpected packet 0x{pid:02x}")
+        n, pos = _read_varint(payload, 0)
+        try:
+            data = json.loads(payload[pos:pos + n].decode("utf-8", "replace"))
+        except ValueError:
+            raise StatusError("bad status JSON")
+
+        t0 = time.perf_counter()
+        token = int(time.time() * 1000)
+        writer.write(_packet(0x01, struct.pack(">q", token)))
+        pid, payload = await _read_packet(reader)
+        latency = (time.perf_counter() - t0) * 1000.0
+        if pid != 0x01 or payload[:8] != struct.pack(">q", token):
+            raise StatusError("bad pong")
+    except (IndexError, struct.error):
+        raise StatusError("malformed packet")
+    finally:
+        writer.close()
+
+    players = data.get("players") or {}
+    version = data.get("version") or {}
+    sample = tuple((str(p.get("name", "")), str(p.get("id", "")))
+                   for p in players.get("sample") or () if isinstance(p, dict))
+    return ServerStatus(time.time(), int(players.get("online", 0)), int(players.get("max", 0)), sample,
+                        str(version.get("name", "")), int(version.get("protocol", 0)),
+                        _flatten_chat(data.get("description", "")), latency)
+
+
+class StatusPoller:
+    """
+    Pings the server every `interval` seconds while running_fn() says it is
+    up, and hands each ServerStatus to on_status. The port is re-read each
+    time so edits apply. Runs as one task on the shared I/O loop, and the
+    callbacks are called from there.
+    """
+    def __init__(self, port_fn, on_status, running_fn=None, interval: float = 15.0,
+                 host: str = "127.0.0.1", on_error=None, io=None):
+        self.port_fn = port_fn
+        self.on_status = on_status
+        self.on_error = on_error
+        self.running_fn = running_fn or (lambda: True)
+        self.interval = interval
+        self.host = host
+        self.io = io or shared_loop()
+        self.latest = None
+        self._task = None            # loop only
+        self._wake = None
+
+    def start(self):
+        self.io.call(self._start)
+
+    def stop(self):
+        self.io.call(self._stop)
+
+    def poll_now(self):
+        self.io.call(lambda: self._wake is not None and self._wake.set())
+
+    # ----- I/O loop -----
+    def _start(self):
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = self.io.loop.create_task(self._run())
+
+    def _stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = self._wake = None
+
+    async def _run(self):
+        wake = self._wake
+        while True:
+            if self.running_fn():
+                try:
+                    self.latest = await ping_status(self.host, int(self.port_fn()))
+                    self.on_status(self.latest)
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(e)
+            try:
+                await asyncio.wait_for(wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            wake.clear()
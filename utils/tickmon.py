@@ -0,0 +1,204 @@
+# utils/tickmon.py
+import os, re
+from utils.commands import ResponseMatcher, UnknownCommandError, message_of
+from utils.parsers import EV_DONE, EV_TICK
+
+# server flavors, each with the command that reports tick times on it
+FLAVOR_VANILLA = "vanilla"     # also Fabric/Quilt: /tick query exists since 1.20.3
+FLAVOR_PAPER = "paper"
+FLAVOR_FORGE = "forge"
+FLAVOR_NEOFORGE = "neoforge"
+FLAVOR_SPARK = "spark"         # any flavor with the spark profiler installed
+
+QUERY_COMMANDS = {
+    FLAVOR_VANILLA: "tick query",
+    FLAVOR_PAPER: "mspt",
+    FLAVOR_FORGE: "forge tps",
+    FLAVOR_NEOFORGE: "neoforge tps",
+    FLAVOR_SPARK: "spark tps",
+}
+
+REPLY_TIMEOUT_SEC = 3.0    # give up on a reply after this long
+DETECT_MAX_LINES = 5000    # stop sniffing startup lines for the flavor after this many
+
+_RE_NUM = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+_RE_AVG_PER_TICK = re.compile(r"average time per tick:\s*([0-9.]+)\s*ms")
+_RE_TARGET_RATE = re.compile(r"target tick rate:\s*([0-9.]+)")
+_RE_FORGE = re.compile(r"mean tick time:\s*([0-9.]+)\s*ms\.?\s*mean tps:\s*([0-9.]+)")
+
+# reply headers whose values arrive on the following line(s): (prefix, lines to swallow)
+_HEADERS = (
+    ("server tick times", 1),        # Paper /mspt
+    ("tps from last", 1),            # spark
+    ("tick durations", 1),           # spark
+    ("cpu usage from last", 2),      # spark
+)
+_VANILLA_LINES = ("the game is running normally", "the game is frozen", "the game is sprinting",
+                  "target tick rate:", "percentiles:")
+
+
+def _flavor_from_jar(jar_path: str) -> str | None:
+    name = os.path.basename(jar_path or "").lower()
+    for key, flavor in (("neoforge", FLAVOR_NEOFORGE), ("forge", FLAVOR_FORGE),
+                        ("paper", FLAVOR_PAPER), ("purpur", FLAVOR_PAPER), ("folia", FLAVOR_PAPER)):
+        if key in name:
+            return flavor
+    return None
+
+
+class TickReplyMatcher(ResponseMatcher):
+    """Claims the lines of a tick-query reply: headers, their value lines and the known one-liners."""
+    timeout = REPLY_TIMEOUT_SEC
+    kinds = frozenset((EV_TICK,))
+
+    def __init__(self):
+        self._swallow = 0
+
+    def accept(self, parsed) -> bool:
+        low = message_of(parsed.text).lower()
+        if self._swallow:
+            self._swallow -= 1
+            return True
+        if not low:
+            return True                 # spark separates its sections with blank lines
+        for prefix, n in _HEADERS:
+            if low.startswith(prefix):
+                self._swallow = n
+                return True
+        return bool(_RE_FORGE.search(low) or _RE_AVG_PER_TICK.search(low) or low.startswith(_VANILLA_LINES))
+
+
+class TickMonitor:
+    """
+    Asks the server for its tick times every few seconds and turns the reply
+    into (mspt, tps) samples.
+
+    The flavor is sniffed from the startup log (jar name as a fallback), which
+    picks the query: `spark tps` if spark is loaded, otherwise `mspt` on Paper,
+    `forge tps` / `neoforge tps` on (Neo)Forge and `tick query` on vanilla and
+    Fabric. If the server answers "Unknown or incomplete command" querying is
+    switched off; tick lines the server logs on its own are still recorded.
+
+    Everything runs on the Tk thread. poll() sends the query with a
+    TickReplyMatcher; the caller hands the finished CommandHandle to
+    on_reply(). observe() is fed every parsed line for flavor detection and
+    tick lines the server logs unasked.
+    """
+    def __init__(self, send, on_sample, on_status=None):
+        self.send = send                # send(command, matcher) -> CommandHandle or False, without echo
+        self.on_sample = on_sample      # on_sample(mspt, tps)
+        self.on_status = on_status      # on_status(text) for one-off notices
+        self.reset()
+
+    def reset(self, jar_path: str = ""):
+        """Forget everything about the previous server (call on start)."""
+        self.flavor = _flavor_from_jar(jar_path)
+        self.spark = False
+        self.ready = False              # startup finished; safe to query
+        self.supported = True
+        self._seen = 0
+        self._pending = None            # CommandHandle of the query in flight
+        self._rate = 20.0               # target TPS (vanilla can change it)
+
+    @property
+    def command(self) -> str | None:
+        if not self.supported:
+            return None
+        if self.spark:
+            return QUERY_COMMANDS[FLAVOR_SPARK]
+        return QUERY_COMMANDS.get(self.flavor or FLAVOR_VANILLA)
+
+    # ----- polling -----
+    def poll(self):
+        """Send one query if the server is up and the previous reply is done."""
+        cmd = self.command
+        if not self.ready or cmd is None or (self._pending is not None and not self._pending.done()):
+            return
+        self._pending = self.send(cmd, TickReplyMatcher()) or None
+
+    def on_reply(self, handle):
+        """A query finished (Tk thread)."""
+        if handle is not self._pending:
+            return                      # from before a reset()
+        try:
+            lines = handle.result()
+        except UnknownCommandError:
+            if self.supported:
+                self.supported = False
+                if self.on_status:
+                    self.on_status("Tick monitor: this server has no tick command; "
+                                   "MSPT will only come from lines it logs itself.")
+            return
+        except Exception:
+            return                      # timed out or the server went away
+        self._parse_reply(lines)
+
+    # ----- line intake -----
+    def observe(self, parsed):
+        if not self.ready:
+            self._detect(parsed)
+        if parsed.kind == EV_TICK and not self._answers_query(parsed):
+            self._emit(parsed.data, None)
+
+    def _answers_query(self, parsed) -> bool:
+        """A tick line that is part of our own query's reply; on_reply() records those."""
+        h = self._pending
+        return h is not None and any(q is parsed for q in h.lines)
+
+    def _detect(self, parsed):
+        if parsed.kind == EV_DONE:
+            self.ready = True
+            return
+        self._seen += 1
+        if self._seen > DETECT_MAX_LINES:
+            self.ready = True
+            return
+        low = parsed.text.lower()
+        if "spark" in low:
+            self.spark = True
+        if "neoforge" in low:
+            self.flavor = FLAVOR_NEOFORGE
+        elif self.flavor != FLAVOR_NEOFORGE and ("minecraftforge" in low or "forge mod loader" in low):
+            self.flavor = FLAVOR_FORGE
+        elif "running paper version" in low or "running purpur version" in low or "running folia version" in low:
+            self.flavor = FLAVOR_PAPER
+
+    def _parse_reply(self, lines):
+        header, swallow, tps = "", 0, None
+        for text in lines:
+            low = message_of(text).lower()
+            if swallow:
+                swallow -= 1
+                nums = _RE_NUM.findall(low)
+                if not nums:
+                    continue
+                if header == "tps from last":
+                    tps = float(nums[0])
+                elif header == "tick durations" and len(nums) >= 2:
+                    self._emit(float(nums[1]), tps)        # median of the last 10 s
+                elif header == "server tick times":
+                    self._emit(float(nums[0]), None)       # average of the last 5 s
+                continue
+            for prefix, n in _HEADERS:
+                if low.startswith(prefix):
+                    header, swallow = prefix, n
+                    break
+            else:
+                m = _RE_FORGE.search(low)
+                if m:
+                    if low.startswith("overall"):
+                        self._emit(float(m.group(1)), float(m.group(2)))
+                    continue
+                m = _RE_TARGET_RATE.search(low)
+                if m:
+                    self._rate = float(m.group(1)) or 20.0
+                m = _RE_AVG_PER_TICK.search(low)
+                if m:
+                    self._emit(float(m.group(1)), None)
+
+    def _emit(self, mspt, tps):
+        if mspt is None:
+            return
+        if tps is None:
+            tps = min(self._rate, 1000.0 / mspt) if mspt > 0 else self._rate
+        self.on_sample(float(mspt), float(tps))
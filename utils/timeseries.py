@@ -0,0 +1,219 @@
+# utils/timeseries.py
+import math
+from array import array
+
+# (bucket seconds, buckets kept): 1 h of 1 s, 6 h of 10 s, 24 h of 1 min, 7 days of 10 min
+DEFAULT_TIERS = ((1, 3600), (10, 2160), (60, 1440), (600, 1008))
+
+
+class _Tier:
+    """Ring of closed buckets (start, min, max, sum, count) plus the bucket being filled."""
+    __slots__ = ("step", "cap", "t", "lo", "hi", "sum", "cnt", "n", "cur", "c_lo", "c_hi", "c_sum", "c_cnt")
+
+    def __init__(self, step: int, cap: int):
+        self.step, self.cap = step, cap
+        zeros = array("d", [0.0]) * cap
+        self.t, self.lo, self.hi, self.sum = array("d", zeros), array("d", zeros), array("d", zeros), array("d", zeros)
+        self.cnt = array("I", [0]) * cap
+        self.n = 0                    # buckets ever closed
+        self.cur = None               # start time of the open bucket
+        self.c_lo = self.c_hi = self.c_sum = 0.0
+        self.c_cnt = 0
+
+    def add(self, ts: float, v: float):
+        start = math.floor(ts / self.step) * self.step
+        if start != self.cur:
+            if self.cur is not None and self.c_cnt:
+                self._close()
+            self.cur, self.c_lo, self.c_hi, self.c_sum, self.c_cnt = start, v, v, v, 1
+            return
+        if v < self.c_lo:
+            self.c_lo = v
+        if v > self.c_hi:
+            self.c_hi = v
+        self.c_sum += v
+        self.c_cnt += 1
+
+    def merge(self, ts: float, lo: float, hi: float, total: float, count: int):
+        """Fold an already-aggregated bucket (e.g. a rollup read from disk) into this tier."""
+        start = math.floor(ts / self.step) * self.step
+        if start != self.cur:
+            if self.cur is not None and self.c_cnt:
+                self._close()
+            self.cur, self.c_lo, self.c_hi, self.c_sum, self.c_cnt = start, lo, hi, total, count
+            return
+        self.c_lo = min(self.c_lo, lo)
+        self.c_hi = max(self.c_hi, hi)
+        self.c_sum += total
+        self.c_cnt += count
+
+    def buckets(self):
+        """Every retained bucket, the open one included, as (start, min, max, sum, count)."""
+        out = []
+        for k in range(self.n - min(self.n, self.cap), self.n):
+            i = k % self.cap
+            out.append((self.t[i], self.lo[i], self.hi[i], self.sum[i], self.cnt[i]))
+        if self.cur is not None and self.c_cnt:
+            out.append((self.cur, self.c_lo, self.c_hi, self.c_sum, self.c_cnt))
+        return out
+
+    def absorb_older(self, older: "_Tier"):
+        """Put an older tier's buckets in front of ours (keeps the newest `cap`)."""
+        rows = [r for r in older.buckets() if self.cur is None or r[0] <= self.cur]
+        if not rows:
+            return
+        own = self.buckets()
+        if self.cur is not None and self.c_cnt:
+            own.pop()                          # the open bucket stays open
+        first_own = own[0][0] if own else self.cur
+        if first_own is not None and rows[-1][0] == first_own:
+            t, lo, hi, sm, cnt = rows.pop()
+            if own:
+                _, lo2, hi2, sm2, cnt2 = own[0]
+                own[0] = (t, min(lo, lo2), max(hi, hi2), sm + sm2, cnt + cnt2)
+            else:
+                self.c_lo, self.c_hi = min(lo, self.c_lo), max(hi, self.c_hi)
+                self.c_sum += sm
+                self.c_cnt += cnt
+        kept = (rows + own)[-self.cap:]
+        for i, (t, lo, hi, sm, cnt) in enumerate(kept):
+            self.t[i], self.lo[i], self.hi[i], self.sum[i], self.cnt[i] = t, lo, hi, sm, cnt
+        self.n = len(kept)
+
+    def _close(self):
+        i = self.n % self.cap
+        self.t[i], self.lo[i], self.hi[i], self.sum[i], self.cnt[i] = self.cur, self.c_lo, self.c_hi, self.c_sum, self.c_cnt
+        self.n += 1
+
+    def oldest(self):
+        if self.n:
+            return self.t[(self.n - min(self.n, self.cap)) % self.cap]
+        return self.cur
+
+    def rows(self, t0: float, t1: float):
+        """(start, min, max, avg) for buckets overlapping [t0, t1], oldest first."""
+        out = []
+        lo, hi = self.n - min(self.n, self.cap), self.n
+        while lo < hi:                      # first closed bucket ending after t0
+            mid = (lo + hi) // 2
+            if self.t[mid % self.cap] + self.step > t0:
+                hi = mid
+            else:
+                lo = mid + 1
+        for k in range(lo, self.n):
+            i = k % self.cap
+            t = self.t[i]
+            if t > t1:
+                break
+            out.append((t, self.lo[i], self.hi[i], self.sum[i] / self.cnt[i]))
+        if self.cur is not None and self.c_cnt and self.cur + self.step > t0 and self.cur <= t1:
+            out.append((self.cur, self.c_lo, self.c_hi, self.c_sum / self.c_cnt))
+        return out
+
+
+class PercentileWindow:
+    """Fixed-size ring of the most recent samples with percentile readout."""
+    def __init__(self, size: int = 1024):
+        self._buf = array("d", [0.0]) * size
+        self._n = 0
+
+    def add(self, v: float):
+        self._buf[self._n % len(self._buf)] = v
+        self._n += 1
+
+    def clear(self):
+        self._n = 0
+
+    def percentiles(self, ps=(50, 95, 99)) -> dict:
+        n = min(self._n, len(self._buf))
+        if not n:
+            return {}
+        data = sorted(self._buf[:n])
+        return {p: data[min(n - 1, int(p / 100 * n))] for p in ps}
+
+
+class Series:
+    """One metric rolled up into every tier on append (O(number of tiers))."""
+    def __init__(self, name: str, tiers=DEFAULT_TIERS):
+        self.name = name
+        self.tiers = [_Tier(step, cap) for step, cap in tiers]
+        self.last = None              # (ts, value) of the newest sample
+
+    def append(self, ts: float, value: float):
+        value = float(value)
+        for tier in self.tiers:
+            tier.add(ts, value)
+        self.last = (ts, value)
+
+    def append_bucket(self, ts: float, lo: float, hi: float, avg: float, count: int = 1):
+        for tier in self.tiers:
+            tier.merge(ts, lo, hi, avg * count, count)
+        if self.last is None or ts >= self.last[0]:
+            self.last = (ts, avg)
+
+    def pick_tier(self, t0: float, t1: float, max_points: int | None = None) -> _Tier:
+        """Finest tier that still reaches back to t0 and (optionally) fits in max_points."""
+        for tier in self.tiers:
+            old = tier.oldest()
+            covers = old is not None and old <= t0 or tier.n < tier.cap
+            fits = max_points is None or (t1 - t0) / tier.step <= max_points
+            if covers and fits:
+                return tier
+        return self.tiers[-1]
+
+    def query(self, t0: float, t1: float, max_points: int | None = None):
+        tier = self.pick_tier(t0, t1, max_points)
+        return tier.step, tier.rows(t0, t1)
+
+
+class MetricStore:
+    """
+    Fixed-footprint history for several metrics. Every series keeps min/max/avg
+    buckets at 1 s, 10 s, 1 min and 10 min resolution in typed ring buffers,
+    so memory does not grow with uptime and a range query reads at most one
+    tier's worth of buckets.
+    """
+    def __init__(self, names=(), tiers=DEFAULT_TIERS):
+        self._tiers = tiers
+        self.series = {n: Series(n, tiers) for n in names}
+
+    def append(self, name: str, ts: float, value):
+        if value is None:
+            return
+        s = self.series.get(name)
+        if s is None:
+            s = self.series[name] = Series(name, self._tiers)
+        s.append(ts, value)
+
+    def append_bucket(self, name: str, ts: float, lo: float, hi: float, avg: float, count: int = 1):
+        """Add a pre-aggregated bucket (min/max/avg of `count` samples starting at ts)."""
+        s = self.series.get(name)
+        if s is None:
+            s = self.series[name] = Series(name, self._tiers)
+        s.append_bucket(ts, lo, hi, avg, count)
+
+    def absorb_older(self, older: "MetricStore"):
+        """Merge history that is entirely older than ours (e.g. loaded from disk) in front of it."""
+        for name, old in older.series.items():
+            s = self.series.get(name)
+            if s is None:
+                self.series[name] = old
+                continue
+            for mine, theirs in zip(s.tiers, old.tiers):
+                mine.absorb_older(theirs)
+            if s.last is None:
+                s.last = old.last
+
+    def query(self, name: str, t0: float, t1: float, max_points: int | None = None):
+        """-> (bucket seconds, [(start, min, max, avg), ...]); empty if the series is unknown."""
+        s = self.series.get(name)
+        if s is None:
+            return 1, []
+        return s.query(t0, t1, max_points)
+
+    def last(self, name: str):
+        s = self.series.get(name)
+        return s.last if s else None
+
+    def nbytes(self) -> int:
+        return sum(len(t.t) * 8 * 4 + len(t.cnt) * t.cnt.itemsize for s in self.series.values() for t in s.tiers)
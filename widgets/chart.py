@@ -0,0 +1,303 @@
+# widgets/chart.py
+import bisect, time
+import customtkinter as ctk
+from theme import COLORS
+
+GRID_LINES = 4                 # horizontal grid lines
+TIME_LABELS = 8                # pooled time-axis label/tick items
+MIN_SPAN_SEC = 30
+MAX_SPAN_SEC = 7 * 24 * 3600
+_TIME_STEPS = (5, 10, 30, 60, 120, 300, 600, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400)
+
+
+def minmax_columns(rows, t0: float, t1: float, width: int):
+    """
+    Reduce (start, min, max, avg) rows to at most one (x, lo, hi) column per
+    pixel. Each column keeps the extremes of every row that lands in it, so
+    a one-sample spike is still drawn however far the chart is zoomed out.
+    """
+    if not rows or width <= 1 or t1 <= t0:
+        return []
+    sx = (width - 1) / (t1 - t0)
+    cols = []
+    cx = None
+    for start, lo, hi, _avg in rows:
+        x = int((start - t0) * sx)
+        if x == cx:
+            c = cols[-1]
+            if lo < c[1]:
+                c[1] = lo
+            if hi > c[2]:
+                c[2] = hi
+        else:
+            cx = x
+            cols.append([x, lo, hi])
+    return cols
+
+
+class _Series:
+    __slots__ = ("name", "label", "color", "scale", "fmt", "item", "cols")
+
+    def __init__(self, name, label, color, scale, fmt):
+        self.name, self.label, self.color, self.scale, self.fmt = name, label, color, scale, fmt
+        self.item = None      # canvas line id, created once
+        self.cols = []        # last decimated columns (for the crosshair)
+
+
+class Chart(ctk.CTkFrame):
+    """
+    Retained-mode time-series chart over a MetricStore-like source
+    (query(name, t0, t1, max_points) -> (step, rows)).
+
+    Canvas items (grid, labels, one polyline per series, crosshair) are
+    created once and only moved with coords()/itemconfigure() afterwards.
+    Each redraw asks the source for at most ~one bucket per pixel and folds
+    them into min/max columns, so its cost depends on the chart width, not
+    on how much history is stored.
+
+    Mouse: wheel zooms around the pointer, drag pans back in time,
+    double-click returns to following the newest data. Hovering shows a
+    crosshair with the values under the pointer.
+    """
+    def __init__(self, master, source, span: float = 120, height: int = 120,
+                 y_zero: bool = False, min_range: float = 1.0, y_top_min: float | None = None,
+                 y_fmt: str = "{:.0f}"):
+        super().__init__(master, fg_color="transparent")
+        self.source = source
+        self.span = float(span)
+        self.end = None                   # None = follow now; else right edge (unix time)
+        self.y_zero = y_zero              # keep 0 at the bottom instead of auto-fitting the minimum
+        self.min_range = min_range
+        self.y_top_min = y_top_min
+        self.y_fmt = y_fmt
+        self._series = []
+        self._hlines = []                 # (value, line id, text id)
+        self._view = None                 # (t0, t1, vmin, vmax, w, h) of the last redraw
+        self._drag_x = None
+        self._hover_x = None
+
+        self.canvas = ctk.CTkCanvas(self, height=height, bg=COLORS["inset_bg"], highlightthickness=0)
+        self.canvas.pack(fill="both", expand=True)
+        c = self.canvas
+
+        self._grid = [c.create_line(0, 0, 0, 0, fill="#242424") for _ in range(GRID_LINES)]
+        self._ticks = [(c.create_line(0, 0, 0, 0, fill="#2c2c2c"),
+                        c.create_text(0, 0, text="", anchor="s", fill="#6a6a6a", font=("Segoe UI", 8)))
+                       for _ in range(TIME_LABELS)]
+        self._y_top = c.create_text(0, 0, text="", anchor="ne", fill="#6a6a6a", font=("Segoe UI", 8))
+        self._y_bot = c.create_text(0, 0, text="", anchor="se", fill="#6a6a6a", font=("Segoe UI", 8))
+        self._cross = c.create_line(0, 0, 0, 0, fill="#5a5a5a", dash=(2, 2), state="hidden")
+        self._readout = c.create_text(0, 0, text="", anchor="nw", fill="#d0d0d0",
+                                      font=("Segoe UI", 9), state="hidden")
+        self._mode = c.create_text(0, 0, text="", anchor="ne", fill="#8a8a8a", font=("Segoe UI", 8))
+
+        c.bind("<Configure>", lambda _e: self.redraw())
+        c.bind("<MouseWheel>", self._on_wheel)
+        c.bind("<Button-4>", lambda e: self._zoom(e.x, 0.8))
+        c.bind("<Button-5>", lambda e: self._zoom(e.x, 1.25))
+        c.bind("<ButtonPress-1>", self._on_press)
+        c.bind("<B1-Motion>", self._on_drag)
+        c.bind("<ButtonRelease-1>", self._on_release)
+        c.bind("<Double-Button-1>", lambda _e: self.follow())
+        c.bind("<Motion>", self._on_motion)
+        c.bind("<Leave>", self._on_leave)
+
+    # ----- setup -----
+    def add_series(self, name: str, color: str, label: str | None = None,
+                   scale: float = 1.0, fmt: str = "{:.1f}"):
+        """Plot metric `name`; values are multiplied by `scale` to share the y axis."""
+        s = _Series(name, label or name, color, scale, fmt)
+        s.item = self.canvas.create_line(0, 0, 0, 0, fill=color, width=2, state="hidden")
+        self.canvas.tag_raise(self._cross)
+        self.canvas.tag_raise(self._readout)
+        self._series.append(s)
+        return s
+
+    def add_hline(self, value: float, color: str, text: str = ""):
+        """Fixed reference line (e.g. a budget); always kept inside the y range."""
+        c = self.canvas
+        line = c.create_line(0, 0, 0, 0, fill=color, dash=(4, 3))
+        label = c.create_text(0, 0, text=text, anchor="sw", fill=color, font=("Segoe UI", 8))
+        self._hlines.append((value, line, label))
+
+    # ----- view -----
+    def follow(self):
+        self.end = None
+        self.redraw()
+
+    def set_span(self, seconds: float):
+        self.span = min(MAX_SPAN_SEC, max(MIN_SPAN_SEC, float(seconds)))
+        self.redraw()
+
+    def redraw(self):
+        c = self.canvas
+        w, h = int(c.winfo_width() or 0), int(c.winfo_height() or 0)
+        if w <= 8 or h <= 8:
+            return
+        t1 = self.end if self.end is not None else time.time()
+        t0 = t1 - self.span
+
+        vmin, vmax = None, None
+        for s in self._series:
+            _, rows = self.source.query(s.name, t0, t1, max_points=w)
+            s.cols = minmax_columns(rows, t0, t1, w)
+            if s.scale != 1.0:
+                for col in s.cols:
+                    col[1] *= s.scale
+                    col[2] *= s.scale
+            for _x, lo, hi in s.cols:
+                if vmin is None or lo < vmin:
+                    vmin = lo
+                if vmax is None or hi > vmax:
+                    vmax = hi
+        vmin, vmax = self._y_range(vmin, vmax)
+        self._view = (t0, t1, vmin, vmax, w, h)
+
+        for s in self._series:
+            self._place_series(s, vmin, vmax, h)
+        self._place_grid(w, h, vmin, vmax)
+        self._place_time_axis(t0, t1, w, h)
+        c.itemconfigure(self._mode, text="" if self.end is None else "paused · double-click for live")
+        c.coords(self._mode, w - 4, 14)
+        if self._hover_x is not None:
+            self._place_crosshair(self._hover_x)
+
+    # ----- layout helpers -----
+    def _y_range(self, vmin, vmax):
+        refs = [v for v, _l, _t in self._hlines]
+        if vmin is None:
+            vmin, vmax = 0.0, max(refs or [1.0])
+        if self.y_zero:
+            vmin = 0.0
+        if refs:
+            vmax = max(vmax, max(refs))
+        if self.y_top_min is not None:
+            vmax = max(vmax, self.y_top_min)
+        if vmax - vmin < self.min_range:
+            mid = (vmax + vmin) / 2
+            vmin, vmax = mid - self.min_range / 2, mid + self.min_range / 2
+            if self.y_zero and vmin < 0:
+                vmin, vmax = 0.0, self.min_range
+        return vmin, vmin + (vmax - vmin) * 1.10
+
+    @staticmethod
+    def _y(v, vmin, vmax, h):
+        y = h - 2 - int((v - vmin) / (vmax - vmin) * (h - 4))
+        return 2 if y < 2 else (h - 2 if y > h - 2 else y)
+
+    def _place_series(self, s, vmin, vmax, h):
+        y = self._y
+        flat = []
+        for x, lo, hi in s.cols:
+            flat += (x, y(hi, vmin, vmax, h))
+            if hi != lo:
+                flat += (x, y(lo, vmin, vmax, h))
+        if len(flat) < 4:
+            if len(flat) == 2:
+                flat += (flat[0] + 1, flat[1])
+            else:
+                self.canvas.itemconfigure(s.item, state="hidden")
+                return
+        self.canvas.coords(s.item, *flat)
+        self.canvas.itemconfigure(s.item, state="normal")
+
+    def _place_grid(self, w, h, vmin, vmax):
+        c = self.canvas
+        for i, item in enumerate(self._grid, 1):
+            gy = int(h * i / (GRID_LINES + 1))
+            c.coords(item, 0, gy, w, gy)
+        for value, line, label in self._hlines:
+            ry = self._y(value, vmin, vmax, h)
+            c.coords(line, 0, ry, w, ry)
+            c.coords(label, 4, ry - 2)
+        c.itemconfigure(self._y_top, text=self.y_fmt.format(vmax))
+        c.coords(self._y_top, w - 4, 2)
+        c.itemconfigure(self._y_bot, text=self.y_fmt.format(vmin))
+        c.coords(self._y_bot, w - 4, h - 14)
+
+    def _place_time_axis(self, t0, t1, w, h):
+        c = self.canvas
+        span = t1 - t0
+        step = next((s for s in _TIME_STEPS if span / s <= TIME_LABELS - 2), _TIME_STEPS[-1])
+        fmt = "%H:%M:%S" if step < 60 else ("%H:%M" if step < 86400 else "%a %d")
+        tz = time.localtime(t0).tm_gmtoff
+        first = ((t0 + tz) // step + 1) * step - tz        # label on local-time boundaries
+        sx = (w - 1) / span
+        k = 0
+        t = first
+        while t < t1 and k < len(self._ticks):
+            line, text = self._ticks[k]
+            x = int((t - t0) * sx)
+            c.coords(line, x, h - 12, x, h)
+            c.coords(text, x, h - 1)
+            c.itemconfigure(text, text=time.strftime(fmt, time.localtime(t)), state="normal")
+            c.itemconfigure(line, state="normal")
+            k += 1
+            t += step
+        for line, text in self._ticks[k:]:
+            c.itemconfigure(line, state="hidden")
+            c.itemconfigure(text, state="hidden")
+
+    def _place_crosshair(self, x):
+        if self._view is None:
+            return
+        t0, t1, _vmin, _vmax, w, h = self._view
+        c = self.canvas
+        parts = [time.strftime("%H:%M:%S", time.localtime(t0 + x / max(1, w - 1) * (t1 - t0)))]
+        for s in self._series:
+            if not s.cols:
+                continue
+            i = bisect.bisect_left(s.cols, [x])
+            cand = [j for j in (i - 1, i) if 0 <= j < len(s.cols)]
+            j = min(cand, key=lambda j: abs(s.cols[j][0] - x))
+            if abs(s.cols[j][0] - x) > 12:
+                continue
+            _, lo, hi = s.cols[j]
+            lo, hi = lo / s.scale, hi / s.scale
+            val = s.fmt.format(hi) if hi == lo else f"{s.fmt.format(lo)}–{s.fmt.format(hi)}"
+            parts.append(f"{s.label} {val}")
+        c.coords(self._cross, x, 0, x, h)
+        c.coords(self._readout, min(x + 6, max(4, w - 180)), 4)
+        c.itemconfigure(self._readout, text="  ".join(parts), state="normal")
+        c.itemconfigure(self._cross, state="normal")
+
+    # ----- mouse -----
+    def _on_wheel(self, e):
+        self._zoom(e.x, 0.8 if e.delta > 0 else 1.25)
+
+    def _zoom(self, x, factor):
+        if self._view is None:
+            return "break"
+        t0, t1, _vmin, _vmax, w, _h = self._view
+        anchor = t0 + x / max(1, w - 1) * (t1 - t0)          # keep the time under the pointer fixed
+        span = min(MAX_SPAN_SEC, max(MIN_SPAN_SEC, self.span * factor))
+        end = anchor + (t1 - anchor) * span / self.span
+        self.span = span
+        self.end = None if self.end is None or end >= time.time() else end
+        self.redraw()
+        return "break"
+
+    def _on_press(self, e):
+        self._drag_x = e.x
+
+    def _on_drag(self, e):
+        if self._drag_x is None or self._view is None:
+            return
+        t0, t1, _vmin, _vmax, w, _h = self._view
+        dt = (e.x - self._drag_x) * (t1 - t0) / max(1, w - 1)
+        self._drag_x = e.x
+        end = t1 - dt
+        self.end = None if end >= time.time() else end
+        self.redraw()
+
+    def _on_release(self, _e):
+        self._drag_x = None
+
+    def _on_motion(self, e):
+        self._hover_x = e.x
+        self._place_crosshair(e.x)
+
+    def _on_leave(self, _e):
+        self._hover_x = None
+        self.canvas.itemconfigure(self._cross, state="hidden")
+        self.canvas.itemconfigure(self._readout, state="hidden")
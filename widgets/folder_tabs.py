@@ -6,12 +6,21 @@ class FolderTabs(ctk.CTkFrame):
     """
     Top-aligned folder-style tabs with content below.
     The selected tab is shown in a darker shade so it's obvious where you are.
+    Tabs added with add_lazy_tab() are only built the first time they are
+    selected, so startup pays for the visible tab alone.
+
+    A tab frame may define on_show()/on_hide(): on_hide() when another tab is
+    selected or the window is minimized (set_window_visible), on_show() when
+    it is on screen again. Hidden tabs are expected to only record and to
+    catch up in one go when shown.
     """
     def __init__(self, master, tab_width=110, tab_height=34):
         super().__init__(master, fg_color=COLORS["tab_bg"])
         self._tabs = {}      # name -> frame
+        self._builders = {}  # name -> build() for tabs not built yet
         self._buttons = {}   # name -> button
         self._current = None
+        self._window_visible = True
         self._tab_w = tab_width
         self._tab_h = tab_height
 
@@ -41,7 +50,39 @@ class FolderTabs(ctk.CTkFrame):
     def add_tab(self, name: str, frame: ctk.CTkFrame):
         """Register a tab. The frame should be a child of self.content."""
         self._tabs[name] = frame
+        self._add_button(name)
+
+        # Make sure the content frame is not already packed
+        try:
+            frame.pack_forget()
+        except Exception:
+            pass
+        self._notify(frame, False)     # hidden until selected
+
+    def add_lazy_tab(self, name: str, build):
+        """Register a tab whose frame build() creates (as a child of self.content) on first select."""
+        self._builders[name] = build
+        self._add_button(name)
 
+    def tab(self, name: str):
+        """The tab's frame, or None if it hasn't been built yet."""
+        return self._tabs.get(name)
+
+    def set_window_visible(self, flag: bool):
+        """The window was minimized (False) or restored (True); the selected tab is hidden/shown."""
+        flag = bool(flag)
+        if flag == self._window_visible:
+            return
+        self._window_visible = flag
+        if self._current is not None:
+            self._notify(self._tabs[self._current], flag)
+
+    def _notify(self, frame, shown: bool):
+        hook = getattr(frame, "on_show" if shown else "on_hide", None)
+        if hook is not None:
+            hook()
+
+    def _add_button(self, name: str):
         btn = ctk.CTkButton(
             self.row, text=name, width=self._tab_w, height=self._tab_h,
                 corner_radius=10, anchor="center", 
@@ -54,15 +95,12 @@ class FolderTabs(ctk.CTkFrame):
         btn.pack(side="left", padx=(0, 6), pady=0)
         self._buttons[name] = btn
 
-        # Make sure the content frame is not already packed
-        try:
-            frame.pack_forget()
-        except Exception:
-            pass
-
     def select(self, name: str):
+        if name in self._builders:
+            self._tabs[name] = self._builders.pop(name)()
         if name not in self._tabs:
             return
+        previous = self._current
 
         # Update button styles so the selected tab looks darker/pressed-in
         for n, b in self._buttons.items():
@@ -91,3 +129,8 @@ class FolderTabs(ctk.CTkFrame):
         # Content sits under the divider
         self._tabs[name].pack(fill="both", expand=True, padx=(10, 10), pady=(10, 10))
         self._current = name
+
+        if previous != name and self._window_visible:
+            if previous is not None:
+                self._notify(self._tabs[previous], False)
+            self._notify(self._tabs[name], True)
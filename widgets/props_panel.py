@@ -0,0 +1,80 @@
+# widgets/props_panel.py
+import customtkinter as ctk
+from theme import COLORS
+from utils.properties import PERF_KEYS, VANILLA_KEYS
+
+
+class PerfPropertiesPanel(ctk.CTkFrame):
+    """
+    Edits the performance-relevant server.properties keys (PERF_KEYS).
+    Values are range-checked, then written in one atomic update; the server
+    only picks them up on its next start.
+    """
+    def __init__(self, master):
+        super().__init__(master, fg_color=COLORS["inset_bg"], corner_radius=10)
+        self.props = None
+        self._vars = {}
+
+        ctk.CTkLabel(self, text="Performance settings (server.properties)", font=("Segoe UI", 12, "bold"))\
+            .grid(row=0, column=0, columnspan=6, sticky="w", padx=10, pady=(6, 2))
+        for i, key in enumerate(PERF_KEYS):
+            row, col = 1 + i // 3, (i % 3) * 2
+            ctk.CTkLabel(self, text=key + ":", font=("Segoe UI", 11))\
+                .grid(row=row, column=col, sticky="e", padx=(10, 4), pady=2)
+            if VANILLA_KEYS[key][0] is bool:
+                var = ctk.BooleanVar(value=VANILLA_KEYS[key][1])
+                ctk.CTkCheckBox(self, text="", variable=var, width=24)\
+                    .grid(row=row, column=col + 1, sticky="w", pady=2)
+            else:
+                var = ctk.StringVar(value=str(VANILLA_KEYS[key][1]))
+                ctk.CTkEntry(self, textvariable=var, width=70, justify="right")\
+                    .grid(row=row, column=col + 1, sticky="w", pady=2)
+            self._vars[key] = var
+
+        last = 2 + (len(PERF_KEYS) - 1) // 3
+        ctk.CTkButton(self, text="Apply", width=80, fg_color=COLORS["btn_alt"],
+                      hover_color=COLORS["btn_hover"], command=self._apply)\
+            .grid(row=last, column=0, sticky="w", padx=10, pady=(4, 8))
+        self.status_lbl = ctk.CTkLabel(self, text="", font=("Segoe UI", 11), text_color=COLORS["muted_text"])
+        self.status_lbl.grid(row=last, column=1, columnspan=5, sticky="w", pady=(4, 8))
+
+    def set_properties(self, props):
+        self.props = props
+        self.reload()
+
+    def reload(self):
+        if self.props is None:
+            return
+        for key, var in self._vars.items():
+            var.set(self.props.get(key) if isinstance(var, ctk.BooleanVar) else str(self.props.get(key)))
+        self.status_lbl.configure(text="" if self.props.exists() else "No server.properties yet (written on Apply).")
+
+    def _apply(self):
+        if self.props is None:
+            return
+        changes = {}
+        for key, var in self._vars.items():
+            bounds = PERF_KEYS[key]
+            if bounds is None:
+                changes[key] = bool(var.get())
+                continue
+            try:
+                val = int(str(var.get()).strip())
+            except ValueError:
+                self.status_lbl.configure(text=f"{key}: not a number", text_color=COLORS["red_hover"])
+                return
+            if not bounds[0] <= val <= bounds[1]:
+                self.status_lbl.configure(text=f"{key}: must be {bounds[0]}..{bounds[1]}", text_color=COLORS["red_hover"])
+                return
+            changes[key] = val
+        changed = {k: v for k, v in changes.items() if self.props.get(k) != v}
+        if not changed:
+            self.status_lbl.configure(text="No changes.", text_color=COLORS["muted_text"])
+            return
+        try:
+            self.props.update(changed)
+        except Exception as e:
+            self.status_lbl.configure(text=f"Couldn't write server.properties: {e}", text_color=COLORS["red_hover"])
+            return
+        self.status_lbl.configure(text=f"Saved {', '.join(changed)} (applies on next server start).",
+                                  text_color=COLORS["muted_text"])
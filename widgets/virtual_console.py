@@ -0,0 +1,186 @@
+# widgets/virtual_console.py
+import bisect
+import tkinter as tk
+import customtkinter as ctk
+from utils.parsers import LEVEL_TAGS, LEVEL_MASK
+
+
+class StoreSource:
+    """Row source over every retained line of a LineStore (position k <-> global id first + k)."""
+    def __init__(self, store):
+        self.store = store
+
+    def count(self) -> int:
+        return len(self.store)
+
+    def position(self, gid: int) -> int:
+        return min(max(gid, self.store.first), self.store.end) - self.store.first
+
+    def gid_at(self, k: int) -> int:
+        return self.store.first + k
+
+    def row(self, gid: int):
+        return self.store.row(gid)
+
+
+class FilteredSource:
+    """
+    Row source over the lines whose class byte is in `classes`, built by
+    merging the store's posting lists. New lines are merged in incrementally
+    and trimmed ids are dropped lazily; text is never re-read.
+    """
+    def __init__(self, store, classes):
+        self.store = store
+        self.classes = frozenset(classes)
+        self._ids = store.merged_ids(self.classes, store.first)
+        self._upto = store.end      # posting entries below this are already merged
+
+    def _sync(self):
+        store = self.store
+        if store.end != self._upto:
+            self._ids.extend(store.merged_ids(self.classes, self._upto))
+            self._upto = store.end
+        if self._ids and self._ids[0] < store.first:
+            del self._ids[:bisect.bisect_left(self._ids, store.first)]
+
+    def count(self) -> int:
+        self._sync()
+        return len(self._ids)
+
+    def position(self, gid: int) -> int:
+        return bisect.bisect_left(self._ids, gid)
+
+    def gid_at(self, k: int) -> int:
+        return self._ids[k]
+
+    def row(self, gid: int):
+        return self.store.row(gid)
+
+
+class VirtualConsole(ctk.CTkFrame):
+    """
+    Read-only console that only ever holds the visible viewport in its Text
+    widget. Lines live in a row source (see StoreSource); scrolling just
+    re-renders the handful of rows on screen, so cost does not depend on
+    scrollback size. When scrolled to the bottom it follows the tail.
+    """
+    def __init__(self, master, source, tag_colors: dict | None = None):
+        super().__init__(master, fg_color="black", corner_radius=10)
+        self.source = source
+        self.follow = True        # stick to the newest line
+        self._top = 0             # global id of the first visible line (when not following)
+        self._rows = 40           # visible rows, recomputed on resize
+        self._shown = None        # (first gid, last gid, count) currently rendered
+
+        self._font = ctk.CTkFont(size=13)
+        self.text = tk.Text(
+            self, bg="black", fg="white", bd=0, highlightthickness=0, wrap="char",
+            font=self._font, insertwidth=0, cursor="arrow", padx=8, pady=6,
+            selectbackground="#3a3a3a",
+        )
+        self.scroll = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scroll.pack(side="right", fill="y", padx=(0, 4), pady=6)
+        self.text.pack(side="left", fill="both", expand=True, padx=(6, 0), pady=6)
+        self.text.configure(state="disabled")
+
+        for tag, color in (tag_colors or {}).items():
+            self.text.tag_config(tag, foreground=color)
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda _e: self._scroll_rows(-3))
+        self.text.bind("<Button-5>", lambda _e: self._scroll_rows(3))
+        self.text.bind("<Prior>", lambda _e: self._scroll_rows(-self._rows + 1))
+        self.text.bind("<Next>", lambda _e: self._scroll_rows(self._rows - 1))
+        self.text.bind("<Control-End>", lambda _e: self.scroll_to_end())
+        self.text.bind("<Control-Home>", lambda _e: self._scroll_to(0))
+
+    # ----- public API -----
+    def set_source(self, source, follow: bool = True):
+        self.source = source
+        self.follow = follow
+        self._shown = None
+        self.refresh()
+
+    def scroll_to_end(self):
+        self.follow = True
+        self.refresh()
+        return "break"
+
+    def refresh(self):
+        """Re-render the viewport if the visible rows changed (cheap no-op otherwise)."""
+        n = self.source.count()
+        k0 = self._first_position(n)
+        k1 = min(n, k0 + self._rows)
+        shown = (self.source.gid_at(k0), self.source.gid_at(k1 - 1), n if self.follow else 0) if k1 > k0 else None
+        if shown != self._shown:
+            self._shown = shown
+            self._render(k0, k1)
+        if n:
+            self.scroll.set(k0 / n, k1 / n)
+        else:
+            self.scroll.set(0.0, 1.0)
+
+    # ----- internal -----
+    def _first_position(self, n: int) -> int:
+        last = max(0, n - self._rows)
+        if self.follow:
+            return last
+        k0 = min(self.source.position(self._top), last)
+        if k0 >= last:
+            self.follow = True
+        return k0
+
+    def _render(self, k0: int, k1: int):
+        t = self.text
+        t.configure(state="normal")
+        t.delete("1.0", "end")
+        for k in range(k0, k1):
+            line, level_tag = self._row_text(self.source.gid_at(k))
+            if level_tag:
+                t.insert("end", line + "\n", level_tag)
+            else:
+                t.insert("end", line + "\n")
+        t.see("end" if self.follow else "1.0")
+        t.configure(state="disabled")
+
+    def _row_text(self, gid: int):
+        text, cls = self.source.row(gid)
+        level = cls & LEVEL_MASK
+        return text, LEVEL_TAGS[level] if level < len(LEVEL_TAGS) else None
+
+    def _scroll_to(self, k0: int):
+        n = self.source.count()
+        last = max(0, n - self._rows)
+        k0 = max(0, min(int(k0), last))
+        self.follow = k0 >= last
+        if not self.follow:
+            self._top = self.source.gid_at(k0)
+        self.refresh()
+        return "break"
+
+    def _scroll_rows(self, delta: int):
+        return self._scroll_to(self._first_position(self.source.count()) + delta)
+
+    def _on_wheel(self, evt):
+        step = -1 if evt.delta > 0 else 1
+        if abs(evt.delta) >= 120:            # Windows reports multiples of 120
+            step *= 3 * (abs(evt.delta) // 120)
+        return self._scroll_rows(step)
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(float(args[1]) * self.source.count())
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            self._scroll_rows(amount * (self._rows - 1) if args[2] == "pages" else amount)
+
+    def _on_resize(self, evt):
+        line_h = max(1, self._font.metrics("linespace"))
+        rows = max(1, (evt.height - 12) // line_h)
+        if rows != self._rows:
+            self._rows = rows
+            self._shown = None
+            self.refresh()